@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark webhook payload parsing.
+
+Compares the original ingest path (json.loads + EspoCRMWebhookPayload.from_list)
+with the single-pass TypeAdapter path used by the webhook endpoint.
+
+Usage: python scripts/bench_webhook_parse.py [events] [iterations]
+"""
+
+import json
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+for name in ("ESPOCRM_URL", "ESPOCRM_API_KEY", "OPENAI_API_KEY", "WEBHOOK_SECRET"):
+    os.environ.setdefault(name, "benchmark")
+
+from src.models import EspoCRMWebhookPayload, parse_webhook_events  # noqa: E402
+
+
+def build_payload(events: int) -> bytes:
+    return json.dumps(
+        [
+            {
+                "id": f"{i:017x}",
+                "name": f"Contact {i}",
+                "modifiedAt": "2024-01-01 12:00:00",
+                "assignedUserId": "1",
+            }
+            for i in range(events)
+        ]
+    ).encode()
+
+
+def main() -> None:
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    body = build_payload(events)
+
+    def model_path() -> None:
+        EspoCRMWebhookPayload.from_list(json.loads(body))
+
+    def fast_path() -> None:
+        parse_webhook_events(body)
+
+    print(f"Payload: {events} events, {len(body)} bytes, {iterations} iterations")
+    results = {}
+    for name, func in (
+        ("json.loads + from_list", model_path),
+        ("TypeAdapter", fast_path),
+    ):
+        best = min(timeit.repeat(func, number=iterations, repeat=5)) / iterations
+        results[name] = best
+        print(f"  {name:<24} {best * 1e6:10.1f} us/payload")
+
+    speedup = results["json.loads + from_list"] / results["TypeAdapter"]
+    print(f"  speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -34,6 +34,7 @@ def main() -> None:
         print("  typecheck  - Run type checking")
         print("  test       - Run tests")
         print("  test-cov   - Run tests with coverage")
+        print("  bench      - Run webhook parsing benchmark")
         print("  check-all  - Run all checks (lint, format, typecheck, test)")
         print("  hooks      - Install pre-commit hooks")
         print("  hooks-run  - Run pre-commit hooks on all files")
@@ -76,6 +77,13 @@ def main() -> None:
         if not success:
             sys.exit(1)
 
+    elif command == "bench":
+        success = run_command(
+            "python scripts/bench_webhook_parse.py", "Running webhook benchmark"
+        )
+        if not success:
+            sys.exit(1)
+
     elif command == "check-all":
         print("🔍 Running all checks...")
         checks = [
@@ -0,0 +1,133 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, tokens: float, updated_at: float) -> None:
+        self.tokens = tokens
+        self.updated_at = updated_at
+
+
+class RateLimiter:
+    """
+    Per-key token buckets, refilled lazily on access.
+
+    Buckets are kept in LRU order and the least recently used ones are evicted
+    once max_keys is reached, so memory stays bounded when sources rotate.
+    """
+
+    def __init__(
+        self, rate_per_second: float, burst: float, max_keys: int = 10000
+    ) -> None:
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _refill(self, key: str, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.burst, now)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            elapsed = now - bucket.updated_at
+            if elapsed > 0:
+                bucket.tokens = min(
+                    self.burst, bucket.tokens + elapsed * self.rate_per_second
+                )
+                bucket.updated_at = now
+        return bucket
+
+    def _wait_time(self, bucket: TokenBucket, cost: float) -> float:
+        if cost > self.burst:
+            return math.inf
+        if self.rate_per_second <= 0:
+            return math.inf
+        return (cost - bucket.tokens) / self.rate_per_second
+
+    def acquire(self, key: str, cost: float = 1.0, now: float | None = None) -> float:
+        """Take cost tokens; return 0.0 on success or seconds until they exist."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._refill(key, now)
+            if bucket.tokens >= cost:
+                bucket.tokens -= cost
+                return 0.0
+            return self._wait_time(bucket, cost)
+
+    def charge(self, key: str, cost: float = 1.0, now: float | None = None) -> None:
+        """
+        Take cost tokens even if the bucket goes below zero. The debt is paid
+        back as the bucket refills, so later acquires and peeks wait for it.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._refill(key, now).tokens -= cost
+
+    def peek(self, key: str, cost: float = 1.0, now: float | None = None) -> float:
+        """Like acquire, but never takes tokens."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._refill(key, now)
+            if bucket.tokens >= cost:
+                return 0.0
+            return self._wait_time(bucket, cost)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        max_events_per_payload: int,
+        max_inflight_jobs: int,
+        shed_retry_after_seconds: int,
+    ) -> None:
+        self.limiter = limiter
+        self.max_events_per_payload = max_events_per_payload
+        self.max_inflight_jobs = max_inflight_jobs
+        self.shed_retry_after_seconds = shed_retry_after_seconds
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def shed_retry_after(self, jobs: int = 1) -> int | None:
+        if self._in_flight + jobs > self.max_inflight_jobs:
+            return self.shed_retry_after_seconds
+        return None
+
+    def rate_retry_after(
+        self,
+        key: str,
+        cost: int = 1,
+        take: bool = True,
+        limiter: RateLimiter | None = None,
+    ) -> int | None:
+        limiter = limiter or self.limiter
+        if take:
+            wait = limiter.acquire(key, cost)
+        else:
+            wait = limiter.peek(key, cost)
+        if wait <= 0:
+            return None
+        if math.isinf(wait):
+            return self.shed_retry_after_seconds
+        return max(1, math.ceil(wait))
+
+    def job_started(self, jobs: int = 1) -> None:
+        with self._lock:
+            self._in_flight += jobs
+
+    def job_finished(self, jobs: int = 1) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - jobs)
@@ -0,0 +1,196 @@
+import asyncio
+import json
+import time
+import zipfile
+from collections.abc import AsyncIterator, Callable
+from functools import partial
+from pathlib import PurePosixPath
+from typing import Any, BinaryIO
+
+from .crm.document_processor import DocumentProcessor
+from .crm.resilience import TransientDependencyError
+from .crm.skills_extractor import SkillsExtractor
+
+
+class BatchItem:
+    """One resume in a dry-run batch: inline text or a document to parse."""
+
+    __slots__ = ("id", "text", "filename", "load")
+
+    def __init__(
+        self,
+        id: str,
+        text: str | None = None,
+        filename: str | None = None,
+        load: Callable[[], bytes] | None = None,
+    ) -> None:
+        self.id = id
+        self.text = text
+        self.filename = filename
+        # Document bytes are loaded inside the worker so only items currently
+        # being processed are held in memory
+        self.load = load
+
+
+def items_from_ndjson(body: bytes, max_items: int) -> list[BatchItem]:
+    """Parse one JSON object per line, each with a 'text' and an optional 'id'."""
+    items = []
+    for line_number, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number} is not valid JSON: {e}")
+        if not isinstance(record, dict) or not isinstance(record.get("text"), str):
+            raise ValueError(f"Line {line_number} must be an object with a 'text'")
+        items.append(
+            BatchItem(
+                id=str(record.get("id", f"line-{line_number}")), text=record["text"]
+            )
+        )
+        if len(items) > max_items:
+            raise ValueError(f"Batch exceeds {max_items} items")
+    return items
+
+
+def item_from_upload(
+    filename: str, stream: BinaryIO, size: int | None, max_file_size: int
+) -> BatchItem:
+    def load() -> bytes:
+        if size is not None and size > max_file_size:
+            raise ValueError(f"File exceeds maximum size of {max_file_size} bytes")
+        stream.seek(0)
+        return stream.read()
+
+    return BatchItem(id=filename, filename=filename, load=load)
+
+
+def items_from_zip(
+    archive: zipfile.ZipFile, max_items: int, max_file_size: int
+) -> list[BatchItem]:
+    """
+    List the documents in a zip archive without extracting them.
+
+    Entry sizes come from the central directory, so oversized members are
+    rejected before any decompression.
+    """
+    items = []
+    for info in archive.infolist():
+        name = PurePosixPath(info.filename)
+        if info.is_dir() or name.name.startswith(".") or "__MACOSX" in name.parts:
+            continue
+        if info.file_size > max_file_size:
+            raise ValueError(
+                f"{info.filename} exceeds maximum size of {max_file_size} bytes"
+            )
+        items.append(
+            BatchItem(
+                id=info.filename,
+                filename=name.name,
+                load=partial(archive.read, info),
+            )
+        )
+        if len(items) > max_items:
+            raise ValueError(f"Batch exceeds {max_items} items")
+    return items
+
+
+async def run_batch(
+    items: list[BatchItem],
+    document_processor: DocumentProcessor,
+    skills_extractor: SkillsExtractor,
+    concurrency: int,
+) -> AsyncIterator[str]:
+    """
+    Process items with at most `concurrency` in flight and yield one NDJSON
+    result line per item as it completes, then a summary line.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+
+    async def process(index: int, item: BatchItem) -> dict[str, Any]:
+        async with semaphore:
+            item_started = time.perf_counter()
+            timings: dict[str, float] = {}
+            result: dict[str, Any] = {"type": "result", "index": index, "id": item.id}
+            try:
+                if item.text is not None:
+                    text = item.text.strip()
+                    if not text:
+                        raise ValueError("Provided text is empty")
+                else:
+                    assert item.load is not None and item.filename is not None
+                    text = await asyncio.to_thread(
+                        _parse, document_processor, item.load, item.filename
+                    )
+                    timings["parse"] = _elapsed_ms(item_started)
+
+                extract_started = time.perf_counter()
+                extracted = await asyncio.to_thread(
+                    skills_extractor.extract_skills, text
+                )
+                timings["extract"] = _elapsed_ms(extract_started)
+                result.update(
+                    status="success",
+                    skills=extracted.skills,
+                    confidence=extracted.confidence,
+                    model=extracted.source,
+                )
+            except TransientDependencyError as e:
+                # The item may succeed if resubmitted once the dependency is back
+                result.update(
+                    status="error",
+                    error=str(e),
+                    retryable=True,
+                    retry_after=e.retry_after,
+                )
+            except Exception as e:
+                result.update(status="error", error=str(e), retryable=False)
+            timings["total"] = _elapsed_ms(item_started)
+            result["timings_ms"] = timings
+            return result
+
+    tasks = [
+        asyncio.create_task(process(index, item)) for index, item in enumerate(items)
+    ]
+    succeeded = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            succeeded += result["status"] == "success"
+            yield json.dumps(result) + "\n"
+    finally:
+        # Stop outstanding items if the client disconnects mid-stream
+        for task in tasks:
+            task.cancel()
+
+    elapsed_seconds = time.perf_counter() - started
+    yield (
+        json.dumps(
+            {
+                "type": "summary",
+                "items": len(items),
+                "succeeded": succeeded,
+                "failed": len(items) - succeeded,
+                "elapsed_ms": round(elapsed_seconds * 1000, 1),
+                "items_per_second": (
+                    round(len(items) / elapsed_seconds, 2) if elapsed_seconds else 0.0
+                ),
+            }
+        )
+        + "\n"
+    )
+
+
+def _parse(
+    document_processor: DocumentProcessor, load: Callable[[], bytes], filename: str
+) -> str:
+    is_allowed, error_msg = document_processor.is_allowed_type(filename)
+    if not is_allowed:
+        raise ValueError(error_msg)
+    return document_processor.extract_text(load(), filename)
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
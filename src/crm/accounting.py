@@ -0,0 +1,58 @@
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import partial
+from typing import ParamSpec, TypeVar
+
+from ..models import ProcessingStats
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_current_stats: ContextVar[ProcessingStats | None] = ContextVar(
+    "current_stats", default=None
+)
+
+
+@contextmanager
+def accounting(stats: ProcessingStats) -> Iterator[ProcessingStats]:
+    """
+    Charge resource usage in this thread to stats until the block exits,
+    including the thread's CPU time.
+    """
+    token = _current_stats.set(stats)
+    cpu_started = time.thread_time()
+    try:
+        yield stats
+    finally:
+        stats.add(cpu_ms=(time.thread_time() - cpu_started) * 1000)
+        _current_stats.reset(token)
+
+
+def account(**counts: float) -> None:
+    """Add to the current job's counters; a no-op outside accounting()."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add(**counts)
+
+
+def submit_accounted(
+    executor: Executor, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+) -> Future[T]:
+    """
+    Submit func to run in a copy of the caller's context, so what it uses on
+    the worker thread is charged to the current job and per-job context
+    (such as the tenant's LLM quota) carries over.
+    """
+    context = copy_context()
+    return executor.submit(context.run, _run_accounted, partial(func, *args, **kwargs))
+
+
+def _run_accounted(call: Callable[[], T]) -> T:
+    stats = _current_stats.get()
+    if stats is None:
+        return call()
+    with accounting(stats):
+        return call()
@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import UTC, datetime
+from typing import Any, Literal
+
+from .resilience import TransientDependencyError
+
+logger = logging.getLogger(__name__)
+
+BudgetState = Literal["ok", "degraded", "exhausted"]
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Burn rate used to project when a budget runs out
+PROJECTION_WINDOW_SECONDS = 15 * 60
+
+
+class BudgetExhaustedError(TransientDependencyError):
+    pass
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for when the API reports no usage (~4 chars each)."""
+    return max(1, len(text) // 4)
+
+
+class TokenBudget:
+    """
+    Rolling hourly and daily LLM token budgets.
+
+    Usage is kept in per-minute buckets for the last day. Past
+    degrade_ratio of either budget the state is "degraded", which callers
+    use to take cheaper paths and defer low-priority work; at the limit it
+    is "exhausted" and further calls are refused until enough of the window
+    has rolled off. Without limits it only accounts usage.
+    """
+
+    def __init__(
+        self,
+        hourly_limit: int | None = None,
+        daily_limit: int | None = None,
+        degrade_ratio: float = 0.8,
+    ) -> None:
+        self.limits = {
+            window: limit
+            for window, limit in ((HOUR, hourly_limit), (DAY, daily_limit))
+            if limit
+        }
+        self.degrade_ratio = degrade_ratio
+        self._buckets: deque[list[int]] = deque()
+        self._prompt_tokens = 0
+        self._completion_tokens = 0
+        self._started = time.time()
+        self._state: BudgetState = "ok"
+        self._lock = threading.Lock()
+
+    def record(self, prompt_tokens: int, completion_tokens: int) -> None:
+        now = time.time()
+        minute = int(now // 60)
+        with self._lock:
+            if self._buckets and self._buckets[-1][0] == minute:
+                self._buckets[-1][1] += prompt_tokens + completion_tokens
+            else:
+                self._buckets.append([minute, prompt_tokens + completion_tokens])
+            while self._buckets and self._buckets[0][0] <= minute - DAY // 60:
+                self._buckets.popleft()
+            self._prompt_tokens += prompt_tokens
+            self._completion_tokens += completion_tokens
+        self._update_state(now)
+
+    def _used(self, window: int, now: float) -> int:
+        first_minute = int(now // 60) - window // 60
+        return sum(tokens for minute, tokens in self._buckets if minute > first_minute)
+
+    def used(self, window: int) -> int:
+        with self._lock:
+            return self._used(window, time.time())
+
+    def _compute_state(self, now: float) -> BudgetState:
+        state: BudgetState = "ok"
+        for window, limit in self.limits.items():
+            used = self._used(window, now)
+            if used >= limit:
+                return "exhausted"
+            if used >= limit * self.degrade_ratio:
+                state = "degraded"
+        return state
+
+    def _update_state(self, now: float) -> BudgetState:
+        with self._lock:
+            state = self._compute_state(now)
+            previous, self._state = self._state, state
+        if state != previous:
+            logger.warning(f"LLM token budget state changed from {previous} to {state}")
+        return state
+
+    @property
+    def state(self) -> BudgetState:
+        return self._update_state(time.time())
+
+    @property
+    def degraded(self) -> bool:
+        return self.state != "ok"
+
+    def check(self) -> None:
+        """Raise BudgetExhaustedError if a budget has been used up."""
+        if self.state != "exhausted":
+            return
+        raise BudgetExhaustedError(
+            "llm", "LLM token budget exhausted", retry_after=self.seconds_until_ok()
+        )
+
+    def seconds_until_ok(self) -> float:
+        """Time until enough usage rolls off that every budget is under its limit."""
+        now = time.time()
+        with self._lock:
+            wait = 0.0
+            for window, limit in self.limits.items():
+                first_minute = int(now // 60) - window // 60
+                excess = self._used(window, now) - limit + 1
+                for minute, tokens in self._buckets:
+                    if excess <= 0:
+                        break
+                    if minute <= first_minute:
+                        continue
+                    excess -= tokens
+                    # A bucket leaves the window a full window after it began
+                    wait = max(wait, minute * 60 + window - now)
+            return wait
+
+    def projected_exhaustion(self) -> datetime | None:
+        """When the first budget runs out at the recent burn rate, if ever."""
+        now = time.time()
+        with self._lock:
+            elapsed = min(PROJECTION_WINDOW_SECONDS, max(60.0, now - self._started))
+            rate = self._used(PROJECTION_WINDOW_SECONDS, now) / elapsed
+            if not self.limits or rate <= 0:
+                return None
+            seconds = min(
+                max(0.0, (limit - self._used(window, now)) / rate)
+                for window, limit in self.limits.items()
+            )
+        return datetime.fromtimestamp(now + seconds, UTC)
+
+    def snapshot(self) -> dict[str, Any]:
+        projected = self.projected_exhaustion()
+        state = self.state
+        with self._lock:
+            now = time.time()
+            return {
+                "state": state,
+                "hour": {"used": self._used(HOUR, now), "limit": self.limits.get(HOUR)},
+                "day": {"used": self._used(DAY, now), "limit": self.limits.get(DAY)},
+                "total_prompt_tokens": self._prompt_tokens,
+                "total_completion_tokens": self._completion_tokens,
+                "projected_exhaustion_at": (
+                    projected.isoformat() if projected is not None else None
+                ),
+            }
@@ -0,0 +1,66 @@
+import re
+
+# A line on its own that looks like a resume section heading: short and in
+# capitals ("WORK EXPERIENCE") or ending in a colon ("Projects:")
+_HEADING = re.compile(r"^(?:[A-Z][A-Z0-9 &/,.\-]{2,48}|[A-Z][\w &/,.\-]{1,48}:)$")
+
+# Progressively finer places to split a section that is too long on its own
+_SEPARATORS = ("\n\n", "\n", " ")
+
+
+def split_sections(text: str) -> list[str]:
+    """Split text before each section heading."""
+    sections: list[str] = []
+    current: list[str] = []
+    for line in text.splitlines():
+        if _HEADING.match(line.strip()) and any(part.strip() for part in current):
+            sections.append("\n".join(current))
+            current = []
+        current.append(line)
+    if any(part.strip() for part in current):
+        sections.append("\n".join(current))
+    return sections
+
+
+def chunk_text(text: str, max_chars: int) -> list[str]:
+    """
+    Split text into chunks of at most max_chars, breaking on section
+    headings where possible and packing consecutive sections together.
+    """
+    pieces = [
+        piece
+        for section in split_sections(text)
+        for piece in _split_long(section, max_chars)
+    ]
+
+    chunks: list[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_long(text: str, max_chars: int, level: int = 0) -> list[str]:
+    if len(text) <= max_chars:
+        return [text]
+    if level == len(_SEPARATORS):
+        return [text[i : i + max_chars] for i in range(0, len(text), max_chars)]
+
+    separator = _SEPARATORS[level]
+    pieces: list[str] = []
+    current = ""
+    for part in text.split(separator):
+        if current and len(current) + len(separator) + len(part) > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current}{separator}{part}" if current else part
+    if current:
+        pieces.append(current)
+    return [
+        piece for chunk in pieces for piece in _split_long(chunk, max_chars, level + 1)
+    ]
@@ -0,0 +1,89 @@
+import logging
+import threading
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """
+    Caps concurrent calls to a dependency at a limit found by AIMD.
+
+    Each call that completes within latency_target_seconds while the limit
+    is in use raises the limit by about one per limit's worth of calls
+    (additive increase). A slow call or an overload response cuts it by
+    backoff_ratio (multiplicative decrease), at most once per round: calls
+    that started before the last cut were sent at the old limit and do not
+    cut again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        latency_target_seconds: float = 0.5,
+        backoff_ratio: float = 0.5,
+    ) -> None:
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target_seconds = latency_target_seconds
+        self.backoff_ratio = backoff_ratio
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._last_cut = 0.0
+        self._cuts = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> float:
+        """Wait for a free slot; returns the start time to pass to release()."""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+            return time.monotonic()
+
+    def release(self, started: float, overloaded: bool = False) -> None:
+        now = time.monotonic()
+        latency = now - started
+        with self._condition:
+            if overloaded or latency > self.latency_target_seconds:
+                if started >= self._last_cut:
+                    self._cut(now, latency, overloaded)
+            elif self._in_flight >= self._limit / 2:
+                # Only grow while the limit is actually in use, otherwise an
+                # idle period would ratchet it up to the maximum
+                self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _cut(self, now: float, latency: float, overloaded: bool) -> None:
+        self._limit = max(float(self.min_limit), self._limit * self.backoff_ratio)
+        self._last_cut = now
+        self._cuts += 1
+        reason = "overload response" if overloaded else f"latency {latency:.2f}s"
+        logger.debug(
+            f"Concurrency limit for {self.name} cut to {self.limit} ({reason})"
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._condition:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "latency_target_ms": round(self.latency_target_seconds * 1000),
+                "cuts": self._cuts,
+            }
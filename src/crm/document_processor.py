@@ -1,12 +1,14 @@
 import hashlib
 import io
 import logging
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import BinaryIO, cast
 
-from docx import Document
-from pdfminer.high_level import extract_text as extract_pdf_text
-
-from .settings import settings
+from ..settings import settings
+from .accounting import account
 
 logger = logging.getLogger(__name__)
 
@@ -15,15 +17,43 @@ class DocumentProcessor:
     def __init__(self) -> None:
         self.allowed_extensions = settings.allowed_file_extensions
         self.max_file_size = settings.max_file_size_mb * 1024 * 1024
-        self._content_cache: dict[str, str] = {}
+        self.cache_ttl_seconds = settings.cache_ttl_hours * 3600
+        self.cache_max_entries = settings.cache_max_entries
+        self._content_cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def get_content_hash(self, content: bytes) -> str:
         return hashlib.sha256(content).hexdigest()
 
+    def get_cached_text(self, content_hash: str) -> str | None:
+        with self._cache_lock:
+            entry = self._content_cache.get(content_hash)
+            if entry is None:
+                return None
+            expires_at, text = entry
+            if expires_at < time.monotonic():
+                del self._content_cache[content_hash]
+                return None
+            self._content_cache.move_to_end(content_hash)
+            return text
+
+    def cache_text(self, content_hash: str, text: str) -> None:
+        with self._cache_lock:
+            self._content_cache[content_hash] = (
+                time.monotonic() + self.cache_ttl_seconds,
+                text,
+            )
+            self._content_cache.move_to_end(content_hash)
+            while len(self._content_cache) > self.cache_max_entries:
+                self._content_cache.popitem(last=False)
+
     def is_valid_file(self, filename: str, file_size: int) -> tuple[bool, str | None]:
         if file_size > self.max_file_size:
             return False, f"File size {file_size} exceeds maximum {self.max_file_size}"
 
+        return self.is_allowed_type(filename)
+
+    def is_allowed_type(self, filename: str) -> tuple[bool, str | None]:
         file_ext = Path(filename).suffix.lower().lstrip(".")
         if file_ext not in self.allowed_extensions:
             return (
@@ -33,9 +63,12 @@ class DocumentProcessor:
 
         return True, None
 
-    def extract_text_from_docx(self, content: bytes) -> str:
+    def extract_text_from_docx(self, content: bytes | BinaryIO) -> str:
+        # Parsers are imported on first use to keep them off the startup path
+        from docx import Document
+
         try:
-            doc = Document(io.BytesIO(content))
+            doc = Document(_as_stream(content))
             text_parts = []
 
             for paragraph in doc.paragraphs:
@@ -56,9 +89,11 @@ class DocumentProcessor:
             logger.error(f"Error extracting text from DOCX: {e}")
             raise ValueError(f"Failed to extract text from DOCX: {e}")
 
-    def extract_text_from_pdf(self, content: bytes) -> str:
+    def extract_text_from_pdf(self, content: bytes | BinaryIO) -> str:
+        from pdfminer.high_level import extract_text as extract_pdf_text
+
         try:
-            text = extract_pdf_text(io.BytesIO(content))
+            text = extract_pdf_text(cast(io.IOBase, _as_stream(content)))
             return text.strip()
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
@@ -84,13 +119,30 @@ class DocumentProcessor:
             raise ValueError(f"Failed to extract text from DOC: {e}")
 
     def extract_text(self, content: bytes, filename: str) -> str:
-        content_hash = self.get_content_hash(content)
-
-        if settings.enable_cache and content_hash in self._content_cache:
-            logger.info(f"Using cached content for file: {filename}")
-            return self._content_cache[content_hash]
+        return self.extract_text_from_stream(
+            io.BytesIO(content),
+            filename,
+            content_hash=self.get_content_hash(content),
+            size=len(content),
+        )
+
+    def extract_text_from_stream(
+        self, stream: BinaryIO, filename: str, content_hash: str, size: int
+    ) -> str:
+        """
+        Extract text from a seekable binary stream, such as a spooled upload.
 
-        is_valid, error_msg = self.is_valid_file(filename, len(content))
+        The caller supplies the content hash, typically computed while the
+        stream was being written, so a cache hit skips parsing entirely.
+        """
+        if settings.enable_cache:
+            cached = self.get_cached_text(content_hash)
+            if cached is not None:
+                logger.info(f"Using cached content for file: {filename}")
+                account(cache_hits=1)
+                return cached
+
+        is_valid, error_msg = self.is_valid_file(filename, size)
         if not is_valid:
             raise ValueError(error_msg)
 
@@ -98,12 +150,13 @@ class DocumentProcessor:
         text = ""
 
         try:
+            stream.seek(0)
             if file_ext == ".pdf":
-                text = self.extract_text_from_pdf(content)
+                text = self.extract_text_from_pdf(stream)
             elif file_ext == ".docx":
-                text = self.extract_text_from_docx(content)
+                text = self.extract_text_from_docx(stream)
             elif file_ext == ".doc":
-                text = self.extract_text_from_doc(content)
+                text = self.extract_text_from_doc(stream.read())
             else:
                 raise ValueError(f"Unsupported file type: {file_ext}")
 
@@ -111,7 +164,7 @@ class DocumentProcessor:
                 raise ValueError("No text could be extracted from the document")
 
             if settings.enable_cache:
-                self._content_cache[content_hash] = text
+                self.cache_text(content_hash, text)
 
             logger.info(
                 f"Successfully extracted {len(text)} characters from {filename}"
@@ -121,3 +174,7 @@ class DocumentProcessor:
         except Exception as e:
             logger.error(f"Failed to extract text from {filename}: {e}")
             raise
+
+
+def _as_stream(content: bytes | BinaryIO) -> BinaryIO:
+    return io.BytesIO(content) if isinstance(content, bytes) else content
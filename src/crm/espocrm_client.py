@@ -3,14 +3,25 @@ import urllib
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from ..models import ContactData
 from ..settings import settings
+from .accounting import account
+from .concurrency import AdaptiveLimiter
+from .resilience import ResilientCaller
+from .write_tracker import RecentWrites
 
 logger = logging.getLogger(__name__)
 
 
 class EspoAPIError(Exception):
+    def __init__(self, message: str, status_code: int | None = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class ContactConflictError(Exception):
     pass
 
 
@@ -45,13 +56,41 @@ def http_build_query(data: Any) -> str:
 
 
 class EspoAPI:
-    def __init__(self, url: str, api_key: str) -> None:
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        timeout: float | None = None,
+        caller: ResilientCaller | None = None,
+        limiter: AdaptiveLimiter | None = None,
+    ) -> None:
         self.url = url
         self.api_key = api_key
+        self.timeout = timeout
+        self.caller = caller
+        self.limiter = limiter
         self.status_code: int | None = None
+        self.session = requests.Session()
+        if limiter is not None:
+            # Keep a pooled connection for every call the limiter may allow
+            adapter = HTTPAdapter(pool_maxsize=limiter.max_limit)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
 
     def request(
         self, method: str, action: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        if self.caller is None:
+            return self._request(method, action, params)
+        return self.caller.call(self._request, method, action, params)
+
+    def download_file(self, action: str, params: dict[str, Any] | None = None) -> bytes:
+        if self.caller is None:
+            return self._download_file(action, params)
+        return self.caller.call(self._download_file, action, params)
+
+    def _request(
+        self, method: str, action: str, params: dict[str, Any] | None = None
     ) -> dict[str, Any]:
         if params is None:
             params = {}
@@ -60,18 +99,19 @@ class EspoAPI:
         url = self.normalize_url(action)
 
         if method in ["POST", "PATCH", "PUT"]:
-            response = requests.request(method, url, headers=headers, json=params)
+            response = self._send(method, url, headers=headers, json=params)
         else:
             if params:
                 url = url + "?" + http_build_query(params)
-            response = requests.request(method, url, headers=headers)
+            response = self._send(method, url, headers=headers)
 
         self.status_code = response.status_code
 
-        if self.status_code != 200:
+        if response.status_code != 200:
             reason = self.parse_reason(response.headers)
             raise EspoAPIError(
-                f"Wrong request, status code is {response.status_code}, reason is {reason}"
+                f"Wrong request, status code is {response.status_code}, reason is {reason}",
+                status_code=response.status_code,
             )
 
         data = response.content
@@ -83,7 +123,9 @@ class EspoAPI:
             raise EspoAPIError("API response is not a JSON object")
         return json_data
 
-    def download_file(self, action: str, params: dict[str, Any] | None = None) -> bytes:
+    def _download_file(
+        self, action: str, params: dict[str, Any] | None = None
+    ) -> bytes:
         if params is None:
             params = {}
 
@@ -93,16 +135,40 @@ class EspoAPI:
         if params:
             url = url + "?" + http_build_query(params)
 
-        response = requests.get(url, headers=headers)
-        self.status_code = response.status_code
-
-        if self.status_code != 200:
-            reason = self.parse_reason(response.headers)
-            raise EspoAPIError(
-                f"Wrong request, status code is {response.status_code}, reason is {reason}"
-            )
+        # Streamed so the limiter sees time to headers only: a large resume
+        # taking a while to transfer says nothing about how loaded the CRM is
+        with self._send("GET", url, headers=headers, stream=True) as response:
+            self.status_code = response.status_code
+
+            if response.status_code != 200:
+                reason = self.parse_reason(response.headers)
+                raise EspoAPIError(
+                    f"Wrong request, status code is {response.status_code}, reason is {reason}",
+                    status_code=response.status_code,
+                )
+
+            content = response.content
+        account(bytes_downloaded=len(content))
+        return content
+
+    def _send(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        account(crm_requests=1)
+        if self.limiter is None:
+            return self.session.request(method, url, timeout=self.timeout, **kwargs)
+
+        started = self.limiter.acquire()
+        # Errors raised by requests (timeouts, refused connections) count as
+        # overload just like 5xx and 429 responses
+        overloaded = True
+        try:
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            overloaded = response.status_code == 429 or response.status_code >= 500
+            return response
+        finally:
+            self.limiter.release(started, overloaded)
 
-        return response.content
+    def close(self) -> None:
+        self.session.close()
 
     def normalize_url(self, action: str) -> str:
         return self.url + "/" + action
@@ -115,9 +181,23 @@ class EspoAPI:
 
 
 class EspoCRMClient:
-    def __init__(self) -> None:
-        self.base_url = settings.espocrm_url.rstrip("/")
-        self.api = EspoAPI(f"{self.base_url}/api/v1", settings.espocrm_api_key)
+    def __init__(
+        self,
+        write_tracker: RecentWrites | None = None,
+        url: str | None = None,
+        api_key: str | None = None,
+        caller: ResilientCaller | None = None,
+        limiter: AdaptiveLimiter | None = None,
+    ) -> None:
+        self.write_tracker = write_tracker
+        self.base_url = (url or settings.espocrm_url).rstrip("/")
+        self.api = EspoAPI(
+            f"{self.base_url}/api/v1",
+            api_key or settings.espocrm_api_key,
+            timeout=settings.espocrm_timeout_seconds,
+            caller=caller,
+            limiter=limiter,
+        )
 
     def get_contact(self, contact_id: str) -> ContactData:
         try:
@@ -129,6 +209,8 @@ class EspoCRMClient:
                 lastName=data.get("lastName"),
                 emailAddress=data.get("emailAddress"),
                 skills=data.get("skills"),
+                modifiedAt=data.get("modifiedAt"),
+                versionNumber=data.get("versionNumber"),
             )
         except EspoAPIError as e:
             logger.error(f"Error getting contact {contact_id}: {e}")
@@ -142,6 +224,39 @@ class EspoCRMClient:
             logger.error(f"Error getting attachments for {contact_id}: {e}")
             return []
 
+    def list_changed(
+        self,
+        entity_type: str,
+        attribute: str,
+        since: str,
+        max_size: int,
+        offset: int = 0,
+        select: list[str] | None = None,
+        where: list[dict[str, Any]] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        List records whose `attribute` timestamp is at or after `since`,
+        oldest first. Extra `where` clauses narrow the list further.
+        """
+        params: dict[str, Any] = {
+            "orderBy": attribute,
+            "order": "asc",
+            "maxSize": max_size,
+            "offset": offset,
+            "where": [
+                {"type": "greaterThanOrEquals", "attribute": attribute, "value": since},
+                *(where or []),
+            ],
+        }
+        if select:
+            params["select"] = ",".join(select)
+        try:
+            data = self.api.request("GET", entity_type, params)
+            return list(data.get("list", []))
+        except EspoAPIError as e:
+            logger.error(f"Error listing changed {entity_type} records: {e}")
+            raise ValueError(f"Failed to list {entity_type} records: {e}")
+
     def download_attachment(self, attachment_id: str) -> bytes | None:
         try:
             return self.api.download_file(f"Attachment/{attachment_id}/download")
@@ -149,13 +264,29 @@ class EspoCRMClient:
             logger.error(f"Error downloading attachment {attachment_id}: {e}")
             return None
 
-    def update_contact_skills(self, contact_id: str, skills: list[str]) -> bool:
+    def update_contact_skills(
+        self, contact_id: str, skills: list[str], version_number: int | None = None
+    ) -> bool:
+        """
+        PATCH the contact's skills field.
+
+        When version_number is given, EspoCRM rejects the update with 409 if the
+        record changed since it was read; that surfaces as ContactConflictError.
+        """
         try:
-            skills_text = ", ".join(skills)
-            self.api.request("PATCH", f"Contact/{contact_id}", {"skills": skills_text})
+            payload: dict[str, Any] = {"skills": ", ".join(skills)}
+            if version_number is not None:
+                payload["versionNumber"] = version_number
+            data = self.api.request("PATCH", f"Contact/{contact_id}", payload)
+            if self.write_tracker is not None:
+                self.write_tracker.record(contact_id, skills, data.get("modifiedAt"))
             logger.info(f"Successfully updated skills for contact {contact_id}")
             return True
         except EspoAPIError as e:
+            if e.status_code == 409:
+                raise ContactConflictError(
+                    f"Contact {contact_id} was modified concurrently"
+                )
             logger.error(f"Error updating contact {contact_id}: {e}")
             return False
 
@@ -165,3 +296,6 @@ class EspoCRMClient:
             return True
         except Exception:
             return False
+
+    def close(self) -> None:
+        self.api.close()
@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Any, TypeVar
+
+from .accounting import submit_accounted
+from .resilience import RetryBudget
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Latencies of the most recent successful calls."""
+
+    def __init__(self, window: int = 200) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percentile: float) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return samples[index]
+
+
+class HedgingPolicy:
+    """
+    Sends a second copy of a slow call and takes whichever finishes first.
+
+    The hedge fires once the first call has been running longer than the
+    given percentile of recent latencies, so only the slowest few percent
+    of calls are duplicated. Latencies are tracked per key (e.g. per model)
+    since models differ widely in speed. Each call deposits into a budget
+    that every hedge draws from, capping the extra load at budget_ratio.
+    Nothing is hedged until min_samples latencies have been seen.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        budget_ratio: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+    ) -> None:
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self._latencies: dict[str, LatencyTracker] = {}
+        self.budget = RetryBudget(ratio=budget_ratio, min_per_second=0.0)
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def latencies(self, key: str = "default") -> LatencyTracker:
+        with self._lock:
+            tracker = self._latencies.get(key)
+            if tracker is None:
+                tracker = self._latencies[key] = LatencyTracker(self.window)
+            return tracker
+
+    def hedge_delay(self, key: str = "default") -> float | None:
+        latencies = self.latencies(key)
+        if len(latencies) < self.min_samples:
+            return None
+        return latencies.percentile(self.percentile)
+
+    def run(self, executor: Executor, call: Callable[[], T], key: str = "default") -> T:
+        self.budget.record_request()
+        delay = self.hedge_delay(key)
+        latencies = self.latencies(key)
+        first = submit_accounted(executor, self._timed, latencies, call)
+        try:
+            return first.result(timeout=delay)
+        except FuturesTimeoutError:
+            pass
+
+        if not self.budget.try_retry():
+            return first.result()
+
+        logger.debug(f"Hedging LLM call still running after {delay:.2f}s")
+        hedge = submit_accounted(executor, self._timed, latencies, call)
+        with self._lock:
+            self._hedges += 1
+
+        pending: set[Future[T]] = {first, hedge}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                future_error = future.exception()
+                if future_error is not None:
+                    error = future_error
+                    continue
+                # A call already in flight cannot be interrupted; this only
+                # stops the loser if it has not started yet. Its result is
+                # discarded either way.
+                for other in pending:
+                    other.cancel()
+                if future is hedge:
+                    with self._lock:
+                        self._hedge_wins += 1
+                return future.result()
+        assert error is not None
+        raise error
+
+    @staticmethod
+    def _timed(latencies: LatencyTracker, call: Callable[[], T]) -> T:
+        started = time.monotonic()
+        result = call()
+        latencies.record(time.monotonic() - started)
+        return result
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            keys = list(self._latencies)
+        delays = {key: self.hedge_delay(key) for key in keys}
+        with self._lock:
+            return {
+                "percentile": self.percentile,
+                "hedge_delay_ms": {
+                    key: None if delay is None else round(delay * 1000)
+                    for key, delay in delays.items()
+                },
+                "hedges": self._hedges,
+                "hedge_wins": self._hedge_wins,
+                "budget": self.budget.snapshot(),
+            }
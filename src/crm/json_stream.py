@@ -0,0 +1,82 @@
+import json
+
+
+class JsonObjectScanner:
+    """
+    Finds the first complete JSON object in text that arrives in pieces.
+
+    Anything before the opening brace (such as a markdown fence) is skipped,
+    and feed() reports as soon as the object closes so the caller can stop
+    reading. String items of the top-level `array_key` array are decoded as
+    they complete, so a truncated response still yields the items seen.
+    """
+
+    def __init__(self, array_key: str = "skills") -> None:
+        self.array_key = array_key
+        self.items: list[str] = []
+        self.closed = False
+        self._chunks: list[str] = []
+        self._depth = 0
+        self._array_depth: int | None = None
+        self._in_string = False
+        self._escaped = False
+        self._string: list[str] = []
+        self._last_key: str | None = None
+
+    @property
+    def text(self) -> str:
+        """The object's text so far, from its opening brace."""
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> bool:
+        """Scan the next piece of text; returns True once the object is closed."""
+        if self.closed:
+            return True
+
+        start = 0
+        if self._depth == 0:
+            start = chunk.find("{")
+            if start < 0:
+                return False
+
+        for index in range(start, len(chunk)):
+            char = chunk[index]
+            if self._in_string:
+                self._scan_string(char)
+            elif char == '"':
+                self._in_string = True
+                self._string = []
+            elif char in "{[":
+                self._depth += 1
+                if (
+                    char == "["
+                    and self._depth == 2
+                    and self._last_key == self.array_key
+                ):
+                    self._array_depth = self._depth
+            elif char in "}]":
+                if self._depth == self._array_depth:
+                    self._array_depth = None
+                self._depth -= 1
+                if self._depth == 0:
+                    self._chunks.append(chunk[start : index + 1])
+                    self.closed = True
+                    return True
+
+        self._chunks.append(chunk[start:])
+        return False
+
+    def _scan_string(self, char: str) -> None:
+        if self._escaped:
+            self._escaped = False
+        elif char == "\\":
+            self._escaped = True
+        elif char == '"':
+            self._in_string = False
+            value = json.loads('"' + "".join(self._string) + '"')
+            if self._depth == 1:
+                self._last_key = value
+            elif self._depth == self._array_depth:
+                self.items.append(value)
+            return
+        self._string.append(char)
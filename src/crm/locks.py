@@ -0,0 +1,75 @@
+import hashlib
+import logging
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+
+class ContactLocks:
+    """
+    Per-contact mutual exclusion for read-merge-write cycles.
+
+    Threads in this process serialize on a per-contact lock. When lock_dir is
+    set, an flock on a lock file additionally serializes uvicorn workers on the
+    same host. Contacts hash onto a fixed number of lock files so the directory
+    does not grow with the number of contacts.
+    """
+
+    def __init__(self, lock_dir: str | None = None, stripes: int = 4096) -> None:
+        self.lock_dir = Path(lock_dir) if lock_dir and fcntl is not None else None
+        self.stripes = stripes
+        self._locks: dict[str, tuple[threading.Lock, int]] = {}
+        self._guard = threading.Lock()
+
+        if self.lock_dir is not None:
+            self.lock_dir.mkdir(parents=True, exist_ok=True)
+
+    def _thread_lock(self, contact_id: str) -> threading.Lock:
+        with self._guard:
+            lock, users = self._locks.get(contact_id, (threading.Lock(), 0))
+            self._locks[contact_id] = (lock, users + 1)
+            return lock
+
+    def _release_thread_lock(self, contact_id: str) -> None:
+        with self._guard:
+            lock, users = self._locks[contact_id]
+            if users <= 1:
+                del self._locks[contact_id]
+            else:
+                self._locks[contact_id] = (lock, users - 1)
+
+    def _lock_path(self, contact_id: str) -> Path:
+        assert self.lock_dir is not None
+        digest = hashlib.sha1(contact_id.encode(), usedforsecurity=False).digest()
+        stripe = int.from_bytes(digest[:4], "big") % self.stripes
+        return self.lock_dir / f"contact-{stripe:04x}.lock"
+
+    @contextmanager
+    def lock(self, contact_id: str) -> Iterator[None]:
+        thread_lock = self._thread_lock(contact_id)
+        try:
+            with thread_lock:
+                if self.lock_dir is None:
+                    yield
+                    return
+
+                with open(self._lock_path(contact_id), "a") as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    try:
+                        yield
+                    finally:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            self._release_thread_lock(contact_id)
+
+    @property
+    def active(self) -> int:
+        return len(self._locks)
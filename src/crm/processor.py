@@ -1,26 +1,110 @@
 import logging
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, TypeVar
 
-from ..models import ExtractedSkills, SkillsExtractionResult
+from ..admission import RateLimiter
+from ..models import ExtractedSkills, ProcessingStats, SkillsExtractionResult
+from .accounting import accounting, submit_accounted
 from .document_processor import DocumentProcessor
-from .espocrm_client import EspoCRMClient
+from .espocrm_client import ContactConflictError, EspoCRMClient
+from .locks import ContactLocks
+from .quota import check_llm_quota, llm_quota
+from .resilience import TransientDependencyError
 from .skills_extractor import SkillsExtractor
+from .skills_merge import SkillsMerger, SkillsMergeResult
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Attachments processed per contact
+MAX_RESUME_ATTACHMENTS = 3
+
+
+@contextmanager
+def timed_stage(stats: ProcessingStats, stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.record_stage(stage, (time.perf_counter() - started) * 1000)
+
+
+def _timed_call(func: Callable[..., T], *args: Any) -> tuple[T, float]:
+    started = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - started) * 1000
+
 
 class ContactSkillsProcessor:
-    def __init__(self) -> None:
-        self.espocrm_client = EspoCRMClient()
-        self.document_processor = DocumentProcessor()
-        self.skills_extractor = SkillsExtractor()
+    def __init__(
+        self,
+        espocrm_client: EspoCRMClient | None = None,
+        document_processor: DocumentProcessor | None = None,
+        skills_extractor: SkillsExtractor | None = None,
+        skills_merger: SkillsMerger | None = None,
+        contact_locks: ContactLocks | None = None,
+        max_update_attempts: int = 3,
+        llm_limiter: RateLimiter | None = None,
+        tenant: str = "default",
+        io_executor: ThreadPoolExecutor | None = None,
+    ) -> None:
+        self.espocrm_client = espocrm_client or EspoCRMClient()
+        self.document_processor = document_processor or DocumentProcessor()
+        self.skills_extractor = skills_extractor or SkillsExtractor()
+        self.skills_merger = skills_merger or SkillsMerger()
+        self.contact_locks = contact_locks or ContactLocks()
+        self.max_update_attempts = max_update_attempts
+        self.llm_limiter = llm_limiter
+        self.tenant = tenant
+        self.io_executor = io_executor or ThreadPoolExecutor(
+            max_workers=2 + MAX_RESUME_ATTACHMENTS, thread_name_prefix="crm-io"
+        )
 
     def process_contact_skills(self, contact_id: str) -> SkillsExtractionResult:
+        stats = ProcessingStats()
+        started = time.perf_counter()
+        with accounting(stats):
+            result = self._process_contact_skills(contact_id, stats)
+        stats.total_ms = round((time.perf_counter() - started) * 1000, 3)
+        result.stats = stats
+        return result
+
+    def _process_contact_skills(
+        self, contact_id: str, stats: ProcessingStats
+    ) -> SkillsExtractionResult:
+        # The contact and its attachment list are independent reads, and every
+        # download can start as soon as the list is known; only parsing and
+        # extraction wait on them, in attachment order.
+        pending: list[Future[Any]] = []
         try:
-            contact = self.espocrm_client.get_contact(contact_id)
-            existing_skills = self._parse_existing_skills(contact.skills)
+            # A tenant over its LLM quota is requeued before any CRM work
+            check_llm_quota(self.llm_limiter, self.tenant)
+            contact_future = self._submit_io(
+                pending, self.espocrm_client.get_contact, contact_id
+            )
+            attachments_future = self._submit_io(
+                pending, self.espocrm_client.get_contact_attachments, contact_id
+            )
 
-            attachments = self.espocrm_client.get_contact_attachments(contact_id)
-            resume_attachments = self._filter_resume_attachments(attachments)
+            attachments, elapsed_ms = attachments_future.result()
+            stats.record_stage("list_attachments", elapsed_ms)
+            resume_attachments = self._filter_resume_attachments(attachments)[
+                :MAX_RESUME_ATTACHMENTS
+            ]
+            downloads = [
+                self._submit_io(
+                    pending, self.espocrm_client.download_attachment, attachment["id"]
+                )
+                for attachment in resume_attachments
+            ]
+
+            contact, elapsed_ms = contact_future.result()
+            stats.record_stage("fetch_contact", elapsed_ms)
+            existing_skills = self._parse_existing_skills(contact.skills)
 
             if not resume_attachments:
                 return SkillsExtractionResult(
@@ -36,21 +120,35 @@ class ContactSkillsProcessor:
                 )
 
             all_extracted_skills: list[str] = []
+            sources: list[str] = []
             confidence_sum = 0.0
             processed_count = 0
 
-            for attachment in resume_attachments[:3]:
+            for attachment, download in zip(resume_attachments, downloads, strict=True):
                 try:
-                    content = self.espocrm_client.download_attachment(attachment["id"])
+                    content, elapsed_ms = download.result()
+                    stats.record_stage("download", elapsed_ms)
                     if content:
-                        text = self.document_processor.extract_text(
-                            content, attachment["name"]
-                        )
-                        extracted = self.skills_extractor.extract_skills(text)
+                        with timed_stage(stats, "extract_text"):
+                            text = self.document_processor.extract_text(
+                                content, attachment["name"]
+                            )
+                        stats.add(chars_extracted=len(text))
+                        with (
+                            timed_stage(stats, "extract_skills"),
+                            llm_quota(self.llm_limiter, self.tenant),
+                        ):
+                            extracted = self.skills_extractor.extract_skills(text)
                         all_extracted_skills.extend(extracted.skills)
+                        # A chunked resume already reports its models joined
+                        for source in extracted.source.split("+"):
+                            if source not in sources:
+                                sources.append(source)
                         confidence_sum += extracted.confidence
                         processed_count += 1
 
+                except TransientDependencyError:
+                    raise
                 except Exception as e:
                     logger.warning(
                         f"Failed to process attachment {attachment['id']}: {e}"
@@ -70,7 +168,7 @@ class ContactSkillsProcessor:
                     error="Failed to extract skills from any attachment",
                 )
 
-            unique_extracted_skills = list(set(all_extracted_skills))
+            unique_extracted_skills = self.skills_merger.dedupe(all_extracted_skills)
             average_confidence = (
                 confidence_sum / processed_count if processed_count > 0 else 0.0
             )
@@ -78,34 +176,37 @@ class ContactSkillsProcessor:
             extracted_skills = ExtractedSkills(
                 skills=unique_extracted_skills,
                 confidence=average_confidence,
-                source="document_analysis",
+                source="+".join(sources),
             )
 
-            new_skills = [
-                skill
-                for skill in unique_extracted_skills
-                if skill.lower() not in [s.lower() for s in existing_skills]
-            ]
-
-            updated_skills = existing_skills + new_skills
+            merge = self.skills_merger.merge(existing_skills, unique_extracted_skills)
 
-            if new_skills:
-                success = self.espocrm_client.update_contact_skills(
-                    contact_id, updated_skills
+            if merge.changed:
+                with timed_stage(stats, "update_contact"):
+                    existing_skills, merge, success = self._apply_new_skills(
+                        contact_id, merge.new_skills
+                    )
+                updated_skills = (
+                    merge.updated_skills if merge.changed else existing_skills
                 )
             else:
+                # Canonical skill set is unchanged, so skip the PATCH entirely
+                updated_skills = existing_skills
                 success = True
 
             return SkillsExtractionResult(
                 contact_id=contact_id,
                 extracted_skills=extracted_skills,
                 existing_skills=existing_skills,
-                new_skills=new_skills,
+                new_skills=merge.new_skills,
                 updated_skills=updated_skills,
                 success=success,
                 error=None if success else "Failed to update contact",
             )
 
+        except TransientDependencyError:
+            # Nothing is known about the contact yet; let the caller retry later
+            raise
         except Exception as e:
             logger.error(f"Error processing skills for contact {contact_id}: {e}")
             return SkillsExtractionResult(
@@ -119,6 +220,57 @@ class ContactSkillsProcessor:
                 success=False,
                 error=str(e),
             )
+        finally:
+            # Reads still queued after an early return or error are not needed
+            for future in pending:
+                future.cancel()
+
+    def _submit_io(
+        self, pending: list[Future[Any]], func: Callable[..., T], *args: Any
+    ) -> "Future[tuple[T, float]]":
+        future = submit_accounted(self.io_executor, _timed_call, func, *args)
+        pending.append(future)
+        return future
+
+    def _apply_new_skills(
+        self, contact_id: str, new_skills: list[str]
+    ) -> tuple[list[str], SkillsMergeResult, bool]:
+        """
+        Add new_skills to the contact's current skills without losing writes.
+
+        The contact is re-read under a per-contact lock, so the delta is merged
+        onto the latest stored skills rather than the copy read before
+        extraction. The PATCH carries the record's versionNumber and is retried
+        on conflict.
+        """
+        with self.contact_locks.lock(contact_id):
+            for attempt in range(1, self.max_update_attempts + 1):
+                contact = self.espocrm_client.get_contact(contact_id)
+                existing_skills = self._parse_existing_skills(contact.skills)
+                merge = self.skills_merger.merge(existing_skills, new_skills)
+
+                if not merge.changed:
+                    # Another writer already stored these skills
+                    return existing_skills, merge, True
+
+                try:
+                    success = self.espocrm_client.update_contact_skills(
+                        contact_id,
+                        merge.updated_skills,
+                        version_number=contact.versionNumber,
+                    )
+                    return existing_skills, merge, success
+                except ContactConflictError:
+                    logger.info(
+                        f"Conflict updating skills for contact {contact_id} "
+                        f"(attempt {attempt}/{self.max_update_attempts})"
+                    )
+
+        logger.error(
+            f"Giving up on updating contact {contact_id} after "
+            f"{self.max_update_attempts} conflicting writes"
+        )
+        return existing_skills, merge, False
 
     def _parse_existing_skills(self, skills_text: str | None) -> list[str]:
         if not skills_text:
@@ -0,0 +1,57 @@
+import math
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from ..admission import RateLimiter
+from .resilience import TransientDependencyError
+
+_current_quota: ContextVar[tuple[RateLimiter, str] | None] = ContextVar(
+    "current_llm_quota", default=None
+)
+
+
+class QuotaExceededError(TransientDependencyError):
+    pass
+
+
+@contextmanager
+def llm_quota(limiter: RateLimiter | None, tenant: str) -> Iterator[None]:
+    """Charge LLM completions made until the block exits to the tenant's quota."""
+    token = _current_quota.set((limiter, tenant) if limiter is not None else None)
+    try:
+        yield
+    finally:
+        _current_quota.reset(token)
+
+
+def check_llm_quota(limiter: RateLimiter | None, tenant: str) -> None:
+    """
+    Raise QuotaExceededError if the tenant has no LLM quota left right now.
+
+    This is the only point a job is turned away: once admitted, its
+    completions are charged with take_llm_quota and never fail, so work
+    already paid for is not thrown away halfway through a contact.
+    """
+    if limiter is None:
+        return
+    wait = limiter.peek(tenant)
+    if wait <= 0:
+        return
+    if math.isinf(wait):
+        raise ValueError(f"LLM quota for tenant {tenant} is zero")
+    raise QuotaExceededError(
+        "llm", f"LLM quota for tenant {tenant} is used up", retry_after=wait
+    )
+
+
+def take_llm_quota() -> None:
+    """
+    Charge one completion to the current tenant's quota, if one applies. An
+    admitted job may run the quota into debt, which delays the tenant's
+    next job rather than failing this one.
+    """
+    quota = _current_quota.get()
+    if quota is not None:
+        limiter, tenant = quota
+        limiter.charge(tenant)
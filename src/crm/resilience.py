@@ -0,0 +1,231 @@
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, Literal, TypeVar
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+# HTTP statuses worth retrying: the request may succeed later unchanged
+TRANSIENT_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class TransientDependencyError(Exception):
+    """
+    A dependency is temporarily unavailable; the work should be retried later
+    rather than treated as having no data.
+    """
+
+    def __init__(
+        self, dependency: str, message: str, retry_after: float | None = None
+    ) -> None:
+        super().__init__(message)
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(TransientDependencyError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while a dependency keeps failing.
+
+    After failure_threshold consecutive transient failures the breaker opens
+    and rejects calls for reset_timeout_seconds. It then lets a single probe
+    call through (half-open); success closes it, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 30.0,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._state: BreakerState = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            if self._state == "open" and self._reset_due(time.monotonic()):
+                return "half_open"
+            return self._state
+
+    def _reset_due(self, now: float) -> bool:
+        return now - self._opened_at >= self.reset_timeout_seconds
+
+    def before_call(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self._state == "open" and self._reset_due(now):
+                self._state = "half_open"
+            if self._state == "closed":
+                return
+            if self._state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            retry_after = max(0.0, self.reset_timeout_seconds - (now - self._opened_at))
+        raise CircuitOpenError(
+            self.name, f"Circuit for {self.name} is open", retry_after=retry_after
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != "closed":
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = "closed"
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == "half_open" or (
+                self._state == "closed" and self._failures >= self.failure_threshold
+            ):
+                if self._state == "closed":
+                    logger.warning(
+                        f"Circuit for {self.name} opened after "
+                        f"{self._failures} consecutive failures"
+                    )
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {"state": state, "consecutive_failures": self._failures}
+
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of recent traffic, shared by all callers.
+
+    Every first attempt deposits `ratio` tokens and every retry withdraws one,
+    so retries can add at most `ratio` extra load; `min_per_second` keeps a
+    trickle of retries available when traffic is light.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        min_per_second: float = 1.0,
+        max_balance: float = 10.0,
+    ) -> None:
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_balance = max_balance
+        self._balance = max_balance
+        self._updated = time.monotonic()
+        self._exhausted = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, amount: float) -> None:
+        now = time.monotonic()
+        self._balance = min(
+            self.max_balance,
+            self._balance + amount + (now - self._updated) * self.min_per_second,
+        )
+        self._updated = now
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._refill(self.ratio)
+
+    def try_retry(self) -> bool:
+        with self._lock:
+            self._refill(0.0)
+            if self._balance < 1.0:
+                self._exhausted += 1
+                return False
+            self._balance -= 1.0
+            return True
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            self._refill(0.0)
+            return {"balance": round(self._balance, 2), "exhausted": self._exhausted}
+
+
+class ResilientCaller:
+    """
+    Runs calls to one dependency through its circuit breaker, retrying
+    transient failures with jittered backoff while the retry budget allows.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        is_transient: Callable[[Exception], bool],
+        breaker: CircuitBreaker | None = None,
+        budget: RetryBudget | None = None,
+        max_attempts: int = 3,
+        backoff_seconds: float = 0.2,
+    ) -> None:
+        self.name = name
+        self.is_transient = is_transient
+        self.breaker = breaker or CircuitBreaker(name)
+        self.budget = budget or RetryBudget()
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        self.budget.record_request()
+        attempt = 1
+        while True:
+            self.breaker.before_call()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if not self.is_transient(e):
+                    # The dependency answered; the request itself was bad
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.max_attempts or not self.budget.try_retry():
+                    raise TransientDependencyError(
+                        self.name, f"{self.name} unavailable: {e}"
+                    ) from e
+                delay = self.backoff_seconds * 2 ** (attempt - 1)
+                time.sleep(random.uniform(delay / 2, delay))
+                attempt += 1
+            else:
+                self.breaker.record_success()
+                return result
+
+    def snapshot(self) -> dict[str, Any]:
+        return {**self.breaker.snapshot(), "retry_budget": self.budget.snapshot()}
+
+
+def is_transient_http_error(error: Exception) -> bool:
+    # Imported here to avoid a cycle: the client module uses this module
+    from .espocrm_client import EspoAPIError
+
+    if isinstance(error, EspoAPIError):
+        return error.status_code in TRANSIENT_STATUS_CODES
+    return isinstance(error, requests.ConnectionError | requests.Timeout)
+
+
+def is_transient_llm_error(error: Exception) -> bool:
+    # openai is already loaded by the time a call has failed
+    import openai
+
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in TRANSIENT_STATUS_CODES
+    return isinstance(error, openai.APIConnectionError)
@@ -1,40 +1,271 @@
 import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
 
-from openai import OpenAI
+from ..models import ExtractedSkills
+from ..settings import settings
+from .accounting import account, submit_accounted
+from .budget import TokenBudget, estimate_tokens
+from .chunking import chunk_text
+from .hedging import HedgingPolicy
+from .json_stream import JsonObjectScanner
+from .quota import take_llm_quota
+from .resilience import CircuitOpenError, ResilientCaller, TransientDependencyError
+from .skills_merge import SkillsMerger
 
-from .models import ExtractedSkills
-from .settings import settings
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from openai.types.chat import ChatCompletionMessageParam
 
 logger = logging.getLogger(__name__)
 
+# Threads for hedged calls; losing calls hold theirs until they return
+HEDGE_WORKERS = 32
+
+# Confidence given to skills salvaged from output cut off by the token ceiling
+TRUNCATED_CONFIDENCE = 0.5
+
+
+def max_completions_per_resume() -> int:
+    """The most completions one extract_skills call can make, hedges aside."""
+    per_chunk = 2 if settings.llm_cheap_model else 1
+    if settings.llm_fallback_model:
+        # Any tier's call may fail over to the fallback model
+        per_chunk *= 2
+    return settings.llm_max_chunks * per_chunk
+
+
+class TierStats:
+    """Call counts and latency for one model tier of the cascade."""
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+        self.calls = 0
+        self.errors = 0
+        self.escalated = 0
+        self.total_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self.calls += 1
+            self.errors += error
+            self.total_seconds += seconds
+
+    def record_escalation(self) -> None:
+        with self._lock:
+            self.escalated += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            accepted = self.calls - self.errors - self.escalated
+            return {
+                "model": self.model,
+                "calls": self.calls,
+                "accepted": accepted,
+                "escalated": self.escalated,
+                "errors": self.errors,
+                "hit_rate": round(accepted / self.calls, 3) if self.calls else None,
+                "avg_latency_ms": (
+                    round(self.total_seconds / self.calls * 1000, 1)
+                    if self.calls
+                    else None
+                ),
+            }
+
 
 class SkillsExtractor:
-    def __init__(self) -> None:
-        self.client = OpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_base_url,
-        )
+    """
+    Extracts skills from resume text with an OpenAI-compatible LLM.
+
+    With a cheap model configured, every resume goes to it first and is
+    escalated to the primary model only when the result looks weak: too
+    low a confidence or too few skills.
+
+    Resumes over the chunking threshold are split on section headings and
+    the chunks extracted concurrently, then combined by SkillsMerger.
+    """
+
+    def __init__(
+        self,
+        caller: ResilientCaller | None = None,
+        hedging: HedgingPolicy | None = None,
+        budget: TokenBudget | None = None,
+        fallback_caller: ResilientCaller | None = None,
+    ) -> None:
+        self._client: OpenAI | None = None
+        self._fallback_client: OpenAI | None = None
         self.model = settings.openai_model
+        self.cheap_model = settings.llm_cheap_model
+        self.fallback_model = settings.llm_fallback_model
+        self.tiers = {"primary": TierStats(self.model)}
+        self.merger = SkillsMerger()
+        if self.cheap_model:
+            self.tiers["cheap"] = TierStats(self.cheap_model)
+        self.caller = caller
+        self.fallback_caller = fallback_caller
+        self.hedging = hedging
+        self.budget = budget
+        self._executor = (
+            ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="llm")
+            if hedging is not None
+            else None
+        )
+
+    @property
+    def client(self) -> "OpenAI":
+        # The openai package is heavy to import, so it loads on first use
+        if self._client is None:
+            from openai import OpenAI
+
+            self._client = OpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url,
+                timeout=settings.llm_timeout_seconds,
+                # Retries go through the shared retry budget instead
+                max_retries=0 if self.caller is not None else 2,
+            )
+        return self._client
+
+    @property
+    def fallback_client(self) -> "OpenAI":
+        if self._fallback_client is None:
+            from openai import OpenAI
+
+            self._fallback_client = OpenAI(
+                api_key=settings.llm_fallback_api_key or settings.openai_api_key,
+                base_url=settings.llm_fallback_base_url or settings.openai_base_url,
+                timeout=settings.llm_timeout_seconds,
+                # Retries go through the fallback's own caller, if any
+                max_retries=0,
+            )
+        return self._fallback_client
+
+    @property
+    def fallback_shares_endpoint(self) -> bool:
+        """Whether the fallback model is served by the primary's endpoint."""
+        return settings.llm_fallback_base_url in (None, "", settings.openai_base_url)
+
+    @property
+    def economising(self) -> bool:
+        """Whether the token budget is running low and cheaper paths apply."""
+        return self.budget is not None and self.budget.degraded
 
     def extract_skills(self, resume_text: str) -> ExtractedSkills:
+        if self.budget is not None:
+            # Over budget: fail as a transient error so the job is requeued
+            # for when usage has rolled off the window
+            self.budget.check()
+        if len(resume_text) <= settings.llm_chunk_threshold_chars:
+            return self._extract_document(resume_text)
+        return self._extract_chunked(resume_text)
+
+    def _extract_chunked(self, resume_text: str) -> ExtractedSkills:
+        """Extract from each section-aligned chunk concurrently and combine."""
+        chunks = chunk_text(
+            resume_text,
+            min(settings.llm_chunk_size_chars, settings.llm_chunk_threshold_chars),
+        )
+        if len(chunks) > settings.llm_max_chunks:
+            # Keeps what one resume can cost within the tenant's quota burst
+            logger.warning(
+                f"Resume split into {len(chunks)} chunks, extracting the first "
+                f"{settings.llm_max_chunks}"
+            )
+            chunks = chunks[: settings.llm_max_chunks]
+        logger.info(
+            f"Extracting skills from {len(chunks)} chunks of a "
+            f"{len(resume_text)}-character resume"
+        )
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(settings.llm_chunk_concurrency, len(chunks)),
+            thread_name_prefix="llm-chunk",
+        )
+        results: list[ExtractedSkills] = []
+        errors: list[ValueError] = []
+        try:
+            # A section such as references legitimately has few skills, so
+            # chunks escalate on confidence alone
+            futures = [
+                submit_accounted(executor, self._extract_document, chunk, 0)
+                for chunk in chunks
+            ]
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except ValueError as e:
+                    errors.append(e)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if not results:
+            raise errors[0]
+        if errors:
+            logger.warning(
+                f"{len(errors)} of {len(chunks)} chunks failed, "
+                f"combining the rest: {errors[0]}"
+            )
+        return self.merger.combine(results)
+
+    def _extract_document(
+        self, resume_text: str, min_skills: int | None = None
+    ) -> ExtractedSkills:
+        if min_skills is None:
+            min_skills = settings.llm_escalation_min_skills
         prompt = self._create_skills_extraction_prompt(resume_text)
+        if not self.cheap_model:
+            return self._extract_with_tier(prompt, "primary", self.model)
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            cheap = self._extract_with_tier(prompt, "cheap", self.cheap_model)
+        except TransientDependencyError:
+            # Both tiers share the endpoint, so escalating would not help
+            raise
+        except ValueError as e:
+            logger.info(f"Cheap model failed, escalating to {self.model}: {e}")
+        else:
+            if (
+                cheap.confidence >= settings.llm_escalation_min_confidence
+                and len(cheap.skills) >= min_skills
+            ):
+                return cheap
+            if self.economising:
+                logger.info("Token budget running low, keeping cheap model result")
+                return cheap
+            self.tiers["cheap"].record_escalation()
+            logger.info(
+                f"Escalating to {self.model}: cheap model returned "
+                f"{len(cheap.skills)} skills at confidence {cheap.confidence}"
+            )
+        return self._extract_with_tier(prompt, "primary", self.model)
+
+    def _extract_with_tier(self, prompt: str, tier: str, model: str) -> ExtractedSkills:
+        started = time.monotonic()
+        try:
+            extracted = self._extract(prompt, model)
+        except Exception:
+            self.tiers[tier].record(time.monotonic() - started, error=True)
+            raise
+        self.tiers[tier].record(time.monotonic() - started)
+        return extracted
+
+    def _extract(self, prompt: str, model: str) -> ExtractedSkills:
+        try:
+            content, used_fallback = self._complete(
+                [
                     {
                         "role": "system",
                         "content": "You are an expert resume analyzer. Extract technical and professional skills from resumes accurately. Return only valid JSON with no additional text.",
                     },
                     {"role": "user", "content": prompt},
                 ],
-                temperature=0.1,
-                max_tokens=2000,
+                model,
             )
 
-            content = response.choices[0].message.content
             if not content:
                 raise ValueError("Empty response from LLM")
 
@@ -51,9 +282,15 @@ class SkillsExtractor:
             return ExtractedSkills(
                 skills=skills,
                 confidence=confidence,
-                source="gemini-1.5-flash",
+                source=(
+                    self.fallback_model
+                    if used_fallback and self.fallback_model
+                    else model
+                ),
             )
 
+        except TransientDependencyError:
+            raise
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse LLM response as JSON: {e}")
             raise ValueError(f"Invalid JSON response from LLM: {e}")
@@ -61,6 +298,160 @@ class SkillsExtractor:
             logger.error(f"Error extracting skills: {e}")
             raise ValueError(f"Skills extraction failed: {e}")
 
+    def _complete(
+        self, messages: list["ChatCompletionMessageParam"], model: str
+    ) -> tuple[str | None, bool]:
+        """Run the completion, falling back to the fallback model on failure."""
+
+        def create() -> str | None:
+            return self._request_content(self.client, model, messages)
+
+        def primary() -> str | None:
+            return self.caller.call(create) if self.caller is not None else create()
+
+        # Charged per completion rather than per document, since escalation
+        # and chunking make several; hedges are capped by their own budget
+        take_llm_quota()
+        try:
+            if (
+                self.hedging is not None
+                and self._executor is not None
+                and not self.economising
+            ):
+                return self.hedging.run(self._executor, primary, key=model), False
+            return primary(), False
+        except Exception as e:
+            fallback_model = self.fallback_model
+            if not fallback_model:
+                raise
+            if isinstance(e, CircuitOpenError) and self.fallback_shares_endpoint:
+                # The endpoint is known to be down; trying it again with
+                # another model would only wait out a timeout
+                raise
+            logger.warning(
+                f"LLM call failed, retrying with fallback model {fallback_model}: {e}"
+            )
+
+            take_llm_quota()
+
+            def create_fallback() -> str | None:
+                return self._request_content(
+                    self.fallback_client, fallback_model, messages
+                )
+
+            try:
+                if self.fallback_caller is not None:
+                    content = self.fallback_caller.call(create_fallback)
+                else:
+                    content = create_fallback()
+            except Exception as fallback_error:
+                logger.warning(f"Fallback LLM call failed: {fallback_error}")
+                # Surface the primary error so transient outages are retried
+                raise e
+            return content, True
+
+    def _request_content(
+        self,
+        client: "OpenAI",
+        model: str,
+        messages: list["ChatCompletionMessageParam"],
+    ) -> str | None:
+        if settings.llm_streaming:
+            return self._stream_content(client, model, messages)
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0.1,
+            max_tokens=settings.llm_max_output_tokens,
+        )
+        usage = response.usage
+        self._record_usage(
+            usage.prompt_tokens if usage is not None else 0,
+            usage.completion_tokens if usage is not None else 0,
+        )
+        return response.choices[0].message.content
+
+    def _stream_content(
+        self,
+        client: "OpenAI",
+        model: str,
+        messages: list["ChatCompletionMessageParam"],
+    ) -> str | None:
+        """
+        Stream the completion and stop reading as soon as the JSON object
+        closes, so tokens the model generates after it are never waited for.
+        """
+        scanner = JsonObjectScanner("skills")
+        received = 0
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0.1,
+            max_tokens=settings.llm_max_output_tokens,
+            stream=True,
+        )
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                received += len(delta)
+                if scanner.feed(delta):
+                    return scanner.text
+        finally:
+            # Closing the response early drops the rest of the generation
+            stream.close()
+            # Usage only arrives at the end of a stream, which is not read
+            self._record_usage(
+                estimate_tokens("".join(str(m.get("content", "")) for m in messages)),
+                received // 4,
+            )
+
+        if scanner.items:
+            # Cut off by the token ceiling mid-array: keep the skills that
+            # did arrive, with a confidence low enough to trigger escalation
+            logger.warning(
+                f"LLM output hit {settings.llm_max_output_tokens} tokens before "
+                f"the JSON closed; keeping {len(scanner.items)} skills"
+            )
+            return json.dumps(
+                {"skills": scanner.items, "confidence": TRUNCATED_CONFIDENCE}
+            )
+        return scanner.text or None
+
+    def _record_usage(self, prompt_tokens: int, completion_tokens: int) -> None:
+        account(
+            llm_calls=1,
+            llm_prompt_tokens=prompt_tokens,
+            llm_completion_tokens=completion_tokens,
+        )
+        if self.budget is not None:
+            self.budget.record(prompt_tokens, completion_tokens)
+
+    def tier_stats(self) -> dict[str, dict[str, Any]]:
+        return {tier: stats.snapshot() for tier, stats in self.tiers.items()}
+
+    def hedging_stats(self) -> dict[str, Any] | None:
+        """Hedge counts, wins and budget balance, if hedging is enabled."""
+        return self.hedging.snapshot() if self.hedging is not None else None
+
+    def health_check(self) -> bool:
+        try:
+            self.client.models.list()
+            return True
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._client is not None:
+            self._client.close()
+        if self._fallback_client is not None:
+            self._fallback_client.close()
+
     def _create_skills_extraction_prompt(self, resume_text: str) -> str:
         return f"""
 Analyze the following resume text and extract all technical and professional skills.
@@ -83,5 +474,5 @@ Where:
 - confidence: float between 0.0 and 1.0 representing extraction confidence
 
 Resume text:
-{resume_text[:8000]}
+{resume_text[: settings.llm_chunk_threshold_chars]}
 """
@@ -0,0 +1,137 @@
+import re
+import unicodedata
+from collections.abc import Iterable
+
+from pydantic import BaseModel
+
+from ..models import ExtractedSkills
+
+# Canonical keys that refer to the same skill. Keys and values are already
+# normalized (case-folded, single-spaced).
+SKILL_ALIASES: dict[str, str] = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "node js": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "react js": "react",
+    "vuejs": "vue.js",
+    "vue": "vue.js",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "amazon web services": "aws",
+    "google cloud platform": "gcp",
+    "google cloud": "gcp",
+    "ms excel": "excel",
+    "microsoft excel": "excel",
+    "ml": "machine learning",
+    "c sharp": "c#",
+    "cpp": "c++",
+}
+
+_EDGE_CHARACTERS = " \t\r\n,;:!?\"'`()[]{}<>*•·–—"
+_SEPARATORS = re.compile(r"[\s_\-]+")
+
+
+class SkillNormalizer:
+    def __init__(self, aliases: dict[str, str] | None = None) -> None:
+        self.aliases = SKILL_ALIASES if aliases is None else aliases
+
+    def canonical(self, skill: str) -> str:
+        key = unicodedata.normalize("NFKC", skill).casefold()
+        key = key.strip(_EDGE_CHARACTERS).rstrip(".")
+        key = _SEPARATORS.sub(" ", key).strip()
+        return self.aliases.get(key, key)
+
+
+class SkillsMergeResult(BaseModel):
+    new_skills: list[str]
+    updated_skills: list[str]
+    changed: bool
+
+
+class SkillsMerger:
+    """
+    Merges extracted skills into a contact's existing skills.
+
+    Skills are compared by canonical key through a hash index, so the merge is
+    linear in the number of skills. Existing skills keep their spelling and
+    order; new skills are appended in the order they were extracted.
+    """
+
+    def __init__(self, normalizer: SkillNormalizer | None = None) -> None:
+        self.normalizer = normalizer or SkillNormalizer()
+
+    def dedupe(self, skills: Iterable[str]) -> list[str]:
+        seen: set[str] = set()
+        unique = []
+        for skill in skills:
+            key = self.normalizer.canonical(skill)
+            if key and key not in seen:
+                seen.add(key)
+                unique.append(skill.strip())
+        return unique
+
+    def merge(self, existing: list[str], extracted: list[str]) -> SkillsMergeResult:
+        updated_skills = self.dedupe(existing)
+        index = {self.normalizer.canonical(skill) for skill in updated_skills}
+
+        new_skills = []
+        for skill in extracted:
+            key = self.normalizer.canonical(skill)
+            if key and key not in index:
+                index.add(key)
+                new_skills.append(skill.strip())
+
+        return SkillsMergeResult(
+            new_skills=new_skills,
+            updated_skills=updated_skills + new_skills,
+            changed=bool(new_skills),
+        )
+
+    def combine(self, results: list[ExtractedSkills]) -> ExtractedSkills:
+        """
+        Combine extractions from the chunks of one document.
+
+        Each skill scores the summed confidence of the chunks that found it,
+        keeps the spelling of the most confident of them, and skills are
+        ordered by score, then by first appearance. The overall confidence
+        is the chunks' average weighted by how many skills each found, so a
+        chunk with nothing in it (say, references) does not drag it down.
+        """
+        scores: dict[str, float] = {}
+        spelling: dict[str, tuple[float, str]] = {}
+        weighted_confidence = 0.0
+        skill_count = 0
+        sources: list[str] = []
+
+        for result in results:
+            if result.source not in sources:
+                sources.append(result.source)
+            unique = self.dedupe(result.skills)
+            weighted_confidence += result.confidence * len(unique)
+            skill_count += len(unique)
+            for skill in unique:
+                key = self.normalizer.canonical(skill)
+                scores[key] = scores.get(key, 0.0) + result.confidence
+                if key not in spelling or result.confidence > spelling[key][0]:
+                    spelling[key] = (result.confidence, skill)
+
+        ranked = sorted(scores, key=lambda key: -scores[key])
+        return ExtractedSkills(
+            skills=[spelling[key][1] for key in ranked],
+            confidence=(
+                weighted_confidence / skill_count
+                if skill_count
+                else min((result.confidence for result in results), default=0.0)
+            ),
+            source="+".join(sources),
+        )
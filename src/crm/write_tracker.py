@@ -0,0 +1,75 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from .skills_merge import SkillNormalizer
+
+
+class RecentWrites:
+    """
+    Remembers the skills this service recently wrote to each contact.
+
+    EspoCRM answers our own PATCH with a Contact update webhook. Events whose
+    skills (or modifiedAt) match a write we made within the TTL are our own
+    echo and can be dropped at ingress.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int = 10000,
+        normalizer: SkillNormalizer | None = None,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.normalizer = normalizer or SkillNormalizer()
+        self.suppressed = 0
+        self._writes: OrderedDict[str, tuple[float, str, str | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def skills_hash(self, skills: list[str]) -> str:
+        keys = sorted({self.normalizer.canonical(skill) for skill in skills} - {""})
+        return hashlib.sha256("\n".join(keys).encode()).hexdigest()
+
+    def record(
+        self, contact_id: str, skills: list[str], modified_at: str | None = None
+    ) -> None:
+        entry = (
+            time.monotonic() + self.ttl_seconds,
+            self.skills_hash(skills),
+            modified_at,
+        )
+        with self._lock:
+            self._writes[contact_id] = entry
+            self._writes.move_to_end(contact_id)
+            while len(self._writes) > self.max_entries:
+                self._writes.popitem(last=False)
+
+    def is_own_write(
+        self,
+        contact_id: str,
+        skills: str | None = None,
+        modified_at: str | None = None,
+    ) -> bool:
+        with self._lock:
+            entry = self._writes.get(contact_id)
+            if entry is None:
+                return False
+            expires_at, skills_hash, written_modified_at = entry
+            if expires_at < time.monotonic():
+                del self._writes[contact_id]
+                return False
+
+        if skills is not None:
+            matched = self.skills_hash(skills.split(",")) == skills_hash
+        elif modified_at is not None:
+            matched = modified_at == written_modified_at
+        else:
+            # An event without either field cannot be told apart from a real edit
+            matched = False
+
+        if matched:
+            with self._lock:
+                self.suppressed += 1
+        return matched
@@ -0,0 +1,108 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from fastapi import Request
+
+from .models import DependencyHealth
+
+logger = logging.getLogger(__name__)
+
+
+class HealthProber:
+    """
+    Checks dependencies on a fixed interval and caches the results.
+
+    Health endpoints read the cached snapshot, so probes never wait on the
+    dependencies themselves. Blocking checks run in worker threads.
+    """
+
+    def __init__(
+        self,
+        checks: dict[str, Callable[[], bool]],
+        interval_seconds: float,
+        timeout_seconds: float,
+    ) -> None:
+        self.checks = checks
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.status: dict[str, DependencyHealth] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    async def _check(self, name: str, check: Callable[[], bool]) -> DependencyHealth:
+        started = time.perf_counter()
+        error: str | None = None
+        try:
+            healthy = bool(
+                await asyncio.wait_for(
+                    asyncio.to_thread(check), timeout=self.timeout_seconds
+                )
+            )
+        except TimeoutError:
+            healthy = False
+            error = f"Timed out after {self.timeout_seconds}s"
+        except Exception as e:
+            healthy = False
+            error = str(e)
+
+        return DependencyHealth(
+            name=name,
+            healthy=healthy,
+            latency_ms=round((time.perf_counter() - started) * 1000, 2),
+            checked_at=datetime.now(UTC),
+            error=error,
+        )
+
+    async def probe_once(self) -> dict[str, DependencyHealth]:
+        results = await asyncio.gather(
+            *(self._check(name, check) for name, check in self.checks.items())
+        )
+        for result in results:
+            previous = self.status.get(result.name)
+            if previous is not None and previous.healthy == result.healthy:
+                continue
+            if result.healthy:
+                logger.info(f"{result.name} connection established")
+            else:
+                logger.warning(f"{result.name} connection failed: {result.error}")
+        self.status = {result.name: result for result in results}
+        return self.status
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe_once()
+            except Exception as e:
+                logger.error(f"Health probe failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def is_stale(self, name: str, now: datetime | None = None) -> bool:
+        result = self.status.get(name)
+        if result is None:
+            return True
+        now = now or datetime.now(UTC)
+        age = (now - result.checked_at).total_seconds()
+        return age > self.interval_seconds * 3
+
+    def is_healthy(self, name: str) -> bool:
+        result = self.status.get(name)
+        return result is not None and result.healthy and not self.is_stale(name)
+
+
+def get_health_prober(request: Request) -> HealthProber:
+    prober: HealthProber = request.app.state.health_prober
+    return prober
@@ -0,0 +1,205 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import UTC, datetime
+
+from fastapi import Request
+
+from .models import JobStatus, SkillsExtractionResult
+
+
+class JobStore:
+    """
+    Bounded, expiring status records for queued jobs.
+
+    Entries are kept in order of their last update and expire ttl_seconds
+    after it; past max_entries the least recently updated job is dropped, so
+    memory stays flat under sustained load. Only finished jobs are dropped:
+    admission already bounds how many are queued or running, and a job must
+    stay claimable until it has run. Waiters on other threads' event
+    loops are woken through call_soon_threadsafe when a job finishes.
+
+    The latest unfinished job for each contact is indexed so callers can join
+    it instead of doing the same work twice, and the time each contact's job
+    last started is kept (for up to max_entries contacts) so changes it has
+    already seen are not queued again.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._jobs: OrderedDict[str, tuple[float, JobStatus]] = OrderedDict()
+        self._active: dict[tuple[str, str], str] = {}
+        self._started: OrderedDict[tuple[str, str], datetime] = OrderedDict()
+        self._waiters: dict[
+            str, list[tuple[asyncio.AbstractEventLoop, asyncio.Future[JobStatus]]]
+        ] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _store(self, job: JobStatus, now: float) -> None:
+        self._jobs[job.id] = (now + self.ttl_seconds, job)
+        self._jobs.move_to_end(job.id)
+        excess = len(self._jobs) - self.max_entries
+        dropped = []
+        for expires_at, oldest in self._jobs.values():
+            if expires_at >= now and excess <= 0:
+                break
+            if oldest.finished:
+                dropped.append(oldest.id)
+                excess -= 1
+        for job_id in dropped:
+            del self._jobs[job_id]
+            self._waiters.pop(job_id, None)
+
+    def _forget_active(self, job: JobStatus) -> None:
+        key = (job.tenant, job.contact_id)
+        if self._active.get(key) == job.id:
+            del self._active[key]
+
+    def create(self, tenant: str, contact_id: str, priority: str) -> JobStatus:
+        job = JobStatus(
+            id=uuid.uuid4().hex,
+            tenant=tenant,
+            contact_id=contact_id,
+            priority=priority,
+            created_at=datetime.now(UTC),
+        )
+        with self._lock:
+            self._store(job, time.monotonic())
+            self._active[(tenant, contact_id)] = job.id
+        return job.model_copy()
+
+    def find_active(self, tenant: str, contact_id: str) -> JobStatus | None:
+        """Return the queued or running job for a contact, if there is one."""
+        with self._lock:
+            job_id = self._active.get((tenant, contact_id))
+        if job_id is None:
+            return None
+        job = self.get(job_id)
+        return job if job is not None and not job.finished else None
+
+    def last_started(self, tenant: str, contact_id: str) -> datetime | None:
+        """When a job for the contact last started running, if known."""
+        with self._lock:
+            return self._started.get((tenant, contact_id))
+
+    def get(self, job_id: str) -> JobStatus | None:
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return None
+            expires_at, job = entry
+            if expires_at < time.monotonic() and job.finished:
+                del self._jobs[job_id]
+                self._waiters.pop(job_id, None)
+                self._forget_active(job)
+                return None
+            return job.model_copy()
+
+    def _update(self, job_id: str, **changes: object) -> JobStatus | None:
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return None
+            job = entry[1].model_copy(update=changes)
+            self._store(job, time.monotonic())
+            waiters = []
+            if job.finished:
+                waiters = self._waiters.pop(job_id, [])
+                self._forget_active(job)
+
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future, job)
+            except RuntimeError:
+                # The waiting request's loop has already shut down
+                pass
+        return job
+
+    def claim(self, job_id: str) -> bool:
+        """
+        Move a queued job to running. Returns False if someone else already
+        started it or the job is unknown, so each job is run once however
+        many paths pick it up.
+        """
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None or entry[1].state != "queued":
+                return False
+            started_at = datetime.now(UTC)
+            job = entry[1].model_copy(
+                update={
+                    "state": "running",
+                    "started_at": started_at,
+                    "attempts": entry[1].attempts + 1,
+                }
+            )
+            self._store(job, time.monotonic())
+            key = (job.tenant, job.contact_id)
+            self._started[key] = started_at
+            self._started.move_to_end(key)
+            if len(self._started) > self.max_entries:
+                self._started.popitem(last=False)
+            return True
+
+    def requeue(self, job_id: str, error: str | None) -> None:
+        """Put a started job back to queued, e.g. to retry after an outage."""
+        self._update(job_id, state="queued", error=error)
+
+    def finish(
+        self,
+        job_id: str,
+        result: SkillsExtractionResult | None,
+        error: str | None,
+        retryable: bool = False,
+        retry_after: float | None = None,
+    ) -> None:
+        succeeded = result is not None and result.success
+        self._update(
+            job_id,
+            state="succeeded" if succeeded else "failed",
+            finished_at=datetime.now(UTC),
+            result=result,
+            error=error or (result.error if result is not None else None),
+            retryable=retryable,
+            retry_after=retry_after,
+        )
+
+    async def wait(self, job_id: str, timeout: float) -> JobStatus | None:
+        """Return the job once it finishes, or its current status on timeout."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[JobStatus] = loop.create_future()
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return None
+            if entry[1].finished:
+                return entry[1].model_copy()
+            self._waiters.setdefault(job_id, []).append((loop, future))
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except TimeoutError:
+            return self.get(job_id)
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(job_id)
+                if waiters and (loop, future) in waiters:
+                    waiters.remove((loop, future))
+                    if not waiters:
+                        del self._waiters[job_id]
+
+
+def _resolve(future: asyncio.Future[JobStatus], job: JobStatus) -> None:
+    if not future.done():
+        future.set_result(job.model_copy())
+
+
+def get_job_store(request: Request) -> JobStore:
+    job_store: JobStore = request.app.state.job_store
+    return job_store
@@ -1,20 +1,56 @@
+import asyncio
+import hashlib
+import math
+import time
+import zipfile
 from collections.abc import AsyncGenerator
+from concurrent.futures import Executor
 from contextlib import asynccontextmanager
-from datetime import datetime, timezone
+from datetime import UTC, datetime
+from functools import partial
 from typing import Any
 
 import structlog
-from fastapi import BackgroundTasks, Body, FastAPI, File, HTTPException, Request, UploadFile
-from fastapi.responses import JSONResponse
-
-from .crm import EspoCRMClient
-from .crm.document_processor import DocumentProcessor
+from fastapi import (
+    Body,
+    Depends,
+    FastAPI,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+)
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from starlette.datastructures import FormData
+
+from .admission import AdmissionController, RateLimiter
+from .batch import (
+    BatchItem,
+    item_from_upload,
+    items_from_ndjson,
+    items_from_zip,
+    run_batch,
+)
+from .crm.budget import TokenBudget
 from .crm.processor import ContactSkillsProcessor
-from .crm.skills_extractor import SkillsExtractor
-from .models import EspoCRMWebhookPayload
+from .crm.quota import QuotaExceededError
+from .crm.resilience import TransientDependencyError
+from .health import HealthProber, get_health_prober
+from .jobs import JobStore, get_job_store
+from .models import JobStatus, parse_webhook_events
+from .scheduler import JobScheduler, Priority, RetryLater, get_scheduler
+from .security import SIGNATURE_HEADER, verify_webhook_signature
+from .services import Services, get_services
 from .settings import settings
+from .startup import FirstRequestTimer, process_uptime_seconds
+from .sync import ChangePoller, SyncStateStore, get_change_poller
+from .tenants import DEFAULT_TENANT, Tenant
+from .usage import UsageAggregator, get_usage
 
 VERSION = "0.1.0"
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
 structlog.configure(
     processors=[
@@ -37,20 +73,111 @@ structlog.configure(
 logger = structlog.get_logger(__name__)
 
 
+def defer_for_budget(budget: TokenBudget, priority: Priority) -> bool:
+    """
+    Hold backfill jobs while the LLM token budget runs low, and webhook jobs
+    too once it is spent; manual requests always run.
+    """
+    if priority == Priority.INTERACTIVE:
+        return False
+    state = budget.state
+    if priority == Priority.BACKFILL:
+        return state != "ok"
+    return state == "exhausted"
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("Starting 508 Integrations Service")
+    startup_started = time.perf_counter()
 
-    espocrm_client = EspoCRMClient()
-    if espocrm_client.health_check():
-        logger.info("EspoCRM connection established")
-    else:
-        logger.warning("EspoCRM connection failed")
+    services = Services.create()
+    app.state.services = services
+
+    scheduler = JobScheduler(
+        workers=settings.worker_count,
+        max_per_tenant=settings.max_jobs_per_tenant,
+        reserved={
+            Priority.INTERACTIVE: min(
+                settings.interactive_reserved_workers, settings.worker_count - 1
+            )
+        },
+        defer=partial(defer_for_budget, services.token_budget),
+    )
+    app.state.scheduler = scheduler
+    scheduler.start()
+    job_store = JobStore(
+        settings.job_status_max_entries, settings.job_status_ttl_seconds
+    )
+    app.state.job_store = job_store
+    usage = UsageAggregator(settings.usage_retention_minutes)
+    app.state.usage = usage
+
+    checks = {
+        "espocrm" if name == DEFAULT_TENANT else f"espocrm:{name}": (
+            tenant.espocrm_client.health_check
+        )
+        for name, tenant in services.tenants.items()
+    }
+    checks["llm"] = services.skills_extractor.health_check
+    health_prober = HealthProber(
+        checks=checks,
+        interval_seconds=settings.health_check_interval_seconds,
+        timeout_seconds=settings.health_check_timeout_seconds,
+    )
+    app.state.health_prober = health_prober
+
+    # Dependency checks run in the background so a slow CRM never delays boot
+    health_prober.start()
+
+    change_poller = None
+    if settings.sync_enabled:
+        change_poller = ChangePoller(
+            services.tenants,
+            job_store,
+            partial(enqueue_synced_contact, scheduler, job_store, usage),
+            SyncStateStore(settings.sync_state_dir),
+            min_interval_seconds=settings.sync_min_interval_seconds,
+            max_interval_seconds=settings.sync_max_interval_seconds,
+            min_page_size=settings.sync_min_page_size,
+            max_page_size=settings.sync_max_page_size,
+            initial_lookback_seconds=settings.sync_initial_lookback_hours * 3600,
+        )
+        change_poller.start()
+    app.state.change_poller = change_poller
+
+    startup_seconds = time.perf_counter() - startup_started
+    logger.info(
+        "Startup complete",
+        startup_ms=round(startup_seconds * 1000, 1),
+        process_uptime_ms=round(process_uptime_seconds() * 1000, 1),
+    )
+    if startup_seconds > settings.startup_budget_seconds:
+        logger.warning(
+            "Startup exceeded budget",
+            startup_ms=round(startup_seconds * 1000, 1),
+            budget_ms=settings.startup_budget_seconds * 1000,
+        )
 
     yield
 
     logger.info("Shutting down 508 Integrations Service")
-
+    if change_poller is not None:
+        await change_poller.stop()
+    await health_prober.stop()
+    await asyncio.to_thread(scheduler.stop, settings.shutdown_timeout_seconds)
+    services.close()
+
+
+admission = AdmissionController(
+    RateLimiter(
+        rate_per_second=settings.rate_limit_per_minute / 60,
+        burst=settings.rate_limit_burst,
+    ),
+    max_events_per_payload=settings.max_events_per_payload,
+    max_inflight_jobs=settings.max_inflight_jobs,
+    shed_retry_after_seconds=settings.shed_retry_after_seconds,
+)
 
 app = FastAPI(
     title="508 Integrations",
@@ -58,11 +185,82 @@ app = FastAPI(
     version=VERSION,
     lifespan=lifespan,
 )
+app.add_middleware(FirstRequestTimer)
 
 
-def process_contact_skills_background(contact_id: str) -> None:
+def _source_key(request: Request) -> str:
+    # Keyed by client IP only: the service checks no API keys, so a header the
+    # caller chooses would let it dodge its bucket by changing the value
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def _too_many_requests(detail: str, retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=429, detail=detail, headers={"Retry-After": str(retry_after)}
+    )
+
+
+def _service_unavailable(detail: Any, retry_after: float | None) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after or 0)))},
+    )
+
+
+def _admit(tenant: Tenant, source: str, jobs: int, take: bool = True) -> None:
+    retry_after = admission.shed_retry_after(jobs)
+    if retry_after is not None:
+        logger.warning(
+            "Shedding load", in_flight=admission.in_flight, requested_jobs=jobs
+        )
+        raise _too_many_requests("Service is overloaded", retry_after)
+
+    retry_after = admission.rate_retry_after(
+        f"{tenant.name}:{source}", jobs, take=take, limiter=tenant.rate_limiter
+    )
+    if retry_after is not None:
+        logger.warning("Rate limit exceeded", source=source, requested_jobs=jobs)
+        raise _too_many_requests("Rate limit exceeded", retry_after)
+
+
+def _get_tenant(services: Services, name: str) -> Tenant:
+    tenant = services.tenants.get(name)
+    if tenant is None:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant '{name}'")
+    return tenant
+
+
+def _webhook_payload_error(error: ValidationError) -> str | list[Any]:
+    first = error.errors()[0]
+    if first["type"] == "json_invalid":
+        return "Payload must be valid JSON"
+    if first["type"] == "list_type" and not first["loc"]:
+        return "Payload must be an array of webhook events"
+    return error.errors(include_url=False, include_context=False, include_input=False)
+
+
+def process_contact_skills_background(
+    processor: ContactSkillsProcessor,
+    contact_id: str,
+    job_store: JobStore | None = None,
+    job_id: str | None = None,
+    usage: UsageAggregator | None = None,
+    attempt: int = 1,
+    quota_waits: int = 0,
+) -> None:
+    if job_store is not None and job_id is not None and not job_store.claim(job_id):
+        # Already run inline by a waiting /process-contact request, which also
+        # released this job's admission slot
+        return
+
+    result = None
+    error = None
+    unavailable: TransientDependencyError | None = None
+    retry_delay = None
+    next_attempt = attempt + 1
+    next_quota_waits = quota_waits
     try:
-        processor = ContactSkillsProcessor()
         result = processor.process_contact_skills(contact_id)
 
         if result.success:
@@ -71,54 +269,253 @@ def process_contact_skills_background(contact_id: str) -> None:
                 contact_id=contact_id,
                 new_skills_count=len(result.new_skills),
                 total_skills_count=len(result.updated_skills),
+                **result.stats.model_dump(),
             )
         else:
             logger.error(
                 "Failed to process contact skills",
                 contact_id=contact_id,
                 error=result.error,
+                **result.stats.model_dump(),
             )
 
+    except QuotaExceededError as e:
+        # Quota is checked before any work, so waiting for it costs nothing and
+        # has its own, larger bound than dependency outages; the worker is
+        # freed for other tenants meanwhile
+        error = str(e)
+        unavailable = e
+        if quota_waits < settings.llm_quota_max_requeues:
+            retry_delay = e.retry_after or 1.0
+            next_attempt = attempt
+            next_quota_waits = quota_waits + 1
+            logger.info(
+                "Tenant LLM quota used up, requeueing contact",
+                tenant=processor.tenant,
+                contact_id=contact_id,
+                quota_waits=next_quota_waits,
+                retry_in_seconds=round(retry_delay, 1),
+            )
+        else:
+            logger.error(
+                "Tenant LLM quota used up, giving up on contact",
+                tenant=processor.tenant,
+                contact_id=contact_id,
+                quota_waits=quota_waits,
+            )
+    except TransientDependencyError as e:
+        error = str(e)
+        unavailable = e
+        if attempt <= settings.transient_max_requeues:
+            retry_delay = max(
+                e.retry_after or 0.0,
+                settings.transient_requeue_delay_seconds * 2 ** (attempt - 1),
+            )
+            logger.warning(
+                "Dependency unavailable, requeueing contact",
+                contact_id=contact_id,
+                dependency=e.dependency,
+                attempt=attempt,
+                retry_in_seconds=round(retry_delay, 1),
+            )
+        else:
+            logger.error(
+                "Dependency unavailable, giving up on contact",
+                contact_id=contact_id,
+                dependency=e.dependency,
+                attempts=attempt,
+            )
     except Exception as e:
+        error = str(e)
         logger.error(
             "Unexpected error processing contact skills",
             contact_id=contact_id,
-            error=str(e),
+            error=error,
             exc_info=True,
         )
+    finally:
+        if retry_delay is None:
+            admission.job_finished()
+            if usage is not None:
+                usage.record(
+                    processor.tenant,
+                    result.stats if result is not None else None,
+                    success=result is not None and result.success,
+                )
+            if job_store is not None and job_id is not None:
+                job_store.finish(
+                    job_id,
+                    result,
+                    error,
+                    retryable=unavailable is not None,
+                    retry_after=unavailable.retry_after if unavailable else None,
+                )
+
+    if retry_delay is not None:
+        # The job keeps its admission slot and status record while it waits
+        if job_store is not None and job_id is not None:
+            job_store.requeue(job_id, error)
+        raise RetryLater(
+            retry_delay,
+            processor,
+            contact_id,
+            job_store,
+            job_id,
+            usage,
+            next_attempt,
+            next_quota_waits,
+        )
+
+
+def _enqueue_contact(
+    tenant: Tenant,
+    contact_id: str,
+    priority: Priority,
+    scheduler: JobScheduler,
+    job_store: JobStore,
+    usage: UsageAggregator,
+) -> JobStatus:
+    job = job_store.create(tenant.name, contact_id, priority.value)
+    scheduler.submit(
+        tenant.name,
+        process_contact_skills_background,
+        tenant.processor,
+        contact_id,
+        job_store,
+        job.id,
+        usage,
+        priority=priority,
+    )
+    return job
+
+
+def enqueue_synced_contact(
+    scheduler: JobScheduler,
+    job_store: JobStore,
+    usage: UsageAggregator,
+    tenant: Tenant,
+    contact_id: str,
+    priority: Priority,
+) -> bool:
+    """
+    Queue a contact found by the polling sync. The sync only fills half of
+    the in-flight job limit so webhooks and manual requests are still
+    admitted while it catches up.
+    """
+    if admission.in_flight >= max(1, admission.max_inflight_jobs // 2):
+        return False
+    admission.job_started()
+    _enqueue_contact(tenant, contact_id, priority, scheduler, job_store, usage)
+    return True
 
 
 @app.post("/webhooks/espocrm")
 async def espocrm_webhook(
-    request: Request, background_tasks: BackgroundTasks
+    request: Request,
+    services: Services = Depends(get_services),
+    scheduler: JobScheduler = Depends(get_scheduler),
+    job_store: JobStore = Depends(get_job_store),
+    usage: UsageAggregator = Depends(get_usage),
+) -> JSONResponse:
+    return await _handle_webhook(
+        services.default_tenant, request, scheduler, job_store, usage
+    )
+
+
+@app.post("/webhooks/espocrm/{tenant_name}")
+async def espocrm_tenant_webhook(
+    tenant_name: str,
+    request: Request,
+    services: Services = Depends(get_services),
+    scheduler: JobScheduler = Depends(get_scheduler),
+    job_store: JobStore = Depends(get_job_store),
+    usage: UsageAggregator = Depends(get_usage),
 ) -> JSONResponse:
+    return await _handle_webhook(
+        _get_tenant(services, tenant_name), request, scheduler, job_store, usage
+    )
+
+
+async def _handle_webhook(
+    tenant: Tenant,
+    request: Request,
+    scheduler: JobScheduler,
+    job_store: JobStore,
+    usage: UsageAggregator,
+) -> JSONResponse:
+    source = _source_key(request)
+    _admit(tenant, source, 1, take=False)
+
+    body = await request.body()
+
+    if not verify_webhook_signature(
+        body, request.headers.get(SIGNATURE_HEADER), tenant.webhook_secret
+    ):
+        logger.warning(
+            "Rejected webhook with invalid signature",
+            tenant=tenant.name,
+            client=request.client.host if request.client else None,
+        )
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
     try:
-        payload_data = await request.json()
+        events = parse_webhook_events(body)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=_webhook_payload_error(e))
 
-        if not isinstance(payload_data, list):
+    try:
+        if len(events) > admission.max_events_per_payload:
             raise HTTPException(
-                status_code=400, detail="Payload must be an array of webhook events"
+                status_code=413,
+                detail=f"Payload exceeds {admission.max_events_per_payload} events",
+            )
+
+        received = len(events)
+        events = [
+            event
+            for event in events
+            if not tenant.recent_writes.is_own_write(
+                event["id"], event.get("skills"), event.get("modifiedAt")
+            )
+        ]
+        suppressed = received - len(events)
+        if suppressed:
+            logger.info(
+                "Suppressed self-triggered webhook events",
+                tenant=tenant.name,
+                count=suppressed,
             )
 
-        payload = EspoCRMWebhookPayload.from_list(payload_data)
+        if events:
+            _admit(tenant, source, len(events))
+            admission.job_started(len(events))
 
-        for event in payload.events:
+        job_ids = []
+        for event in events:
             logger.info(
                 "Processing webhook event",
-                event_id=event.id,
-                event_name=event.name,
+                tenant=tenant.name,
+                event_id=event["id"],
+                event_name=event.get("name"),
             )
 
-            background_tasks.add_task(process_contact_skills_background, event.id)
+            job = _enqueue_contact(
+                tenant, event["id"], Priority.WEBHOOK, scheduler, job_store, usage
+            )
+            job_ids.append(job.id)
 
         return JSONResponse(
             content={
                 "status": "success",
-                "message": f"Processing {len(payload.events)} webhook events",
-                "events_processed": len(payload.events),
+                "message": f"Processing {len(events)} webhook events",
+                "events_processed": len(events),
+                "events_suppressed": suppressed,
+                "job_ids": job_ids,
             }
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Error processing webhook", error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -126,16 +523,44 @@ async def espocrm_webhook(
 
 @app.post("/process-contact/{contact_id}")
 async def process_contact_manual(
-    contact_id: str, background_tasks: BackgroundTasks
+    contact_id: str,
+    request: Request,
+    tenant: str = DEFAULT_TENANT,
+    wait: bool = False,
+    timeout_ms: int = Query(default=10000, ge=1),
+    services: Services = Depends(get_services),
+    scheduler: JobScheduler = Depends(get_scheduler),
+    job_store: JobStore = Depends(get_job_store),
+    usage: UsageAggregator = Depends(get_usage),
 ) -> JSONResponse:
+    target = _get_tenant(services, tenant)
+    _admit(target, _source_key(request), 1)
+
+    if wait:
+        return await _process_contact_inline(
+            target,
+            contact_id,
+            timeout_ms / 1000,
+            services.inline_executor,
+            scheduler,
+            job_store,
+            usage,
+        )
+
     try:
-        background_tasks.add_task(process_contact_skills_background, contact_id)
+        admission.job_started()
+        job = _enqueue_contact(
+            target, contact_id, Priority.INTERACTIVE, scheduler, job_store, usage
+        )
 
         return JSONResponse(
             content={
                 "status": "success",
                 "message": f"Contact {contact_id} queued for processing",
                 "contact_id": contact_id,
+                "tenant": target.name,
+                "job_id": job.id,
+                "status_url": f"/jobs/{job.id}",
             }
         )
 
@@ -149,22 +574,240 @@ async def process_contact_manual(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+def _run_inline(
+    tenant: Tenant,
+    contact_id: str,
+    scheduler: JobScheduler,
+    job_store: JobStore,
+    usage: UsageAggregator,
+    job_id: str,
+) -> None:
+    try:
+        process_contact_skills_background(
+            tenant.processor, contact_id, job_store, job_id, usage
+        )
+    except RetryLater as retry:
+        # Later attempts go through the job queue like any other retry
+        scheduler.submit_after(
+            retry.delay,
+            tenant.name,
+            process_contact_skills_background,
+            *retry.args,
+            priority=Priority.INTERACTIVE,
+        )
+
+
+async def _process_contact_inline(
+    tenant: Tenant,
+    contact_id: str,
+    timeout: float,
+    executor: Executor,
+    scheduler: JobScheduler,
+    job_store: JobStore,
+    usage: UsageAggregator,
+) -> JSONResponse:
+    """
+    Run a contact's pipeline now and return its result if it finishes in time.
+
+    A job already queued or running for the contact is joined instead of
+    starting a second run: a running job is awaited, a queued one is claimed
+    and run here, and the worker skips it when its turn comes.
+    """
+    job = job_store.find_active(tenant.name, contact_id)
+    if job is None:
+        admission.job_started()
+        job = job_store.create(tenant.name, contact_id, Priority.INTERACTIVE.value)
+
+    if job.state == "queued":
+        # Runs outside the job queue; the thread finishes and records the job
+        # even if this request stops waiting
+        executor.submit(
+            _run_inline, tenant, contact_id, scheduler, job_store, usage, job.id
+        )
+
+    finished = await job_store.wait(job.id, min(timeout, settings.job_wait_max_seconds))
+    if finished is not None and finished.finished:
+        if finished.result is None:
+            detail = {"job_id": job.id, "error": finished.error}
+            if finished.retryable:
+                raise _service_unavailable(detail, finished.retry_after)
+            raise HTTPException(status_code=500, detail=detail)
+        return JSONResponse(content=finished.result.model_dump(mode="json"))
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "accepted",
+            "message": f"Contact {contact_id} is still processing",
+            "contact_id": contact_id,
+            "tenant": tenant.name,
+            "job_id": job.id,
+            "status_url": f"/jobs/{job.id}",
+        },
+    )
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    wait_ms: int = Query(default=0, ge=0),
+    job_store: JobStore = Depends(get_job_store),
+) -> JobStatus:
+    if wait_ms:
+        timeout = min(wait_ms / 1000, settings.job_wait_max_seconds)
+        job = await job_store.wait(job_id, timeout)
+    else:
+        job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    return job
+
+
+def _job_event(job: JobStatus) -> str:
+    return f"event: {job.state}\ndata: {job.model_dump_json()}\n\n"
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str, job_store: JobStore = Depends(get_job_store)
+) -> StreamingResponse:
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+
+    async def events() -> AsyncGenerator[str, None]:
+        current = job
+        deadline = time.monotonic() + settings.job_wait_max_seconds
+        yield _job_event(current)
+        while not current.finished:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            # Wake up periodically so proxies see traffic on idle streams
+            update = await job_store.wait(job_id, min(remaining, 15))
+            if update is None:
+                return
+            if update.state != current.state:
+                yield _job_event(update)
+            else:
+                yield ": keep-alive\n\n"
+            current = update
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @app.get("/health")
-async def health_check() -> dict[str, Any]:
-    espocrm_client = EspoCRMClient()
-    espocrm_status = espocrm_client.health_check()
+async def health_check(
+    prober: HealthProber = Depends(get_health_prober),
+    services: Services = Depends(get_services),
+    scheduler: JobScheduler = Depends(get_scheduler),
+    change_poller: ChangePoller | None = Depends(get_change_poller),
+) -> dict[str, Any]:
+    espocrm_status = prober.is_healthy("espocrm")
+    circuit_breakers = services.circuit_breakers()
+    healthy = all(prober.is_healthy(name) for name in prober.checks) and all(
+        breaker["state"] != "open" for breaker in circuit_breakers.values()
+    )
 
     return {
-        "status": "healthy" if espocrm_status else "degraded",
+        "status": "healthy" if healthy else "degraded",
         "espocrm": "connected" if espocrm_status else "disconnected",
+        "llm": "connected" if prober.is_healthy("llm") else "disconnected",
+        "dependencies": _dependency_report(prober),
+        "webhooks": {
+            "suppressed_self_triggered": services.suppressed_self_writes,
+        },
+        "jobs": scheduler.stats(),
+        "circuit_breakers": circuit_breakers,
+        "concurrency": services.concurrency_limits(),
+        "llm_tiers": services.skills_extractor.tier_stats(),
+        "llm_hedging": services.skills_extractor.hedging_stats(),
+        "llm_budget": services.token_budget.snapshot(),
+        "sync": change_poller.snapshot() if change_poller is not None else None,
         "version": VERSION,
     }
 
 
+@app.get("/stats/usage")
+async def usage_stats(
+    minutes: int = Query(60, ge=1, le=settings.usage_retention_minutes),
+    tenant: str | None = None,
+    usage: UsageAggregator = Depends(get_usage),
+) -> dict[str, Any]:
+    return usage.query(minutes, tenant)
+
+
+@app.get("/health/live")
+async def liveness() -> dict[str, Any]:
+    return {"status": "ok", "version": VERSION}
+
+
+@app.get("/health/ready")
+async def readiness(
+    prober: HealthProber = Depends(get_health_prober),
+) -> JSONResponse:
+    queue_saturation = admission.in_flight / max(admission.max_inflight_jobs, 1)
+    queue_saturated = admission.in_flight >= admission.max_inflight_jobs
+    ready = prober.is_healthy("espocrm") and not queue_saturated
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "queue": {
+                "in_flight": admission.in_flight,
+                "max_in_flight": admission.max_inflight_jobs,
+                "saturation": round(queue_saturation, 3),
+                "saturated": queue_saturated,
+            },
+            "dependencies": _dependency_report(prober),
+        },
+    )
+
+
+def _dependency_report(prober: HealthProber) -> dict[str, Any]:
+    return {
+        name: {
+            "healthy": result.healthy,
+            "stale": prober.is_stale(name),
+            "latency_ms": result.latency_ms,
+            "checked_at": result.checked_at.isoformat(),
+            "error": result.error,
+        }
+        for name, result in prober.status.items()
+    }
+
+
+async def _hash_upload(file: UploadFile, max_size: int) -> tuple[str, int]:
+    """
+    Hash an upload in fixed-size chunks, rejecting it as soon as it grows past
+    max_size so oversized files are never read in full.
+    """
+    if file.size is not None and file.size > max_size:
+        raise _upload_too_large(max_size)
+
+    digest = hashlib.sha256()
+    size = 0
+    await file.seek(0)
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_size:
+            raise _upload_too_large(max_size)
+        digest.update(chunk)
+    return digest.hexdigest(), size
+
+
+def _upload_too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=413, detail=f"File exceeds maximum size of {max_size} bytes"
+    )
+
+
 @app.post("/extract/dry-run")
 async def extract_dry_run(
     text: str | None = Body(None, embed=True),
     file: UploadFile | None = File(None),
+    services: Services = Depends(get_services),
 ) -> JSONResponse:
     if not text and not file:
         raise HTTPException(
@@ -183,13 +826,27 @@ async def extract_dry_run(
         elif file:
             if not file.filename:
                 raise ValueError("Uploaded file is missing a filename")
-            content = await file.read()
-            processor = DocumentProcessor()
-            resume_text = processor.extract_text(content, file.filename)
+            document_processor = services.document_processor
+            is_allowed, error_msg = document_processor.is_allowed_type(file.filename)
+            if not is_allowed:
+                raise ValueError(error_msg)
+
+            content_hash, size = await _hash_upload(
+                file, document_processor.max_file_size
+            )
+            # Parse straight from the spooled upload; cached text skips parsing
+            resume_text = await asyncio.to_thread(
+                document_processor.extract_text_from_stream,
+                file.file,
+                file.filename,
+                content_hash,
+                size,
+            )
             source = file.filename
 
-        extractor = SkillsExtractor()
-        extracted = extractor.extract_skills(resume_text)
+        extracted = await asyncio.to_thread(
+            services.skills_extractor.extract_skills, resume_text
+        )
 
         return JSONResponse(
             content={
@@ -201,19 +858,110 @@ async def extract_dry_run(
             }
         )
 
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.warning("Dry-run extraction input error", error=str(e))
         raise HTTPException(status_code=400, detail=str(e))
+    except TransientDependencyError as e:
+        logger.warning(
+            "Dry-run extraction dependency unavailable",
+            dependency=e.dependency,
+            error=str(e),
+        )
+        raise _service_unavailable(str(e), e.retry_after)
     except Exception as e:
         logger.error("Dry-run extraction failed", error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail="Extraction failed")
 
 
+@app.post("/extract/dry-run/batch")
+async def extract_dry_run_batch(
+    request: Request, services: Services = Depends(get_services)
+) -> StreamingResponse:
+    """
+    Run dry-run extraction over many resumes, streaming NDJSON results.
+
+    Accepts multipart uploads (any number of `files`, zip archives are
+    expanded, plus `texts` fields) or an NDJSON body with one
+    {"id": ..., "text": ...} object per line.
+    """
+    content_type = request.headers.get("content-type", "")
+    max_items = settings.batch_max_items
+    form = None
+
+    try:
+        if content_type.startswith("multipart/form-data"):
+            form = await request.form(max_files=max_items, max_fields=max_items)
+            items = _batch_items_from_form(
+                form, max_items, services.document_processor.max_file_size
+            )
+        elif content_type.startswith(("application/x-ndjson", "application/jsonl")):
+            items = items_from_ndjson(await request.body(), max_items)
+        else:
+            raise HTTPException(
+                status_code=415,
+                detail="Send multipart/form-data or application/x-ndjson",
+            )
+        if not items:
+            raise ValueError("Batch contains no resumes")
+    except ValueError as e:
+        if form is not None:
+            await form.close()
+        raise HTTPException(status_code=400, detail=str(e))
+    except zipfile.BadZipFile as e:
+        if form is not None:
+            await form.close()
+        raise HTTPException(status_code=400, detail=f"Invalid zip archive: {e}")
+
+    async def results() -> AsyncGenerator[str, None]:
+        try:
+            async for line in run_batch(
+                items,
+                services.document_processor,
+                services.skills_extractor,
+                concurrency=settings.batch_concurrency,
+            ):
+                yield line
+        finally:
+            if form is not None:
+                await form.close()
+
+    logger.info("Starting batch dry run", items=len(items))
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+def _batch_items_from_form(
+    form: FormData, max_items: int, max_file_size: int
+) -> list[BatchItem]:
+    items: list[BatchItem] = []
+    for index, text in enumerate(form.getlist("texts")):
+        if isinstance(text, str):
+            items.append(BatchItem(id=f"text-{index}", text=text))
+
+    for upload in form.getlist("files"):
+        if isinstance(upload, str) or not upload.filename:
+            raise ValueError("Every entry in 'files' must be a named file upload")
+        if upload.filename.lower().endswith(".zip"):
+            archive = zipfile.ZipFile(upload.file)
+            items.extend(items_from_zip(archive, max_items - len(items), max_file_size))
+        else:
+            items.append(
+                item_from_upload(
+                    upload.filename, upload.file, upload.size, max_file_size
+                )
+            )
+
+    if len(items) > max_items:
+        raise ValueError(f"Batch exceeds {max_items} items")
+    return items
+
+
 @app.get("/ping")
 async def ping() -> dict[str, Any]:
     return {
         "status": "ok",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": datetime.now(UTC).isoformat(),
         "version": VERSION,
     }
 
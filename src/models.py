@@ -1,6 +1,11 @@
-from typing import Any
+import threading
+from datetime import datetime
+from typing import Any, Literal, NotRequired
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, TypeAdapter
+
+# pydantic needs the typing_extensions TypedDict on Python < 3.12
+from typing_extensions import TypedDict
 
 
 class WebhookEvent(BaseModel):
@@ -17,6 +22,24 @@ class EspoCRMWebhookPayload(BaseModel):
         return cls(events=events)
 
 
+class WebhookEventData(TypedDict):
+    id: str
+    name: NotRequired[str | None]
+    skills: NotRequired[str | None]
+    modifiedAt: NotRequired[str | None]
+
+
+# Validates the raw request body in a single pass inside pydantic-core, without
+# building an intermediate Python structure or a model instance per event.
+webhook_events_adapter: TypeAdapter[list[WebhookEventData]] = TypeAdapter(
+    list[WebhookEventData]
+)
+
+
+def parse_webhook_events(body: bytes) -> list[WebhookEventData]:
+    return webhook_events_adapter.validate_json(body)
+
+
 class ContactData(BaseModel):
     id: str
     name: str | None = None
@@ -25,6 +48,8 @@ class ContactData(BaseModel):
     emailAddress: str | None = None
     skills: str | None = None
     attachments: list[dict[str, Any]] | None = None
+    modifiedAt: str | None = None
+    versionNumber: int | None = None
 
 
 class ExtractedSkills(BaseModel):
@@ -33,6 +58,36 @@ class ExtractedSkills(BaseModel):
     source: str = Field(..., description="Source of the extraction")
 
 
+class ProcessingStats(BaseModel):
+    """Resources one contact run used, filled in from every thread it touches."""
+
+    stage_timings_ms: dict[str, float] = Field(
+        default_factory=dict, description="Wall time spent in each processing stage"
+    )
+    total_ms: float = 0.0
+    cpu_ms: float = Field(default=0.0, description="CPU time across all threads")
+    crm_requests: int = Field(default=0, description="HTTP calls made to EspoCRM")
+    bytes_downloaded: int = 0
+    chars_extracted: int = 0
+    cache_hits: int = Field(default=0, description="Documents served from text cache")
+    llm_calls: int = 0
+    llm_prompt_tokens: int = 0
+    llm_completion_tokens: int = 0
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def record_stage(self, stage: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.stage_timings_ms[stage] = round(
+                self.stage_timings_ms.get(stage, 0.0) + elapsed_ms, 3
+            )
+
+    def add(self, **counts: float) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+
 class SkillsExtractionResult(BaseModel):
     contact_id: str
     extracted_skills: ExtractedSkills
@@ -41,3 +96,37 @@ class SkillsExtractionResult(BaseModel):
     updated_skills: list[str]
     success: bool
     error: str | None = None
+    stats: ProcessingStats = Field(default_factory=ProcessingStats)
+
+
+JobState = Literal["queued", "running", "succeeded", "failed"]
+
+
+class JobStatus(BaseModel):
+    id: str
+    tenant: str
+    contact_id: str
+    priority: str
+    state: JobState = "queued"
+    attempts: int = 0
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    result: SkillsExtractionResult | None = None
+    error: str | None = None
+    # Set when the job gave up on an unavailable dependency, so the same work
+    # may succeed if submitted again later
+    retryable: bool = False
+    retry_after: float | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("succeeded", "failed")
+
+
+class DependencyHealth(BaseModel):
+    name: str
+    healthy: bool
+    latency_ms: float
+    checked_at: datetime
+    error: str | None = None
@@ -0,0 +1,322 @@
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from enum import StrEnum
+from typing import Any
+
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(StrEnum):
+    INTERACTIVE = "interactive"
+    WEBHOOK = "webhook"
+    BACKFILL = "backfill"
+
+
+# Relative share of worker slots each class gets while all of them have work
+PRIORITY_WEIGHTS: dict[Priority, int] = {
+    Priority.INTERACTIVE: 8,
+    Priority.WEBHOOK: 3,
+    Priority.BACKFILL: 1,
+}
+
+
+# How often idle workers re-ask whether deferred classes may run again
+DEFER_RECHECK_SECONDS = 5.0
+
+
+class RetryLater(Exception):
+    """Raised by a job to be run again after `delay` seconds with new args."""
+
+    def __init__(self, delay: float, *args: Any) -> None:
+        super().__init__(f"retry in {delay:.1f}s")
+        self.delay = delay
+        self.args = args
+
+
+class Job:
+    __slots__ = ("tenant", "priority", "func", "args", "enqueued_at")
+
+    def __init__(
+        self,
+        tenant: str,
+        priority: Priority,
+        func: Callable[..., Any],
+        args: tuple[Any, ...],
+    ) -> None:
+        self.tenant = tenant
+        self.priority = priority
+        self.func = func
+        self.args = args
+        self.enqueued_at = time.monotonic()
+
+
+class JobScheduler:
+    """
+    Runs background jobs on a fixed pool of worker threads.
+
+    Jobs are queued per priority class and per tenant. Classes share the
+    workers by smooth weighted round-robin, so a bulk import slows manual
+    requests down by at most a few jobs instead of its whole backlog, and
+    reserved workers are kept free for a class even while others are busy.
+    Within a class, tenants take turns so one tenant cannot starve another.
+
+    A `defer` predicate can hold whole classes back for a while (e.g. while
+    the LLM budget is low); their jobs stay queued until it allows them.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_per_tenant: int | None = None,
+        weights: dict[Priority, int] | None = None,
+        reserved: dict[Priority, int] | None = None,
+        defer: Callable[[Priority], bool] | None = None,
+    ) -> None:
+        self.workers = workers
+        self.defer = defer
+        self.max_per_tenant = max_per_tenant
+        self.weights = {**PRIORITY_WEIGHTS, **(weights or {})}
+        self.reserved = dict(reserved or {})
+        if sum(self.reserved.values()) >= workers:
+            raise ValueError("Reserved workers must leave at least one shared worker")
+
+        self._queues: dict[Priority, dict[str, deque[Job]]] = {
+            priority: {} for priority in Priority
+        }
+        self._ready: dict[Priority, deque[str]] = {
+            priority: deque() for priority in Priority
+        }
+        self._credits: dict[Priority, int] = dict.fromkeys(Priority, 0)
+        self._running: dict[str, int] = {}
+        self._class_running: dict[Priority, int] = dict.fromkeys(Priority, 0)
+        self._condition = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._timers: set[threading.Timer] = set()
+        self._stopping = False
+
+    def submit(
+        self,
+        tenant: str,
+        func: Callable[..., Any],
+        *args: Any,
+        priority: Priority = Priority.WEBHOOK,
+    ) -> None:
+        job = Job(tenant, priority, func, args)
+        with self._condition:
+            queues = self._queues[priority]
+            queue = queues.get(tenant)
+            if queue is None:
+                queue = queues[tenant] = deque()
+                self._ready[priority].append(tenant)
+            queue.append(job)
+            # Wake every idle worker: the one woken by notify() may be held
+            # back by a reservation that does not cover this job's class
+            self._condition.notify_all()
+
+    def submit_after(
+        self,
+        delay: float,
+        tenant: str,
+        func: Callable[..., Any],
+        *args: Any,
+        priority: Priority = Priority.WEBHOOK,
+    ) -> None:
+        def fire() -> None:
+            with self._condition:
+                self._timers.discard(timer)
+            self.submit(tenant, func, *args, priority=priority)
+
+        timer = threading.Timer(delay, fire)
+        timer.daemon = True
+        with self._condition:
+            self._timers.add(timer)
+        timer.start()
+
+    @property
+    def pending(self) -> int:
+        return sum(
+            len(queue) for queues in self._queues.values() for queue in queues.values()
+        )
+
+    @property
+    def running(self) -> int:
+        return sum(self._running.values())
+
+    def stats(self) -> dict[str, Any]:
+        with self._condition:
+            tenants = {
+                tenant for queues in self._queues.values() for tenant in queues
+            } | set(self._running)
+            return {
+                "workers": self.workers,
+                "pending": self.pending,
+                "running": self.running,
+                "delayed": len(self._timers),
+                "deferred": [
+                    priority.value
+                    for priority in Priority
+                    if self.defer is not None and self.defer(priority)
+                ],
+                "classes": {
+                    priority.value: {
+                        "pending": sum(
+                            len(queue) for queue in self._queues[priority].values()
+                        ),
+                        "running": self._class_running[priority],
+                        "reserved": self.reserved.get(priority, 0),
+                    }
+                    for priority in Priority
+                },
+                "tenants": {
+                    tenant: {
+                        "pending": sum(
+                            len(queues.get(tenant, ()))
+                            for queues in self._queues.values()
+                        ),
+                        "running": self._running.get(tenant, 0),
+                    }
+                    for tenant in tenants
+                },
+            }
+
+    def _can_run(self, tenant: str) -> bool:
+        if self.max_per_tenant is None:
+            return True
+        return self._running.get(tenant, 0) < self.max_per_tenant
+
+    def _class_allowed(self, priority: Priority) -> bool:
+        if self._stopping:
+            return True
+        if self.defer is not None and self.defer(priority):
+            return False
+        # Idle workers still owed to other classes are off limits
+        owed = sum(
+            max(0, reserved - self._class_running[other])
+            for other, reserved in self.reserved.items()
+            if other != priority
+        )
+        idle = self.workers - self.running
+        return idle > owed
+
+    def _next_job_in(self, priority: Priority) -> Job | None:
+        # Rotate through tenants with queued work, skipping any at their cap
+        ready = self._ready[priority]
+        queues = self._queues[priority]
+        for _ in range(len(ready)):
+            tenant = ready.popleft()
+            if not self._can_run(tenant):
+                ready.append(tenant)
+                continue
+
+            queue = queues[tenant]
+            job = queue.popleft()
+            if queue:
+                ready.append(tenant)
+            else:
+                del queues[tenant]
+            self._running[tenant] = self._running.get(tenant, 0) + 1
+            self._class_running[priority] += 1
+            return job
+        return None
+
+    def _next_job(self) -> Job | None:
+        candidates = [
+            priority
+            for priority in Priority
+            if self._ready[priority] and self._class_allowed(priority)
+        ]
+        if not candidates:
+            return None
+
+        # Smooth weighted round-robin: every class with work earns its weight,
+        # the richest one runs and pays back the total
+        credits = {
+            priority: self._credits[priority] + self.weights[priority]
+            for priority in candidates
+        }
+        total = sum(self.weights[priority] for priority in candidates)
+        for priority in sorted(candidates, key=lambda p: -credits[p]):
+            job = self._next_job_in(priority)
+            if job is not None:
+                self._credits.update(credits)
+                self._credits[priority] -= total
+                return job
+        return None
+
+    def _finish(self, job: Job) -> None:
+        with self._condition:
+            remaining = self._running[job.tenant] - 1
+            if remaining:
+                self._running[job.tenant] = remaining
+            else:
+                del self._running[job.tenant]
+            self._class_running[job.priority] -= 1
+            self._condition.notify_all()
+
+    def _worker(self) -> None:
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    if self._stopping and not self.pending:
+                        return
+                    # Deferral ends with time rather than with a notify
+                    self._condition.wait(
+                        DEFER_RECHECK_SECONDS if self.defer is not None else None
+                    )
+                    job = self._next_job()
+
+            try:
+                job.func(*job.args)
+            except RetryLater as retry:
+                self.submit_after(
+                    retry.delay,
+                    job.tenant,
+                    job.func,
+                    *retry.args,
+                    priority=job.priority,
+                )
+            except Exception as e:
+                logger.error(f"Unhandled error in job for tenant {job.tenant}: {e}")
+            finally:
+                self._finish(job)
+
+    def start(self) -> None:
+        with self._condition:
+            self._stopping = False
+        for index in range(self.workers - len(self._threads)):
+            thread = threading.Thread(
+                target=self._worker, name=f"job-worker-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Let workers finish queued jobs, waiting up to timeout seconds."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+            timers, self._timers = self._timers, set()
+        for timer in timers:
+            timer.cancel()
+        if timers:
+            logger.warning(f"Dropped {len(timers)} delayed job retries at shutdown")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            remaining = (
+                None if deadline is None else max(0, deadline - time.monotonic())
+            )
+            thread.join(remaining)
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        if self._threads:
+            logger.warning(f"{len(self._threads)} job workers still busy at shutdown")
+
+
+def get_scheduler(request: Request) -> JobScheduler:
+    scheduler: JobScheduler = request.app.state.scheduler
+    return scheduler
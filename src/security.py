@@ -0,0 +1,34 @@
+import base64
+import binascii
+import hashlib
+import hmac
+
+SIGNATURE_HEADER = "X-Signature"
+
+
+def compute_webhook_signature(webhook_id: str, body: bytes, secret: str) -> str:
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).digest()
+    return base64.b64encode(webhook_id.encode() + b":" + digest).decode()
+
+
+def verify_webhook_signature(body: bytes, signature: str | None, secret: str) -> bool:
+    """
+    Verify an EspoCRM webhook signature.
+
+    EspoCRM sends base64(webhookId + ":" + HMAC-SHA256(body, secret)) in the
+    X-Signature header. The digest is compared in constant time.
+    """
+    if not signature:
+        return False
+
+    try:
+        decoded = base64.b64decode(signature, validate=True)
+    except (binascii.Error, ValueError):
+        return False
+
+    webhook_id, separator, received_digest = decoded.partition(b":")
+    if not separator or not webhook_id:
+        return False
+
+    expected_digest = hmac.new(secret.encode(), body, hashlib.sha256).digest()
+    return hmac.compare_digest(expected_digest, received_digest)
@@ -0,0 +1,271 @@
+import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from fastapi import Request
+
+from .admission import RateLimiter
+from .crm.budget import TokenBudget
+from .crm.concurrency import AdaptiveLimiter
+from .crm.document_processor import DocumentProcessor
+from .crm.espocrm_client import EspoCRMClient
+from .crm.hedging import HedgingPolicy
+from .crm.locks import ContactLocks
+from .crm.processor import MAX_RESUME_ATTACHMENTS, ContactSkillsProcessor
+from .crm.resilience import (
+    CircuitBreaker,
+    ResilientCaller,
+    RetryBudget,
+    is_transient_http_error,
+    is_transient_llm_error,
+)
+from .crm.skills_extractor import SkillsExtractor, max_completions_per_resume
+from .crm.write_tracker import RecentWrites
+from .settings import TenantConfig, settings
+from .tenants import DEFAULT_TENANT, Tenant, build_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+def build_caller(
+    name: str, is_transient: Callable[[Exception], bool]
+) -> ResilientCaller:
+    """Circuit breaker and retry budget for one dependency, from settings."""
+    return ResilientCaller(
+        name,
+        is_transient,
+        breaker=CircuitBreaker(
+            name,
+            failure_threshold=settings.breaker_failure_threshold,
+            reset_timeout_seconds=settings.breaker_reset_timeout_seconds,
+        ),
+        budget=RetryBudget(ratio=settings.retry_budget_ratio),
+        max_attempts=settings.retry_max_attempts,
+    )
+
+
+def build_limiter(name: str) -> AdaptiveLimiter:
+    """Adaptive concurrency limit for one EspoCRM instance, from settings."""
+    return AdaptiveLimiter(
+        name,
+        initial_limit=settings.espocrm_initial_concurrency,
+        max_limit=settings.espocrm_max_concurrency,
+        latency_target_seconds=settings.espocrm_latency_target_ms / 1000,
+    )
+
+
+def build_token_budget() -> TokenBudget:
+    return TokenBudget(
+        hourly_limit=settings.llm_hourly_token_budget,
+        daily_limit=settings.llm_daily_token_budget,
+        degrade_ratio=settings.llm_budget_degrade_ratio,
+    )
+
+
+class Services:
+    """
+    Long-lived components shared by every request and background job.
+
+    The document processor (and its cache), the LLM client and the contact
+    locks are shared; each tenant gets its own pooled EspoCRM client,
+    processor, write tracker and limits.
+    """
+
+    def __init__(
+        self,
+        espocrm_client: EspoCRMClient,
+        document_processor: DocumentProcessor,
+        skills_extractor: SkillsExtractor,
+        recent_writes: RecentWrites | None = None,
+        token_budget: TokenBudget | None = None,
+    ) -> None:
+        self.document_processor = document_processor
+        self.skills_extractor = skills_extractor
+        self.token_budget = token_budget or build_token_budget()
+        self.contact_locks = ContactLocks(settings.contact_lock_dir)
+        self.io_executor = ThreadPoolExecutor(
+            max_workers=settings.espocrm_io_workers, thread_name_prefix="crm-io"
+        )
+        # Runs /process-contact?wait=true pipelines next to, not behind, the
+        # job queue
+        self.inline_executor = ThreadPoolExecutor(
+            max_workers=settings.inline_workers, thread_name_prefix="inline-job"
+        )
+        self.tenants: dict[str, Tenant] = {}
+        # One circuit per dependency endpoint, reported by /health
+        self.callers: dict[str, ResilientCaller] = {}
+        self.limiters: dict[str, AdaptiveLimiter] = {}
+        self.add_tenant(
+            DEFAULT_TENANT,
+            espocrm_client,
+            webhook_secret=settings.webhook_secret,
+            recent_writes=recent_writes,
+        )
+
+    def add_tenant(
+        self,
+        name: str,
+        espocrm_client: EspoCRMClient,
+        webhook_secret: str,
+        recent_writes: RecentWrites | None = None,
+        rate_limiter: RateLimiter | None = None,
+        llm_requests_per_minute: int | None = None,
+    ) -> Tenant:
+        llm_requests_per_minute = (
+            llm_requests_per_minute or settings.llm_requests_per_minute
+        )
+        llm_limiter = None
+        if llm_requests_per_minute:
+            # A full bucket covers the most completions one job can make;
+            # admitted jobs may still borrow past it rather than fail
+            llm_limiter = RateLimiter(
+                rate_per_second=llm_requests_per_minute / 60,
+                burst=max(
+                    llm_requests_per_minute // 10,
+                    MAX_RESUME_ATTACHMENTS * max_completions_per_resume(),
+                ),
+            )
+
+        processor = ContactSkillsProcessor(
+            espocrm_client=espocrm_client,
+            document_processor=self.document_processor,
+            skills_extractor=self.skills_extractor,
+            contact_locks=self.contact_locks,
+            max_update_attempts=settings.skills_update_max_attempts,
+            llm_limiter=llm_limiter,
+            tenant=name,
+            io_executor=self.io_executor,
+        )
+        tenant = Tenant(
+            name=name,
+            espocrm_client=espocrm_client,
+            processor=processor,
+            webhook_secret=webhook_secret,
+            recent_writes=recent_writes
+            or RecentWrites(settings.self_write_ttl_seconds),
+            rate_limiter=rate_limiter,
+        )
+        self.tenants[name] = tenant
+        return tenant
+
+    def add_configured_tenant(self, name: str, config: TenantConfig) -> Tenant:
+        recent_writes = RecentWrites(settings.self_write_ttl_seconds)
+        caller = build_caller(f"espocrm:{name}", is_transient_http_error)
+        self.callers[caller.name] = caller
+        limiter = build_limiter(f"espocrm:{name}")
+        self.limiters[limiter.name] = limiter
+        return self.add_tenant(
+            name,
+            EspoCRMClient(
+                write_tracker=recent_writes,
+                url=config.espocrm_url,
+                api_key=config.espocrm_api_key,
+                caller=caller,
+                limiter=limiter,
+            ),
+            webhook_secret=config.webhook_secret,
+            recent_writes=recent_writes,
+            rate_limiter=build_rate_limiter(
+                config.rate_limit_per_minute,
+                config.rate_limit_burst,
+                settings.rate_limit_per_minute,
+                settings.rate_limit_burst,
+            ),
+            llm_requests_per_minute=config.llm_requests_per_minute,
+        )
+
+    @classmethod
+    def create(cls) -> "Services":
+        recent_writes = RecentWrites(settings.self_write_ttl_seconds)
+        espocrm_caller = build_caller("espocrm", is_transient_http_error)
+        llm_caller = build_caller("llm", is_transient_llm_error)
+        # The fallback model gets its own circuit so an outage of it (or of a
+        # shared endpoint) fails fast too
+        fallback_caller = (
+            build_caller("llm-fallback", is_transient_llm_error)
+            if settings.llm_fallback_model
+            else None
+        )
+        espocrm_limiter = build_limiter("espocrm")
+        token_budget = build_token_budget()
+        services = cls(
+            espocrm_client=EspoCRMClient(
+                write_tracker=recent_writes,
+                caller=espocrm_caller,
+                limiter=espocrm_limiter,
+            ),
+            document_processor=DocumentProcessor(),
+            skills_extractor=SkillsExtractor(
+                caller=llm_caller,
+                hedging=(
+                    HedgingPolicy(
+                        percentile=settings.llm_hedge_percentile,
+                        budget_ratio=settings.llm_hedge_budget_ratio,
+                    )
+                    if settings.llm_hedge_percentile
+                    else None
+                ),
+                budget=token_budget,
+                fallback_caller=fallback_caller,
+            ),
+            recent_writes=recent_writes,
+            token_budget=token_budget,
+        )
+        services.callers.update(
+            {espocrm_caller.name: espocrm_caller, llm_caller.name: llm_caller}
+        )
+        if fallback_caller is not None:
+            services.callers[fallback_caller.name] = fallback_caller
+        services.limiters[espocrm_limiter.name] = espocrm_limiter
+        for name, config in settings.tenants.items():
+            if name == DEFAULT_TENANT:
+                logger.warning(f"Ignoring tenant config named '{DEFAULT_TENANT}'")
+                continue
+            services.add_configured_tenant(name, config)
+        return services
+
+    @property
+    def default_tenant(self) -> Tenant:
+        return self.tenants[DEFAULT_TENANT]
+
+    @property
+    def espocrm_client(self) -> EspoCRMClient:
+        return self.default_tenant.espocrm_client
+
+    @property
+    def processor(self) -> ContactSkillsProcessor:
+        return self.default_tenant.processor
+
+    @property
+    def recent_writes(self) -> RecentWrites:
+        return self.default_tenant.recent_writes
+
+    @property
+    def suppressed_self_writes(self) -> int:
+        return sum(tenant.recent_writes.suppressed for tenant in self.tenants.values())
+
+    def circuit_breakers(self) -> dict[str, dict[str, Any]]:
+        return {name: caller.snapshot() for name, caller in self.callers.items()}
+
+    def concurrency_limits(self) -> dict[str, dict[str, Any]]:
+        return {name: limiter.snapshot() for name, limiter in self.limiters.items()}
+
+    def close(self) -> None:
+        components: list[tuple[str, EspoCRMClient | SkillsExtractor]] = [
+            (f"EspoCRM client for tenant {name}", tenant.espocrm_client)
+            for name, tenant in self.tenants.items()
+        ]
+        components.append(("skills extractor", self.skills_extractor))
+        for name, component in components:
+            try:
+                component.close()
+            except Exception as e:
+                logger.warning(f"Error closing {name}: {e}")
+        self.io_executor.shutdown(wait=False, cancel_futures=True)
+        self.inline_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_services(request: Request) -> Services:
+    services: Services = request.app.state.services
+    return services
@@ -1,7 +1,22 @@
-from pydantic import Field
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class TenantConfig(BaseModel):
+    espocrm_url: str = Field(..., description="EspoCRM instance URL")
+    espocrm_api_key: str = Field(..., description="EspoCRM API key")
+    webhook_secret: str = Field(..., description="Webhook secret for validation")
+    rate_limit_per_minute: int | None = Field(
+        default=None, description="Overrides RATE_LIMIT_PER_MINUTE for this tenant"
+    )
+    rate_limit_burst: int | None = Field(
+        default=None, description="Overrides RATE_LIMIT_BURST for this tenant"
+    )
+    llm_requests_per_minute: int | None = Field(
+        default=None, description="Overrides LLM_REQUESTS_PER_MINUTE for this tenant"
+    )
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -18,6 +33,21 @@ class Settings(BaseSettings):
     # EspoCRM Configuration
     espocrm_url: str = Field(..., description="EspoCRM instance URL")
     espocrm_api_key: str = Field(..., description="EspoCRM API key")
+    espocrm_timeout_seconds: float = Field(
+        default=10.0, description="Timeout for EspoCRM API requests"
+    )
+    espocrm_io_workers: int = Field(
+        default=16, description="Threads for concurrent EspoCRM reads and downloads"
+    )
+    espocrm_initial_concurrency: int = Field(
+        default=4, description="Starting limit on concurrent calls per EspoCRM instance"
+    )
+    espocrm_max_concurrency: int = Field(
+        default=16, description="Upper bound for the adaptive EspoCRM concurrency limit"
+    )
+    espocrm_latency_target_ms: int = Field(
+        default=500, description="EspoCRM latency above which concurrency is cut"
+    )
 
     # Gemini/OpenAI Configuration
     openai_api_key: str = Field(..., description="OpenAI API key (Gemini)")
@@ -28,6 +58,128 @@ class Settings(BaseSettings):
     openai_model: str = Field(
         default="gemini-1.5-flash", description="Model to use for skills extraction"
     )
+    llm_timeout_seconds: float = Field(
+        default=60.0, description="Timeout for LLM requests"
+    )
+    llm_max_output_tokens: int = Field(
+        default=2000, description="Ceiling on output tokens per LLM call"
+    )
+    llm_streaming: bool = Field(
+        default=False,
+        description="Stream completions and stop reading once the JSON object closes",
+    )
+    llm_chunk_threshold_chars: int = Field(
+        default=8000, description="Resumes longer than this are extracted in chunks"
+    )
+    llm_chunk_size_chars: int = Field(
+        default=6000, description="Target size of each chunk of a long resume"
+    )
+    llm_chunk_concurrency: int = Field(
+        default=3, description="Chunks of one resume extracted at the same time"
+    )
+    llm_max_chunks: int = Field(
+        default=6,
+        description="Most chunks extracted from one resume; the rest is skipped",
+    )
+    llm_cheap_model: str | None = Field(
+        default=None,
+        description="Model tried first; results escalate to openai_model if weak",
+    )
+    llm_escalation_min_confidence: float = Field(
+        default=0.7, description="Cheap-model confidence below which to escalate"
+    )
+    llm_escalation_min_skills: int = Field(
+        default=3, description="Cheap-model skill count below which to escalate"
+    )
+    llm_fallback_model: str | None = Field(
+        default=None, description="Model used when the primary LLM call fails"
+    )
+    llm_fallback_base_url: str | None = Field(
+        default=None, description="Endpoint for the fallback model (default: primary)"
+    )
+    llm_fallback_api_key: str | None = Field(
+        default=None, description="API key for the fallback endpoint (default: primary)"
+    )
+    llm_hedge_percentile: float | None = Field(
+        default=None,
+        description="Send a second LLM call once the first exceeds this latency percentile",
+    )
+    llm_hedge_budget_ratio: float = Field(
+        default=0.05, description="Hedged calls allowed as a fraction of LLM calls"
+    )
+    llm_requests_per_minute: int | None = Field(
+        default=None,
+        description="LLM requests per tenant per minute (unlimited if unset)",
+    )
+    llm_quota_max_requeues: int = Field(
+        default=20, description="Times a job is requeued waiting for its LLM quota"
+    )
+    llm_hourly_token_budget: int | None = Field(
+        default=None,
+        description="LLM tokens allowed per rolling hour (unlimited if unset)",
+    )
+    llm_daily_token_budget: int | None = Field(
+        default=None,
+        description="LLM tokens allowed per rolling day (unlimited if unset)",
+    )
+    llm_budget_degrade_ratio: float = Field(
+        default=0.8,
+        description="Share of a token budget after which cheaper paths are used",
+    )
+
+    # Tenants
+    tenants: dict[str, TenantConfig] = Field(
+        default_factory=dict,
+        description="Additional EspoCRM instances as JSON, keyed by tenant name",
+    )
+
+    # Background Jobs
+    worker_count: int = Field(default=4, description="Background job worker threads")
+    max_jobs_per_tenant: int | None = Field(
+        default=None, description="Maximum concurrently running jobs per tenant"
+    )
+    interactive_reserved_workers: int = Field(
+        default=1,
+        description="Workers kept free for manually requested jobs",
+    )
+    shutdown_timeout_seconds: float = Field(
+        default=30.0, description="Time allowed for running jobs at shutdown"
+    )
+    inline_workers: int = Field(
+        default=4, description="Threads for /process-contact requests that wait"
+    )
+    job_status_max_entries: int = Field(
+        default=10000, description="Maximum job status records kept in memory"
+    )
+    job_status_ttl_seconds: float = Field(
+        default=3600.0, description="How long a job's status stays available"
+    )
+    job_wait_max_seconds: float = Field(
+        default=60.0, description="Longest a client may wait on a job in one request"
+    )
+    usage_retention_minutes: int = Field(
+        default=1440, description="Minutes of per-minute job usage totals kept"
+    )
+
+    # Resilience
+    breaker_failure_threshold: int = Field(
+        default=5, description="Consecutive failures that open a dependency's circuit"
+    )
+    breaker_reset_timeout_seconds: float = Field(
+        default=30.0, description="How long an open circuit fails fast before a probe"
+    )
+    retry_max_attempts: int = Field(
+        default=3, description="Attempts per dependency call for transient errors"
+    )
+    retry_budget_ratio: float = Field(
+        default=0.1, description="Retries allowed as a fraction of dependency calls"
+    )
+    transient_max_requeues: int = Field(
+        default=3, description="Times a job is requeued while a dependency is down"
+    )
+    transient_requeue_delay_seconds: float = Field(
+        default=30.0, description="Initial delay before requeueing, doubled each time"
+    )
 
     # Logging
     log_level: str = Field(default="INFO", description="Logging level")
@@ -35,15 +187,93 @@ class Settings(BaseSettings):
     # Security
     webhook_secret: str = Field(..., description="Webhook secret for validation")
 
+    # Startup
+    startup_budget_seconds: float = Field(
+        default=2.0, description="Startup time above which a warning is logged"
+    )
+
+    # Health Checks
+    health_check_interval_seconds: float = Field(
+        default=15.0, description="Interval between background dependency checks"
+    )
+    health_check_timeout_seconds: float = Field(
+        default=5.0, description="Timeout for a single dependency check"
+    )
+
+    # Admission Control
+    rate_limit_per_minute: int = Field(
+        default=600, description="Jobs accepted per client IP per minute"
+    )
+    rate_limit_burst: int = Field(
+        default=200, description="Token bucket size per client IP"
+    )
+    max_events_per_payload: int = Field(
+        default=100, description="Maximum webhook events accepted in one payload"
+    )
+    max_inflight_jobs: int = Field(
+        default=1000, description="Queued or running jobs before shedding load"
+    )
+    shed_retry_after_seconds: int = Field(
+        default=30, description="Retry-After sent when load is shed"
+    )
+
+    # Skills Updates
+    contact_lock_dir: str | None = Field(
+        default=None,
+        description="Directory for cross-worker contact lock files (disabled if unset)",
+    )
+    skills_update_max_attempts: int = Field(
+        default=3, description="Attempts to update skills when a write conflicts"
+    )
+    self_write_ttl_seconds: float = Field(
+        default=300.0,
+        description="How long our own skills writes are remembered to drop their webhooks",
+    )
+
+    # Polling Sync
+    sync_enabled: bool = Field(
+        default=False, description="Poll EspoCRM for changed contacts and attachments"
+    )
+    sync_state_dir: str | None = Field(
+        default=None,
+        description="Directory where sync cursors are persisted (kept in memory if unset)",
+    )
+    sync_min_interval_seconds: float = Field(
+        default=10.0, description="Poll interval while changes keep arriving"
+    )
+    sync_max_interval_seconds: float = Field(
+        default=300.0, description="Poll interval the sync backs off to when idle"
+    )
+    sync_min_page_size: int = Field(
+        default=25, description="Records per list request in steady state"
+    )
+    sync_max_page_size: int = Field(
+        default=200, description="Records per list request while catching up"
+    )
+    sync_initial_lookback_hours: float = Field(
+        default=24.0, description="How far back the first sync of a tenant starts"
+    )
+
     # File Processing
     max_file_size_mb: int = Field(default=10, description="Maximum file size in MB")
     allowed_file_types: str = Field(
         default="pdf,doc,docx", description="Allowed file types (comma-separated)"
     )
 
+    # Batch Dry Runs
+    batch_max_items: int = Field(
+        default=100, description="Maximum resumes in one batch dry-run request"
+    )
+    batch_concurrency: int = Field(
+        default=4, description="Resumes processed at once within a batch dry run"
+    )
+
     # Cache Configuration
     enable_cache: bool = Field(default=True, description="Enable content caching")
     cache_ttl_hours: int = Field(default=24, description="Cache TTL in hours")
+    cache_max_entries: int = Field(
+        default=1000, description="Maximum number of cached documents"
+    )
 
     @property
     def allowed_file_extensions(self) -> set[str]:
@@ -0,0 +1,47 @@
+import os
+import time
+
+import structlog
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = structlog.get_logger(__name__)
+
+_IMPORTED_AT = time.monotonic()
+
+
+def process_uptime_seconds() -> float:
+    """
+    Seconds since the process was started.
+
+    Uses the kernel's process start time where /proc is available, so interpreter
+    start-up and imports are included; otherwise falls back to the time since
+    this module was imported.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the parenthesised command name start at field 3
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            system_uptime = float(f.read().split()[0])
+        started_ticks = int(fields[19])
+        return system_uptime - started_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.monotonic() - _IMPORTED_AT
+
+
+class FirstRequestTimer:
+    """ASGI middleware that logs time-to-first-request once, then gets out of the way."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.time_to_first_request: float | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.time_to_first_request is None and scope["type"] == "http":
+            self.time_to_first_request = process_uptime_seconds()
+            logger.info(
+                "First request received",
+                time_to_first_request_ms=round(self.time_to_first_request * 1000, 1),
+                path=scope.get("path"),
+            )
+        await self.app(scope, receive, send)
@@ -0,0 +1,450 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from fastapi import Request
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+from .jobs import JobStore
+from .scheduler import Priority
+from .tenants import Tenant
+
+logger = logging.getLogger(__name__)
+
+# EspoCRM's datetime format, which sorts lexically in time order
+ESPO_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Pages read from one feed in a pass; a longer backlog continues next pass
+MAX_PAGES_PER_PASS = 50
+
+
+class ChangeFeed:
+    """A list query whose records each mark a contact as changed."""
+
+    def __init__(
+        self,
+        name: str,
+        entity_type: str,
+        attribute: str,
+        contact_field: str,
+        select: list[str],
+        where: list[dict[str, Any]] | None = None,
+    ) -> None:
+        self.name = name
+        self.entity_type = entity_type
+        self.attribute = attribute
+        self.contact_field = contact_field
+        self.select = select
+        self.where = where
+
+
+CHANGE_FEEDS = (
+    ChangeFeed(
+        "contacts", "Contact", "modifiedAt", "id", ["id", "skills", "modifiedAt"]
+    ),
+    # Attachments never change once uploaded, so new ones are found by createdAt
+    ChangeFeed(
+        "attachments",
+        "Attachment",
+        "createdAt",
+        "parentId",
+        ["id", "parentId", "createdAt"],
+        where=[{"type": "equals", "attribute": "parentType", "value": "Contact"}],
+    ),
+)
+
+
+class SyncCursor:
+    """
+    How far a feed has been read: the latest timestamp handled and the
+    records already handled at exactly that timestamp, since more records
+    may share it and the next list query starts from it again.
+    """
+
+    def __init__(self, since: str, seen: set[str] | None = None) -> None:
+        self.since = since
+        self.seen = seen or set()
+
+    def is_seen(self, record_id: str, timestamp: str) -> bool:
+        return timestamp < self.since or (
+            timestamp == self.since and record_id in self.seen
+        )
+
+    def advance(self, record_id: str, timestamp: str) -> None:
+        if timestamp > self.since:
+            self.since = timestamp
+            self.seen = {record_id}
+        else:
+            self.seen.add(record_id)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"since": self.since, "seen": sorted(self.seen)}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SyncCursor":
+        return cls(data["since"], set(data.get("seen", [])))
+
+
+class LeaderLock:
+    """
+    Non-blocking flock that makes one process on the host the sync leader.
+
+    With several uvicorn workers each runs a poller, but only the one that
+    holds the lock polls; the others keep trying so one takes over if the
+    leader exits. Without fcntl every process leads.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file: Any = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None or fcntl is None
+
+    def try_acquire(self) -> bool:
+        if self.held:
+            return True
+        lock_file = open(self.path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def release(self) -> None:
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+class SyncStateStore:
+    """
+    Sync cursors for each tenant, written to a JSON file per tenant in
+    state_dir so a restart picks up where the last run stopped. Without a
+    state_dir cursors only live in memory.
+    """
+
+    def __init__(self, state_dir: str | None = None) -> None:
+        self.state_dir = Path(state_dir) if state_dir else None
+        self._cursors: dict[str, dict[str, SyncCursor]] = {}
+        self._lock = threading.Lock()
+        if self.state_dir is not None:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def leader_lock_path(self) -> Path:
+        # Without a state dir, workers on one host still elect a leader
+        # through the shared temp dir
+        return (self.state_dir or Path(tempfile.gettempdir())) / "sync-leader.lock"
+
+    def forget(self) -> None:
+        """Drop cached cursors so they are read again from disk."""
+        if self.state_dir is None:
+            return
+        with self._lock:
+            self._cursors.clear()
+
+    def _path(self, tenant: str) -> Path | None:
+        if self.state_dir is None:
+            return None
+        return self.state_dir / f"{tenant}.json"
+
+    def load(self, tenant: str) -> dict[str, SyncCursor]:
+        with self._lock:
+            cursors = self._cursors.get(tenant)
+            if cursors is not None:
+                return cursors
+
+            cursors = {}
+            path = self._path(tenant)
+            if path is not None and path.exists():
+                try:
+                    data = json.loads(path.read_text())
+                    cursors = {
+                        feed: SyncCursor.from_dict(cursor)
+                        for feed, cursor in data.items()
+                    }
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Ignoring unreadable sync state {path}: {e}")
+            self._cursors[tenant] = cursors
+            return cursors
+
+    def save(self, tenant: str) -> None:
+        path = self._path(tenant)
+        if path is None:
+            return
+        with self._lock:
+            data = {
+                feed: cursor.to_dict()
+                for feed, cursor in self._cursors.get(tenant, {}).items()
+            }
+        # Replace the file in one step so a crash never leaves half a cursor
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        temp_path.write_text(json.dumps(data))
+        os.replace(temp_path, path)
+
+
+class TenantSyncState:
+    def __init__(self, interval_seconds: float, page_size: int) -> None:
+        self.interval_seconds = interval_seconds
+        self.page_size = page_size
+        self.catching_up = False
+        self.last_poll_at: datetime | None = None
+        self.last_queued = 0
+        self.last_error: str | None = None
+
+
+class ChangePoller:
+    """
+    Polls each tenant's EspoCRM for contacts and attachments changed since a
+    persisted cursor, and queues the contacts like webhook events would.
+
+    Records are listed oldest first, a page at a time. Our own skills
+    writes, contacts that already have a job waiting to start, and records
+    handled before are skipped; a contact whose job is already running gets
+    a follow-up job. While pages come back full the tenant is
+    catching up: it is polled again after min_interval_seconds with the
+    largest page size and its contacts are queued at backfill priority.
+    Each pass that finds nothing doubles the interval, up to
+    max_interval_seconds, and halves the page size, so an idle CRM costs
+    one small request every few minutes.
+
+    The cursor only moves past records that were queued; when the queue is
+    full the pass stops and the rest are picked up on the next one. Only the
+    worker holding the leader lock polls.
+    """
+
+    def __init__(
+        self,
+        tenants: dict[str, Tenant],
+        job_store: JobStore,
+        enqueue: Callable[[Tenant, str, Priority], bool],
+        store: SyncStateStore,
+        min_interval_seconds: float = 10.0,
+        max_interval_seconds: float = 300.0,
+        min_page_size: int = 25,
+        max_page_size: int = 200,
+        initial_lookback_seconds: float = 86400.0,
+        feeds: tuple[ChangeFeed, ...] = CHANGE_FEEDS,
+        leader: LeaderLock | None = None,
+    ) -> None:
+        self.tenants = tenants
+        self.job_store = job_store
+        self.enqueue = enqueue
+        self.store = store
+        self.min_interval_seconds = min_interval_seconds
+        self.max_interval_seconds = max_interval_seconds
+        self.min_page_size = min_page_size
+        self.max_page_size = max_page_size
+        self.initial_lookback_seconds = initial_lookback_seconds
+        self.feeds = feeds
+        self.leader = leader or LeaderLock(store.leader_lock_path)
+        # A restart may follow an outage, so start out ready to catch up
+        self.states = {
+            name: TenantSyncState(min_interval_seconds, max_page_size)
+            for name in tenants
+        }
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def poll_once(self, tenant_name: str) -> int:
+        """Run one pass over every feed; returns the number of contacts queued."""
+        tenant = self.tenants[tenant_name]
+        state = self.states[tenant_name]
+        cursors = self.store.load(tenant_name)
+        queued: set[str] = set()
+        state.catching_up = False
+        state.last_error = None
+        try:
+            for feed in self.feeds:
+                cursor = cursors.get(feed.name)
+                if cursor is None:
+                    cursor = cursors[feed.name] = SyncCursor(self._initial_since())
+                try:
+                    drained = self._poll_feed(tenant, feed, cursor, state, queued)
+                finally:
+                    self.store.save(tenant_name)
+                if not drained:
+                    state.catching_up = True
+                    break
+        except Exception as e:
+            state.last_error = str(e)
+            logger.warning(f"Sync for tenant {tenant_name} failed: {e}")
+
+        state.last_poll_at = datetime.now(UTC)
+        state.last_queued = len(queued)
+        self._adapt(state)
+        if queued:
+            logger.info(
+                f"Sync queued {len(queued)} changed contacts for tenant {tenant_name}"
+            )
+        return len(queued)
+
+    def _poll_feed(
+        self,
+        tenant: Tenant,
+        feed: ChangeFeed,
+        cursor: SyncCursor,
+        state: TenantSyncState,
+        queued: set[str],
+    ) -> bool:
+        """Read pages until one is not full; returns False if the queue was full."""
+        offset = 0
+        for _ in range(MAX_PAGES_PER_PASS):
+            page_size = state.page_size
+            records = tenant.espocrm_client.list_changed(
+                feed.entity_type,
+                feed.attribute,
+                cursor.since,
+                page_size,
+                offset=offset,
+                select=feed.select,
+                where=feed.where,
+            )
+            full = len(records) >= page_size
+            state.catching_up = state.catching_up or full
+            priority = Priority.BACKFILL if state.catching_up else Priority.WEBHOOK
+
+            advanced = False
+            for record in records:
+                record_id = record.get("id")
+                timestamp = record.get(feed.attribute)
+                if not record_id or not timestamp:
+                    continue
+                if cursor.is_seen(record_id, timestamp):
+                    continue
+                contact_id = record.get(feed.contact_field)
+                if contact_id and not self._is_duplicate(
+                    tenant, record, contact_id, timestamp, queued
+                ):
+                    if not self.enqueue(tenant, contact_id, priority):
+                        return False
+                    queued.add(contact_id)
+                cursor.advance(record_id, timestamp)
+                advanced = True
+
+            if not full:
+                return True
+            # A full page of records already handled means more of them share
+            # the cursor's timestamp than fit in a page, so step past them
+            offset = 0 if advanced else offset + len(records)
+        return True
+
+    def _is_duplicate(
+        self,
+        tenant: Tenant,
+        record: dict[str, Any],
+        contact_id: str,
+        timestamp: str,
+        queued: set[str],
+    ) -> bool:
+        if contact_id in queued:
+            return True
+        if tenant.recent_writes.is_own_write(
+            contact_id, record.get("skills"), record.get("modifiedAt")
+        ):
+            return True
+        # A job that has not started yet is sure to pick the change up
+        job = self.job_store.find_active(tenant.name, contact_id)
+        if job is not None and job.state == "queued":
+            return True
+        # A job that started after the change has read it, whether it has
+        # finished or not; a later change needs a follow-up
+        started_at = self.job_store.last_started(tenant.name, contact_id)
+        if started_at is None:
+            return False
+        try:
+            changed_at = datetime.strptime(timestamp, ESPO_DATETIME_FORMAT)
+        except ValueError:
+            return False
+        return changed_at.replace(tzinfo=UTC) < started_at
+
+    def _adapt(self, state: TenantSyncState) -> None:
+        if state.catching_up:
+            state.interval_seconds = self.min_interval_seconds
+            state.page_size = min(self.max_page_size, state.page_size * 2)
+        elif state.last_queued:
+            state.interval_seconds = max(
+                self.min_interval_seconds, state.interval_seconds / 2
+            )
+        else:
+            state.interval_seconds = min(
+                self.max_interval_seconds, state.interval_seconds * 2
+            )
+            if state.last_error is None:
+                state.page_size = max(self.min_page_size, state.page_size // 2)
+
+    def _initial_since(self) -> str:
+        since = datetime.now(UTC) - timedelta(seconds=self.initial_lookback_seconds)
+        return since.strftime(ESPO_DATETIME_FORMAT)
+
+    def _lead(self) -> bool:
+        if self.leader.held:
+            return True
+        if not self.leader.try_acquire():
+            return False
+        # Another worker may have moved the cursors while this one waited
+        self.store.forget()
+        logger.info("This worker is now the sync leader")
+        return True
+
+    async def _run(self, tenant_name: str) -> None:
+        while True:
+            if not self._lead():
+                await asyncio.sleep(self.min_interval_seconds)
+                continue
+            await asyncio.to_thread(self.poll_once, tenant_name)
+            await asyncio.sleep(self.states[tenant_name].interval_seconds)
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._run(name)) for name in self.tenants
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        self.leader.release()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        report = {}
+        for name, state in self.states.items():
+            cursors = self.store.load(name)
+            report[name] = {
+                "leader": self.leader.held,
+                "interval_seconds": round(state.interval_seconds, 1),
+                "page_size": state.page_size,
+                "catching_up": state.catching_up,
+                "last_poll_at": (
+                    state.last_poll_at.isoformat() if state.last_poll_at else None
+                ),
+                "last_queued": state.last_queued,
+                "last_error": state.last_error,
+                "cursors": {feed: cursor.since for feed, cursor in cursors.items()},
+            }
+        return report
+
+
+def get_change_poller(request: Request) -> ChangePoller | None:
+    poller: ChangePoller | None = getattr(request.app.state, "change_poller", None)
+    return poller
@@ -0,0 +1,40 @@
+from .admission import RateLimiter
+from .crm.espocrm_client import EspoCRMClient
+from .crm.processor import ContactSkillsProcessor
+from .crm.write_tracker import RecentWrites
+
+DEFAULT_TENANT = "default"
+
+
+class Tenant:
+    """An EspoCRM instance served by this process, with its own client and limits."""
+
+    def __init__(
+        self,
+        name: str,
+        espocrm_client: EspoCRMClient,
+        processor: ContactSkillsProcessor,
+        webhook_secret: str,
+        recent_writes: RecentWrites,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        self.name = name
+        self.espocrm_client = espocrm_client
+        self.processor = processor
+        self.webhook_secret = webhook_secret
+        self.recent_writes = recent_writes
+        self.rate_limiter = rate_limiter
+
+
+def build_rate_limiter(
+    per_minute: int | None,
+    burst: int | None,
+    default_per_minute: int,
+    default_burst: int,
+) -> RateLimiter | None:
+    if per_minute is None and burst is None:
+        return None
+    return RateLimiter(
+        rate_per_second=(per_minute or default_per_minute) / 60,
+        burst=burst or default_burst,
+    )
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import deque
+from datetime import UTC, datetime
+from typing import Any
+
+from fastapi import Request
+
+from .models import ProcessingStats
+
+# ProcessingStats fields summed into each bucket alongside the stage timings
+COUNTERS = tuple(
+    name for name in ProcessingStats.model_fields if name != "stage_timings_ms"
+)
+
+
+def _empty_bucket() -> dict[str, Any]:
+    bucket: dict[str, Any] = {"jobs": 0, "failed": 0}
+    bucket.update(dict.fromkeys(COUNTERS, 0))
+    bucket["stage_timings_ms"] = {}
+    return bucket
+
+
+def _merge(into: dict[str, Any], bucket: dict[str, Any]) -> None:
+    for key, value in bucket.items():
+        if key == "stage_timings_ms":
+            for stage, elapsed_ms in value.items():
+                into[key][stage] = into[key].get(stage, 0.0) + elapsed_ms
+        else:
+            into[key] += value
+
+
+def _rounded(bucket: dict[str, Any]) -> dict[str, Any]:
+    return {
+        key: (
+            {stage: round(ms, 3) for stage, ms in value.items()}
+            if isinstance(value, dict)
+            else round(value, 3)
+        )
+        for key, value in bucket.items()
+    }
+
+
+class UsageAggregator:
+    """
+    Per-minute, per-tenant totals of what contact jobs used.
+
+    Each finished job adds its ProcessingStats to the bucket for the current
+    minute. Buckets older than retention_minutes are dropped as new ones are
+    added, so memory stays bounded.
+    """
+
+    def __init__(self, retention_minutes: int = 1440) -> None:
+        self.retention_minutes = retention_minutes
+        self._minutes: deque[tuple[int, dict[str, dict[str, Any]]]] = deque()
+        self._lock = threading.Lock()
+
+    def record(self, tenant: str, stats: ProcessingStats | None, success: bool) -> None:
+        job: dict[str, Any] = {"jobs": 1, "failed": 0 if success else 1}
+        if stats is not None:
+            job.update({name: getattr(stats, name) for name in COUNTERS})
+            job["stage_timings_ms"] = dict(stats.stage_timings_ms)
+
+        minute = int(time.time() // 60)
+        with self._lock:
+            if not self._minutes or self._minutes[-1][0] != minute:
+                self._minutes.append((minute, {}))
+            while self._minutes[0][0] <= minute - self.retention_minutes:
+                self._minutes.popleft()
+            tenants = self._minutes[-1][1]
+            _merge(tenants.setdefault(tenant, _empty_bucket()), job)
+
+    def query(self, minutes: int = 60, tenant: str | None = None) -> dict[str, Any]:
+        """Totals for each active minute in the window, oldest first, and overall."""
+        first_minute = int(time.time() // 60) - minutes
+        totals = _empty_bucket()
+        rows = []
+        with self._lock:
+            for minute, tenants in self._minutes:
+                if minute <= first_minute:
+                    continue
+                bucket = _empty_bucket()
+                for name, tenant_bucket in tenants.items():
+                    if tenant is None or name == tenant:
+                        _merge(bucket, tenant_bucket)
+                if not bucket["jobs"]:
+                    continue
+                _merge(totals, bucket)
+                started_at = datetime.fromtimestamp(minute * 60, UTC)
+                rows.append({"minute": started_at.isoformat(), **_rounded(bucket)})
+        return {"minutes": rows, "totals": _rounded(totals)}
+
+
+def get_usage(request: Request) -> UsageAggregator:
+    usage: UsageAggregator = request.app.state.usage
+    return usage
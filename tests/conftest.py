@@ -1,8 +1,11 @@
+import json
+from collections.abc import Callable
 from unittest.mock import patch
 
 import pytest
 
-from src.settings import Settings
+from src.security import SIGNATURE_HEADER, compute_webhook_signature
+from src.settings import Settings, settings
 
 
 @pytest.fixture
@@ -94,3 +97,21 @@ def sample_webhook_payload() -> list:
         {"id": "contact1", "name": "John Doe"},
         {"id": "contact2", "name": "Jane Smith"},
     ]
+
+
+@pytest.fixture
+def signed_webhook() -> Callable[[object], dict]:
+    def sign(payload: object) -> dict:
+        body = json.dumps(payload).encode()
+        signature = compute_webhook_signature(
+            "webhook123", body, settings.webhook_secret
+        )
+        return {
+            "content": body,
+            "headers": {
+                "Content-Type": "application/json",
+                SIGNATURE_HEADER: signature,
+            },
+        }
+
+    return sign
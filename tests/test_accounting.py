@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from src.crm.accounting import account, accounting, submit_accounted
+from src.models import ProcessingStats
+
+
+class TestAccounting:
+    def test_account_outside_job_is_ignored(self) -> None:
+        account(crm_requests=1)
+
+    def test_counts_charged_to_current_job(self) -> None:
+        stats = ProcessingStats()
+
+        with accounting(stats):
+            account(crm_requests=2, bytes_downloaded=100)
+            account(crm_requests=1)
+        account(crm_requests=5)
+
+        assert stats.crm_requests == 3
+        assert stats.bytes_downloaded == 100
+
+    def test_worker_threads_charge_submitting_job(self) -> None:
+        first, second = ProcessingStats(), ProcessingStats()
+
+        def call_llm(tokens: int) -> int:
+            account(llm_calls=1, llm_prompt_tokens=tokens)
+            return tokens
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            with accounting(first):
+                first_future = submit_accounted(executor, call_llm, 100)
+            with accounting(second):
+                second_future = submit_accounted(executor, call_llm, 50)
+            submit_accounted(executor, call_llm, 999).result()
+
+            assert first_future.result() == 100
+            assert second_future.result() == 50
+
+        assert (first.llm_calls, first.llm_prompt_tokens) == (1, 100)
+        assert (second.llm_calls, second.llm_prompt_tokens) == (1, 50)
+
+    def test_cpu_time_measured(self) -> None:
+        stats = ProcessingStats()
+
+        with accounting(stats):
+            sum(i * i for i in range(200_000))
+
+        assert stats.cpu_ms > 0
@@ -0,0 +1,99 @@
+import math
+
+import pytest
+
+from src.admission import AdmissionController, RateLimiter
+
+
+class TestRateLimiter:
+    def test_allows_burst_then_limits(self) -> None:
+        limiter = RateLimiter(rate_per_second=1.0, burst=3)
+
+        assert limiter.acquire("ip:1", now=0.0) == 0.0
+        assert limiter.acquire("ip:1", now=0.0) == 0.0
+        assert limiter.acquire("ip:1", now=0.0) == 0.0
+        assert limiter.acquire("ip:1", now=0.0) == pytest.approx(1.0)
+
+    def test_refills_over_time(self) -> None:
+        limiter = RateLimiter(rate_per_second=2.0, burst=2)
+
+        assert limiter.acquire("ip:1", cost=2, now=0.0) == 0.0
+        assert limiter.acquire("ip:1", now=0.25) == pytest.approx(0.25)
+        assert limiter.acquire("ip:1", now=0.5) == 0.0
+
+    def test_keys_are_independent(self) -> None:
+        limiter = RateLimiter(rate_per_second=1.0, burst=1)
+
+        assert limiter.acquire("ip:1", now=0.0) == 0.0
+        assert limiter.acquire("ip:2", now=0.0) == 0.0
+        assert limiter.acquire("ip:1", now=0.0) > 0
+
+    def test_peek_does_not_take_tokens(self) -> None:
+        limiter = RateLimiter(rate_per_second=1.0, burst=1)
+
+        assert limiter.peek("ip:1", now=0.0) == 0.0
+        assert limiter.peek("ip:1", now=0.0) == 0.0
+        assert limiter.acquire("ip:1", now=0.0) == 0.0
+
+    def test_charge_borrows_past_empty_bucket(self) -> None:
+        limiter = RateLimiter(rate_per_second=1.0, burst=1)
+
+        limiter.charge("ip:1", now=0.0)
+        limiter.charge("ip:1", now=0.0)
+
+        # One token of debt to repay before the next one is available
+        assert limiter.peek("ip:1", now=0.0) == 2.0
+        assert limiter.peek("ip:1", now=2.0) == 0.0
+
+    def test_cost_above_burst_never_fits(self) -> None:
+        limiter = RateLimiter(rate_per_second=1.0, burst=5)
+
+        assert math.isinf(limiter.acquire("ip:1", cost=6, now=0.0))
+
+    def test_evicts_least_recently_used_keys(self) -> None:
+        limiter = RateLimiter(rate_per_second=1.0, burst=1, max_keys=2)
+
+        limiter.acquire("ip:1", now=0.0)
+        limiter.acquire("ip:2", now=0.0)
+        limiter.acquire("ip:3", now=0.0)
+
+        # ip:1 was evicted, so it starts again with a full bucket
+        assert limiter.acquire("ip:1", now=0.0) == 0.0
+
+
+class TestAdmissionController:
+    @pytest.fixture
+    def controller(self) -> AdmissionController:
+        return AdmissionController(
+            RateLimiter(rate_per_second=1.0, burst=2),
+            max_events_per_payload=10,
+            max_inflight_jobs=3,
+            shed_retry_after_seconds=30,
+        )
+
+    def test_sheds_when_in_flight_exceeds_threshold(
+        self, controller: AdmissionController
+    ) -> None:
+        controller.job_started(3)
+
+        assert controller.shed_retry_after() == 30
+
+        controller.job_finished()
+        assert controller.shed_retry_after() is None
+        assert controller.shed_retry_after(jobs=2) == 30
+
+    def test_rate_retry_after_rounds_up(self, controller: AdmissionController) -> None:
+        assert controller.rate_retry_after("ip:1", cost=2) is None
+        assert controller.rate_retry_after("ip:1") == 1
+
+    def test_rate_retry_after_for_oversized_cost(
+        self, controller: AdmissionController
+    ) -> None:
+        assert controller.rate_retry_after("ip:1", cost=5) == 30
+
+    def test_job_finished_never_goes_negative(
+        self, controller: AdmissionController
+    ) -> None:
+        controller.job_finished()
+
+        assert controller.in_flight == 0
@@ -0,0 +1,145 @@
+import asyncio
+import io
+import json
+import threading
+import zipfile
+from unittest.mock import Mock
+
+import pytest
+
+from src.batch import (
+    BatchItem,
+    item_from_upload,
+    items_from_ndjson,
+    items_from_zip,
+    run_batch,
+)
+from src.crm.resilience import TransientDependencyError
+from src.models import ExtractedSkills
+
+
+def make_zip(files: dict[str, bytes]) -> zipfile.ZipFile:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return zipfile.ZipFile(buffer)
+
+
+def collect(
+    items: list[BatchItem], extractor: Mock, concurrency: int = 2
+) -> list[dict]:
+    async def run() -> list[dict]:
+        return [
+            json.loads(line)
+            async for line in run_batch(items, Mock(), extractor, concurrency)
+        ]
+
+    return asyncio.run(run())
+
+
+class TestBatchInputs:
+    def test_ndjson(self) -> None:
+        body = b'{"id": "a", "text": "Python"}\n\n{"text": "Go"}\n'
+
+        items = items_from_ndjson(body, max_items=10)
+
+        assert [(item.id, item.text) for item in items] == [
+            ("a", "Python"),
+            ("line-3", "Go"),
+        ]
+
+    def test_ndjson_rejects_bad_lines(self) -> None:
+        with pytest.raises(ValueError, match="Line 1"):
+            items_from_ndjson(b"not json\n", max_items=10)
+        with pytest.raises(ValueError, match="'text'"):
+            items_from_ndjson(b'{"id": "a"}\n', max_items=10)
+        with pytest.raises(ValueError, match="exceeds 1 items"):
+            items_from_ndjson(b'{"text": "a"}\n{"text": "b"}\n', max_items=1)
+
+    def test_zip_lists_documents(self) -> None:
+        archive = make_zip(
+            {
+                "resumes/alice.pdf": b"alice",
+                "__MACOSX/resumes/._alice.pdf": b"junk",
+                "resumes/.DS_Store": b"junk",
+            }
+        )
+
+        items = items_from_zip(archive, max_items=10, max_file_size=100)
+
+        assert [(item.id, item.filename) for item in items] == [
+            ("resumes/alice.pdf", "alice.pdf")
+        ]
+        assert items[0].load() == b"alice"
+
+    def test_zip_rejects_oversized_member(self) -> None:
+        archive = make_zip({"big.pdf": b"x" * 200})
+
+        with pytest.raises(ValueError, match="big.pdf"):
+            items_from_zip(archive, max_items=10, max_file_size=100)
+
+    def test_oversized_upload_fails_without_reading(self) -> None:
+        stream = Mock()
+        item = item_from_upload("big.pdf", stream, size=200, max_file_size=100)
+
+        with pytest.raises(ValueError, match="maximum size"):
+            item.load()
+        stream.read.assert_not_called()
+
+
+class TestRunBatch:
+    def test_streams_results_and_summary(self) -> None:
+        extractor = Mock()
+        extractor.extract_skills.return_value = ExtractedSkills(
+            skills=["Python"], confidence=0.9, source="test-model"
+        )
+        items = [BatchItem(id="a", text="Python dev"), BatchItem(id="b", text="  ")]
+
+        lines = collect(items, extractor)
+
+        results = {line["id"]: line for line in lines[:-1]}
+        assert results["a"]["status"] == "success"
+        assert results["a"]["skills"] == ["Python"]
+        assert "extract" in results["a"]["timings_ms"]
+        assert results["b"]["status"] == "error"
+        assert results["b"]["retryable"] is False
+        assert lines[-1]["type"] == "summary"
+        assert (lines[-1]["succeeded"], lines[-1]["failed"]) == (1, 1)
+
+    def test_unavailable_dependency_is_retryable(self) -> None:
+        extractor = Mock()
+        extractor.extract_skills.side_effect = TransientDependencyError(
+            "llm", "Circuit for llm is open", retry_after=30.0
+        )
+
+        lines = collect([BatchItem(id="a", text="Python dev")], extractor)
+
+        assert lines[0]["status"] == "error"
+        assert lines[0]["retryable"] is True
+        assert lines[0]["retry_after"] == 30.0
+
+    def test_bounded_concurrency(self) -> None:
+        lock = threading.Lock()
+        active = 0
+        peak = 0
+
+        def extract(text: str) -> ExtractedSkills:
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            threading.Event().wait(0.02)
+            with lock:
+                active -= 1
+            return ExtractedSkills(skills=[text], confidence=0.5, source="test")
+
+        extractor = Mock()
+        extractor.extract_skills.side_effect = extract
+        items = [BatchItem(id=str(i), text=f"skill{i}") for i in range(8)]
+
+        lines = collect(items, extractor, concurrency=3)
+
+        assert len(lines) == 9
+        assert peak <= 3
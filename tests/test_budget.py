@@ -0,0 +1,63 @@
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from src.crm.budget import HOUR, BudgetExhaustedError, TokenBudget
+
+NOW = 1_700_000_000.0
+
+
+def at(seconds: float) -> Any:
+    return patch("src.crm.budget.time.time", return_value=NOW + seconds)
+
+
+class TestTokenBudget:
+    def test_accounts_without_limits(self) -> None:
+        budget = TokenBudget()
+        with at(0):
+            budget.record(100, 20)
+            budget.check()
+
+            snapshot = budget.snapshot()
+
+        assert snapshot["state"] == "ok"
+        assert snapshot["hour"] == {"used": 120, "limit": None}
+        assert snapshot["total_completion_tokens"] == 20
+        assert snapshot["projected_exhaustion_at"] is None
+
+    def test_degrades_then_exhausts(self) -> None:
+        budget = TokenBudget(hourly_limit=1000, degrade_ratio=0.8)
+        with at(0):
+            budget.record(700, 0)
+            assert budget.state == "ok"
+            budget.record(150, 0)
+            assert budget.state == "degraded"
+            budget.record(150, 0)
+            assert budget.state == "exhausted"
+
+            with pytest.raises(BudgetExhaustedError) as raised:
+                budget.check()
+
+        assert raised.value.retry_after == pytest.approx(HOUR, abs=60)
+
+    def test_usage_rolls_off_the_window(self) -> None:
+        budget = TokenBudget(hourly_limit=1000, daily_limit=5000)
+        with at(0):
+            budget.record(1000, 0)
+        with at(HOUR + 60):
+            assert budget.used(HOUR) == 0
+            assert budget.state == "ok"
+            assert budget.snapshot()["day"]["used"] == 1000
+
+    def test_projects_exhaustion_from_burn_rate(self) -> None:
+        with at(0):
+            budget = TokenBudget(daily_limit=10_000)
+            budget.record(500, 0)
+        with at(600):
+            budget.record(500, 0)
+            projected = budget.projected_exhaustion()
+
+        assert projected is not None
+        # 1000 tokens over ten minutes leaves 9000 for another ~90 minutes
+        assert projected.timestamp() == pytest.approx(NOW + 600 + 90 * 60, rel=1e-6)
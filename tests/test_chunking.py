@@ -0,0 +1,48 @@
+from src.crm.chunking import chunk_text, split_sections
+
+RESUME = """Jane Doe
+jane@example.com
+
+EXPERIENCE
+Senior Engineer at Acme, 2015-2024
+Built data pipelines in Python and Go.
+
+Projects:
+Open source Kubernetes operator.
+
+EDUCATION
+BSc Computer Science"""
+
+
+class TestChunking:
+    def test_split_sections_on_headings(self) -> None:
+        sections = split_sections(RESUME)
+
+        assert [section.strip().splitlines()[0] for section in sections] == [
+            "Jane Doe",
+            "EXPERIENCE",
+            "Projects:",
+            "EDUCATION",
+        ]
+
+    def test_packs_sections_up_to_limit(self) -> None:
+        chunks = chunk_text(RESUME, max_chars=120)
+
+        assert all(len(chunk) <= 120 for chunk in chunks)
+        assert len(chunks) > 1
+        assert chunks[1].lstrip().startswith(("EXPERIENCE", "Projects:"))
+        assert "".join(chunks).replace("\n", "") == RESUME.replace("\n", "")
+
+    def test_short_text_is_one_chunk(self) -> None:
+        assert chunk_text(RESUME, max_chars=10_000) == [RESUME]
+
+    def test_oversized_section_split_on_finer_boundaries(self) -> None:
+        text = "SKILLS\n" + "\n".join(f"Skill number {index}" for index in range(50))
+
+        chunks = chunk_text(text, max_chars=100)
+
+        assert all(len(chunk) <= 100 for chunk in chunks)
+        assert all(not chunk.startswith("umber") for chunk in chunks)
+
+    def test_text_without_breaks_is_sliced(self) -> None:
+        assert chunk_text("x" * 250, max_chars=100) == ["x" * 100, "x" * 100, "x" * 50]
@@ -0,0 +1,129 @@
+import threading
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from src.crm.concurrency import AdaptiveLimiter
+from src.crm.espocrm_client import EspoAPI
+
+
+def run_call(
+    limiter: AdaptiveLimiter, latency: float, overloaded: bool = False
+) -> None:
+    with patch("src.crm.concurrency.time.monotonic", return_value=100.0):
+        started = limiter.acquire()
+    with patch("src.crm.concurrency.time.monotonic", return_value=100.0 + latency):
+        limiter.release(started, overloaded)
+
+
+class TestAdaptiveLimiter:
+    def test_grows_additively_while_fast(self) -> None:
+        limiter = AdaptiveLimiter("crm", initial_limit=1, max_limit=3)
+
+        for _ in range(10):
+            started = [limiter.acquire() for _ in range(limiter.limit)]
+            for start in started:
+                limiter.release(start)
+
+        assert limiter.limit == 3
+
+    def test_does_not_grow_while_mostly_idle(self) -> None:
+        limiter = AdaptiveLimiter("crm", initial_limit=4, max_limit=16)
+
+        for _ in range(20):
+            run_call(limiter, latency=0.1)
+
+        assert limiter.limit == 4
+
+    def test_cuts_multiplicatively_on_slow_call(self) -> None:
+        limiter = AdaptiveLimiter(
+            "crm", initial_limit=8, latency_target_seconds=0.5, backoff_ratio=0.5
+        )
+
+        run_call(limiter, latency=2.0)
+
+        assert limiter.limit == 4
+        assert limiter.snapshot()["cuts"] == 1
+
+    def test_cuts_on_overload_and_respects_minimum(self) -> None:
+        limiter = AdaptiveLimiter("crm", initial_limit=2, min_limit=1)
+
+        with patch("src.crm.concurrency.time.monotonic", side_effect=[1.0, 2.0]):
+            limiter.release(limiter.acquire(), overloaded=True)
+        with patch("src.crm.concurrency.time.monotonic", side_effect=[3.0, 4.0]):
+            limiter.release(limiter.acquire(), overloaded=True)
+
+        assert limiter.limit == 1
+
+    def test_calls_started_before_a_cut_do_not_cut_again(self) -> None:
+        limiter = AdaptiveLimiter("crm", initial_limit=8, backoff_ratio=0.5)
+        with patch("src.crm.concurrency.time.monotonic", return_value=1.0):
+            first = limiter.acquire()
+            second = limiter.acquire()
+
+        with patch("src.crm.concurrency.time.monotonic", return_value=5.0):
+            limiter.release(first, overloaded=True)
+            limiter.release(second, overloaded=True)
+
+        assert limiter.limit == 4
+        assert limiter.in_flight == 0
+
+    def test_acquire_blocks_at_limit(self) -> None:
+        limiter = AdaptiveLimiter("crm", initial_limit=1)
+        started = limiter.acquire()
+        acquired = threading.Event()
+
+        def second_call() -> None:
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=second_call)
+        thread.start()
+        assert not acquired.wait(0.05)
+
+        limiter.release(started)
+        assert acquired.wait(5)
+        thread.join()
+
+
+class TestEspoAPILimiter:
+    def test_server_errors_count_as_overload(self) -> None:
+        limiter = Mock(max_limit=4)
+        limiter.acquire.return_value = 1.0
+        api = EspoAPI("https://espocrm.invalid", "key", limiter=limiter)
+        response = Mock(status_code=503, headers={})
+
+        with patch.object(api.session, "request", return_value=response):
+            api._send("GET", "https://espocrm.invalid/Contact")
+
+        limiter.release.assert_called_once_with(1.0, True)
+
+    def test_request_errors_release_the_slot(self) -> None:
+        limiter = AdaptiveLimiter("crm", initial_limit=2)
+        api = EspoAPI("https://espocrm.invalid", "key", limiter=limiter)
+
+        with patch.object(api.session, "request", side_effect=TimeoutError("slow")):
+            with pytest.raises(TimeoutError):
+                api._send("GET", "https://espocrm.invalid/Contact")
+
+        assert limiter.in_flight == 0
+        assert limiter.limit == 1
+
+    def test_download_body_read_after_slot_released(self) -> None:
+        limiter = AdaptiveLimiter("crm", initial_limit=2)
+        api = EspoAPI("https://espocrm.invalid", "key", limiter=limiter)
+        in_flight_while_reading: list[int] = []
+
+        class SlowBody(MagicMock):
+            @property
+            def content(self) -> bytes:
+                in_flight_while_reading.append(limiter.in_flight)
+                return b"resume"
+
+        response = SlowBody(status_code=200, headers={})
+        response.__enter__.return_value = response
+        with patch.object(api.session, "request", return_value=response) as request:
+            assert api._download_file("Attachment/a1/download") == b"resume"
+
+        assert request.call_args.kwargs["stream"] is True
+        assert in_flight_while_reading == [0]
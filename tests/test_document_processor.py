@@ -1,3 +1,4 @@
+import io
 from unittest.mock import Mock, patch
 
 import pytest
@@ -45,7 +46,7 @@ class TestDocumentProcessor:
 
     def test_extract_text_from_docx(self, processor: DocumentProcessor) -> None:
         # Mock docx.Document
-        with patch("src.crm.document_processor.Document") as mock_doc_class:
+        with patch("docx.Document") as mock_doc_class:
             mock_doc = Mock()
             mock_doc_class.return_value = mock_doc
 
@@ -64,7 +65,7 @@ class TestDocumentProcessor:
             mock_doc_class.assert_called_once()
 
     def test_extract_text_from_pdf(self, processor: DocumentProcessor) -> None:
-        with patch("src.crm.document_processor.extract_pdf_text") as mock_extract:
+        with patch("pdfminer.high_level.extract_text") as mock_extract:
             mock_extract.return_value = "  Extracted PDF text  "
 
             content = b"fake pdf content"
@@ -91,7 +92,9 @@ class TestDocumentProcessor:
             result = processor.extract_text(content, "resume.pdf")
 
             assert result == "PDF content"
-            mock_extract.assert_called_once_with(content)
+            mock_extract.assert_called_once()
+            (stream,) = mock_extract.call_args.args
+            assert stream.getvalue() == content
 
     def test_extract_text_docx_file(self, processor: DocumentProcessor) -> None:
         with patch.object(processor, "extract_text_from_docx") as mock_extract:
@@ -101,7 +104,9 @@ class TestDocumentProcessor:
             result = processor.extract_text(content, "resume.docx")
 
             assert result == "DOCX content"
-            mock_extract.assert_called_once_with(content)
+            mock_extract.assert_called_once()
+            (stream,) = mock_extract.call_args.args
+            assert stream.getvalue() == content
 
     def test_extract_text_doc_file(self, processor: DocumentProcessor) -> None:
         with patch.object(processor, "extract_text_from_doc") as mock_extract:
@@ -113,6 +118,36 @@ class TestDocumentProcessor:
             assert result == "DOC content"
             mock_extract.assert_called_once_with(content)
 
+    def test_extract_text_from_stream_checks_cache_first(
+        self, processor: DocumentProcessor
+    ) -> None:
+        processor.cache_text("abc123", "Cached resume")
+        stream = io.BytesIO(b"x" * (processor.max_file_size + 1))
+
+        with patch.object(processor, "extract_text_from_pdf") as mock_extract:
+            result = processor.extract_text_from_stream(
+                stream, "resume.pdf", content_hash="abc123", size=len(stream.getvalue())
+            )
+
+        assert result == "Cached resume"
+        mock_extract.assert_not_called()
+
+    def test_extract_text_from_stream_parses_from_start(
+        self, processor: DocumentProcessor
+    ) -> None:
+        stream = io.BytesIO(b"fake pdf")
+        stream.seek(0, io.SEEK_END)
+
+        with patch.object(processor, "extract_text_from_pdf") as mock_extract:
+            mock_extract.return_value = "PDF content"
+            result = processor.extract_text_from_stream(
+                stream, "resume.pdf", content_hash="def456", size=8
+            )
+
+        assert result == "PDF content"
+        mock_extract.assert_called_once_with(stream)
+        assert stream.tell() == 0
+
     def test_extract_text_with_cache(self, processor: DocumentProcessor) -> None:
         processor.enable_cache = True
 
@@ -145,3 +180,22 @@ class TestDocumentProcessor:
 
             with pytest.raises(ValueError, match="No text could be extracted"):
                 processor.extract_text(content, "empty.pdf")
+
+    def test_cache_evicts_oldest_entries(self, processor: DocumentProcessor) -> None:
+        processor.cache_max_entries = 2
+
+        processor.cache_text("a", "text a")
+        processor.cache_text("b", "text b")
+        processor.get_cached_text("a")
+        processor.cache_text("c", "text c")
+
+        assert processor.get_cached_text("a") == "text a"
+        assert processor.get_cached_text("b") is None
+        assert processor.get_cached_text("c") == "text c"
+
+    def test_cache_entries_expire(self, processor: DocumentProcessor) -> None:
+        processor.cache_ttl_seconds = 0
+
+        processor.cache_text("a", "text a")
+
+        assert processor.get_cached_text("a") is None
@@ -2,7 +2,8 @@ from unittest.mock import patch
 
 import pytest
 
-from src.crm.espocrm_client import EspoAPIError, EspoCRMClient
+from src.crm.espocrm_client import ContactConflictError, EspoAPIError, EspoCRMClient
+from src.crm.write_tracker import RecentWrites
 from src.models import ContactData
 
 
@@ -64,6 +65,48 @@ class TestEspoCRMClient:
 
             assert result == []
 
+    def test_list_changed_filters_and_sorts_by_timestamp(
+        self, client: EspoCRMClient
+    ) -> None:
+        with patch.object(client.api, "request") as mock_request:
+            mock_request.return_value = {"total": 1, "list": [{"id": "c1"}]}
+
+            result = client.list_changed(
+                "Contact",
+                "modifiedAt",
+                "2026-01-01 00:00:00",
+                50,
+                offset=50,
+                select=["id", "modifiedAt"],
+            )
+
+            assert result == [{"id": "c1"}]
+            mock_request.assert_called_once_with(
+                "GET",
+                "Contact",
+                {
+                    "orderBy": "modifiedAt",
+                    "order": "asc",
+                    "maxSize": 50,
+                    "offset": 50,
+                    "where": [
+                        {
+                            "type": "greaterThanOrEquals",
+                            "attribute": "modifiedAt",
+                            "value": "2026-01-01 00:00:00",
+                        }
+                    ],
+                    "select": "id,modifiedAt",
+                },
+            )
+
+    def test_list_changed_api_error(self, client: EspoCRMClient) -> None:
+        with patch.object(client.api, "request") as mock_request:
+            mock_request.side_effect = EspoAPIError("API error")
+
+            with pytest.raises(ValueError, match="Failed to list Contact records"):
+                client.list_changed("Contact", "modifiedAt", "2026-01-01 00:00:00", 50)
+
     def test_download_attachment_success(self, client: EspoCRMClient) -> None:
         expected_content = b"fake attachment content"
 
@@ -96,6 +139,38 @@ class TestEspoCRMClient:
                 "PATCH", "Contact/contact123", {"skills": "Python, JavaScript, React"}
             )
 
+    def test_update_contact_skills_with_version(self, client: EspoCRMClient) -> None:
+        with patch.object(client.api, "request") as mock_request:
+            mock_request.return_value = {"id": "contact123"}
+
+            client.update_contact_skills("contact123", ["Python"], version_number=4)
+
+            mock_request.assert_called_once_with(
+                "PATCH", "Contact/contact123", {"skills": "Python", "versionNumber": 4}
+            )
+
+    def test_update_contact_skills_records_write(self, client: EspoCRMClient) -> None:
+        client.write_tracker = RecentWrites(ttl_seconds=60)
+
+        with patch.object(client.api, "request") as mock_request:
+            mock_request.return_value = {
+                "id": "contact123",
+                "modifiedAt": "2024-01-01 10:00:00",
+            }
+
+            client.update_contact_skills("contact123", ["Python", "React"])
+
+        assert client.write_tracker.is_own_write(
+            "contact123", modified_at="2024-01-01 10:00:00"
+        )
+
+    def test_update_contact_skills_conflict(self, client: EspoCRMClient) -> None:
+        with patch.object(client.api, "request") as mock_request:
+            mock_request.side_effect = EspoAPIError("Conflict", status_code=409)
+
+            with pytest.raises(ContactConflictError):
+                client.update_contact_skills("contact123", ["Python"], version_number=4)
+
     def test_update_contact_skills_api_error(self, client: EspoCRMClient) -> None:
         skills = ["Python", "JavaScript"]
 
@@ -0,0 +1,80 @@
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+from src.health import HealthProber
+
+
+class TestHealthProber:
+    def test_probe_once_records_results(self) -> None:
+        prober = HealthProber(
+            checks={"up": lambda: True, "down": lambda: False},
+            interval_seconds=10,
+            timeout_seconds=1,
+        )
+
+        asyncio.run(prober.probe_once())
+
+        assert prober.status["up"].healthy is True
+        assert prober.status["down"].healthy is False
+        assert prober.is_healthy("up") is True
+        assert prober.is_healthy("down") is False
+
+    def test_check_exception_is_unhealthy(self) -> None:
+        def failing() -> bool:
+            raise ConnectionError("refused")
+
+        prober = HealthProber(
+            checks={"crm": failing}, interval_seconds=10, timeout_seconds=1
+        )
+
+        asyncio.run(prober.probe_once())
+
+        assert prober.status["crm"].healthy is False
+        assert prober.status["crm"].error == "refused"
+
+    def test_check_timeout_is_unhealthy(self) -> None:
+        def slow() -> bool:
+            time.sleep(0.2)
+            return True
+
+        prober = HealthProber(
+            checks={"crm": slow}, interval_seconds=10, timeout_seconds=0.05
+        )
+
+        asyncio.run(prober.probe_once())
+
+        assert prober.status["crm"].healthy is False
+        assert "Timed out" in (prober.status["crm"].error or "")
+
+    def test_stale_results_are_not_healthy(self) -> None:
+        prober = HealthProber(
+            checks={"crm": lambda: True}, interval_seconds=10, timeout_seconds=1
+        )
+
+        assert prober.is_stale("crm") is True
+
+        asyncio.run(prober.probe_once())
+        later = datetime.now(UTC) + timedelta(seconds=31)
+
+        assert prober.is_stale("crm") is False
+        assert prober.is_stale("crm", now=later) is True
+
+    def test_start_and_stop(self) -> None:
+        calls: list[int] = []
+
+        def check() -> bool:
+            calls.append(1)
+            return True
+
+        async def run() -> None:
+            prober = HealthProber(
+                checks={"crm": check}, interval_seconds=0.01, timeout_seconds=1
+            )
+            prober.start()
+            await asyncio.sleep(0.05)
+            await prober.stop()
+
+        asyncio.run(run())
+
+        assert len(calls) >= 2
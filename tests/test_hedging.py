@@ -0,0 +1,106 @@
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.crm.hedging import HedgingPolicy, LatencyTracker
+from src.crm.resilience import RetryBudget
+
+
+@pytest.fixture
+def executor() -> Iterator[ThreadPoolExecutor]:
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def warmed_policy(latency: float = 0.01, **kwargs: float) -> HedgingPolicy:
+    policy = HedgingPolicy(min_samples=5, **kwargs)
+    for _ in range(5):
+        policy.latencies().record(latency)
+    return policy
+
+
+class TestLatencyTracker:
+    def test_percentile(self) -> None:
+        tracker = LatencyTracker()
+        for value in range(1, 101):
+            tracker.record(value / 100)
+
+        assert tracker.percentile(50) == 0.51
+        assert tracker.percentile(99) == 1.0
+
+    def test_window_keeps_recent_samples(self) -> None:
+        tracker = LatencyTracker(window=2)
+        for value in (5.0, 1.0, 2.0):
+            tracker.record(value)
+
+        assert len(tracker) == 2
+        assert tracker.percentile(100) == 2.0
+
+
+class TestHedgingPolicy:
+    def test_no_hedge_before_enough_samples(self, executor: ThreadPoolExecutor) -> None:
+        policy = HedgingPolicy(min_samples=5)
+
+        assert policy.hedge_delay() is None
+        assert policy.run(executor, lambda: "done") == "done"
+        assert policy.snapshot()["hedges"] == 0
+
+    def test_slow_call_is_hedged_and_hedge_wins(
+        self, executor: ThreadPoolExecutor
+    ) -> None:
+        policy = warmed_policy()
+        release = threading.Event()
+        calls: list[int] = []
+
+        def call() -> str:
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(5)
+                return "slow"
+            return "fast"
+
+        assert policy.run(executor, call) == "fast"
+        release.set()
+        snapshot = policy.snapshot()
+        assert (snapshot["hedges"], snapshot["hedge_wins"]) == (1, 1)
+
+    def test_no_hedge_without_budget(self, executor: ThreadPoolExecutor) -> None:
+        policy = warmed_policy()
+        policy.budget = RetryBudget(ratio=0.0, min_per_second=0.0, max_balance=0.0)
+        calls: list[int] = []
+
+        def call() -> str:
+            calls.append(1)
+            threading.Event().wait(0.05)
+            return "slow"
+
+        assert policy.run(executor, call) == "slow"
+        assert len(calls) == 1
+
+    def test_failed_hedge_falls_back_to_first_call(
+        self, executor: ThreadPoolExecutor
+    ) -> None:
+        policy = warmed_policy()
+        calls: list[int] = []
+
+        def call() -> str:
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("hedge failed")
+            threading.Event().wait(0.1)
+            return "first"
+
+        assert policy.run(executor, call) == "first"
+
+    def test_error_raised_when_both_fail(self, executor: ThreadPoolExecutor) -> None:
+        policy = warmed_policy()
+
+        def call() -> str:
+            threading.Event().wait(0.05)
+            raise RuntimeError("down")
+
+        with pytest.raises(RuntimeError, match="down"):
+            policy.run(executor, call)
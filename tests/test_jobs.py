@@ -0,0 +1,127 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+from src.jobs import JobStore
+from src.models import ExtractedSkills, SkillsExtractionResult
+
+
+def make_result(success: bool = True) -> SkillsExtractionResult:
+    return SkillsExtractionResult(
+        contact_id="contact1",
+        extracted_skills=ExtractedSkills(
+            skills=["Python"], confidence=0.9, source="test-model"
+        ),
+        existing_skills=[],
+        new_skills=["Python"],
+        updated_skills=["Python"],
+        success=success,
+        error=None if success else "Failed to update contact",
+    )
+
+
+class TestJobStore:
+    def test_lifecycle(self) -> None:
+        store = JobStore(max_entries=10, ttl_seconds=60)
+        job = store.create("default", "contact1", "interactive")
+
+        assert store.get(job.id).state == "queued"
+
+        assert store.claim(job.id) is True
+        assert store.get(job.id).started_at is not None
+        assert store.claim(job.id) is False
+
+        store.finish(job.id, make_result(), None)
+        finished = store.get(job.id)
+        assert finished.state == "succeeded"
+        assert finished.result.new_skills == ["Python"]
+
+    def test_failed_result(self) -> None:
+        store = JobStore(max_entries=10, ttl_seconds=60)
+        job = store.create("default", "contact1", "webhook")
+
+        store.finish(job.id, make_result(success=False), None)
+
+        assert store.get(job.id).state == "failed"
+        assert store.get(job.id).error == "Failed to update contact"
+
+    def test_bounded(self) -> None:
+        store = JobStore(max_entries=3, ttl_seconds=60)
+        jobs = []
+        for i in range(5):
+            jobs.append(store.create("default", f"contact{i}", "webhook"))
+            store.finish(jobs[-1].id, make_result(), None)
+
+        assert len(store) == 3
+        assert store.get(jobs[0].id) is None
+        assert store.get(jobs[4].id) is not None
+
+    def test_expires(self) -> None:
+        store = JobStore(max_entries=10, ttl_seconds=60)
+        with patch("src.jobs.time.monotonic", return_value=1000.0):
+            job = store.create("default", "contact1", "webhook")
+            store.finish(job.id, make_result(), None)
+
+        with patch("src.jobs.time.monotonic", return_value=1061.0):
+            assert store.get(job.id) is None
+
+    def test_wait_wakes_on_finish_from_another_thread(self) -> None:
+        store = JobStore(max_entries=10, ttl_seconds=60)
+        job = store.create("default", "contact1", "interactive")
+
+        async def wait() -> str | None:
+            timer = threading.Timer(
+                0.05, store.finish, args=(job.id, make_result(), None)
+            )
+            timer.start()
+            finished = await store.wait(job.id, timeout=5)
+            return finished.state if finished else None
+
+        assert asyncio.run(wait()) == "succeeded"
+
+    def test_wait_timeout_returns_current_status(self) -> None:
+        store = JobStore(max_entries=10, ttl_seconds=60)
+        job = store.create("default", "contact1", "interactive")
+
+        current = asyncio.run(store.wait(job.id, timeout=0.01))
+
+        assert current is not None
+        assert current.state == "queued"
+        assert asyncio.run(store.wait("missing", timeout=0.01)) is None
+
+    def test_find_active(self) -> None:
+        store = JobStore(max_entries=10, ttl_seconds=60)
+        job = store.create("default", "contact1", "webhook")
+
+        assert store.find_active("default", "contact1").id == job.id
+        assert store.find_active("acme", "contact1") is None
+
+        store.finish(job.id, make_result(), None)
+        assert store.find_active("default", "contact1") is None
+
+    def test_unfinished_jobs_are_not_dropped(self) -> None:
+        store = JobStore(max_entries=1, ttl_seconds=60)
+        with patch("src.jobs.time.monotonic", return_value=1000.0):
+            first = store.create("default", "contact1", "webhook")
+        with patch("src.jobs.time.monotonic", return_value=1061.0):
+            store.create("default", "contact2", "webhook")
+
+            # Past both the limit and the TTL, but it has not run yet
+            assert store.find_active("default", "contact1").id == first.id
+            assert store.claim(first.id) is True
+
+    def test_last_started_outlives_the_job(self) -> None:
+        store = JobStore(max_entries=10, ttl_seconds=60)
+        job = store.create("default", "contact1", "webhook")
+
+        assert store.last_started("default", "contact1") is None
+
+        store.claim(job.id)
+        store.finish(job.id, make_result(), None)
+
+        assert store.last_started("default", "contact1") == store.get(job.id).started_at
+
+    def test_claim_unknown_job(self) -> None:
+        store = JobStore(max_entries=10, ttl_seconds=60)
+
+        assert store.claim("missing") is False
@@ -0,0 +1,56 @@
+from src.crm.json_stream import JsonObjectScanner
+
+
+def feed_all(scanner: JsonObjectScanner, chunks: list[str]) -> int:
+    """Feed chunks until the object closes; returns how many were consumed."""
+    for count, chunk in enumerate(chunks, start=1):
+        if scanner.feed(chunk):
+            return count
+    return len(chunks)
+
+
+class TestJsonObjectScanner:
+    def test_closes_at_end_of_object_and_ignores_trailing_text(self) -> None:
+        scanner = JsonObjectScanner()
+        chunks = [
+            '```json\n{"ski',
+            'lls": ["Python"',
+            ', "Go"], "confidence": 0.9}',
+            "\n```",
+            " Sure!",
+        ]
+
+        consumed = feed_all(scanner, chunks)
+
+        assert consumed == 3
+        assert scanner.closed
+        assert scanner.text == '{"skills": ["Python", "Go"], "confidence": 0.9}'
+
+    def test_collects_skills_as_they_complete(self) -> None:
+        scanner = JsonObjectScanner()
+
+        scanner.feed('{"skills": ["C++", "Node')
+        assert scanner.items == ["C++"]
+
+        scanner.feed('.js", "Go')
+        assert scanner.items == ["C++", "Node.js"]
+        assert not scanner.closed
+
+    def test_handles_escapes_and_brackets_inside_strings(self) -> None:
+        scanner = JsonObjectScanner()
+
+        feed_all(
+            scanner, ['{"note": "a } \\" ] {", "skills": ["C#", "say \\"hi\\""', "]}"]
+        )
+
+        assert scanner.closed
+        assert scanner.items == ["C#", 'say "hi"']
+
+    def test_ignores_other_arrays_and_nested_keys(self) -> None:
+        scanner = JsonObjectScanner()
+
+        scanner.feed(
+            '{"tags": ["x"], "meta": {"skills": ["nested"]}, "skills": ["Go"]}'
+        )
+
+        assert scanner.items == ["Go"]
@@ -0,0 +1,59 @@
+import threading
+import time
+from pathlib import Path
+
+from src.crm.locks import ContactLocks
+
+
+class TestContactLocks:
+    def _run_concurrently(self, locks: ContactLocks, contact_ids: list[str]) -> float:
+        active = 0
+        max_active = 0
+        counter_lock = threading.Lock()
+
+        def work(contact_id: str) -> None:
+            nonlocal active, max_active
+            with locks.lock(contact_id):
+                with counter_lock:
+                    active += 1
+                    max_active = max(max_active, active)
+                time.sleep(0.02)
+                with counter_lock:
+                    active -= 1
+
+        threads = [threading.Thread(target=work, args=(cid,)) for cid in contact_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return max_active
+
+    def test_serializes_same_contact(self) -> None:
+        locks = ContactLocks()
+
+        assert self._run_concurrently(locks, ["c1"] * 4) == 1
+        assert locks.active == 0
+
+    def test_different_contacts_run_in_parallel(self) -> None:
+        locks = ContactLocks()
+
+        assert self._run_concurrently(locks, ["c1", "c2", "c3"]) > 1
+
+    def test_file_lock(self, tmp_path: Path) -> None:
+        locks = ContactLocks(str(tmp_path / "locks"), stripes=16)
+
+        assert self._run_concurrently(locks, ["c1"] * 3) == 1
+        assert len(list((tmp_path / "locks").iterdir())) == 1
+
+    def test_lock_released_on_error(self) -> None:
+        locks = ContactLocks()
+
+        try:
+            with locks.lock("c1"):
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+        assert locks.active == 0
+        with locks.lock("c1"):
+            pass
@@ -1,14 +1,114 @@
-from unittest.mock import Mock, patch
+import asyncio
+import hashlib
+import io
+import json
+import threading
+import zipfile
+from collections.abc import Callable, Iterator
+from unittest.mock import ANY, Mock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
-from src.main import app
+from src.admission import RateLimiter
+from src.crm.budget import TokenBudget
+from src.crm.quota import QuotaExceededError
+from src.crm.resilience import (
+    CircuitBreaker,
+    ResilientCaller,
+    TransientDependencyError,
+)
+from src.health import HealthProber
+from src.jobs import JobStore
+from src.main import (
+    admission,
+    app,
+    defer_for_budget,
+    enqueue_synced_contact,
+    process_contact_skills_background,
+)
+from src.models import ExtractedSkills, ProcessingStats, SkillsExtractionResult
+from src.scheduler import JobScheduler, Priority, RetryLater
+from src.security import SIGNATURE_HEADER, compute_webhook_signature
+from src.services import Services
+from src.settings import settings
+from src.usage import UsageAggregator
+
+
+@pytest.fixture
+def services() -> Iterator[Services]:
+    services = Services(
+        espocrm_client=Mock(), document_processor=Mock(), skills_extractor=Mock()
+    )
+    services.skills_extractor.tier_stats.return_value = {}
+    services.skills_extractor.hedging_stats.return_value = None
+    app.state.services = services
+    yield services
+    del app.state.services
+
+
+@pytest.fixture
+def health_prober(services: Services) -> Iterator[HealthProber]:
+    prober = HealthProber(
+        checks={
+            "espocrm": services.espocrm_client.health_check,
+            "llm": services.skills_extractor.health_check,
+        },
+        interval_seconds=15,
+        timeout_seconds=1,
+    )
+    app.state.health_prober = prober
+    yield prober
+    del app.state.health_prober
+
+
+def make_result(contact_id: str = "contact1") -> SkillsExtractionResult:
+    return SkillsExtractionResult(
+        contact_id=contact_id,
+        extracted_skills=ExtractedSkills(
+            skills=["Python"], confidence=0.9, source="test-model"
+        ),
+        existing_skills=[],
+        new_skills=["Python"],
+        updated_skills=["Python"],
+        success=True,
+    )
+
+
+@pytest.fixture
+def job_store() -> Iterator[JobStore]:
+    job_store = JobStore(max_entries=100, ttl_seconds=60)
+    app.state.job_store = job_store
+    yield job_store
+    del app.state.job_store
+
+
+@pytest.fixture
+def usage() -> Iterator[UsageAggregator]:
+    usage = UsageAggregator()
+    app.state.usage = usage
+    yield usage
+    del app.state.usage
+
+
+@pytest.fixture
+def scheduler() -> Iterator[JobScheduler]:
+    scheduler = JobScheduler(workers=1)
+    app.state.scheduler = scheduler
+    yield scheduler
+    del app.state.scheduler
 
 
 class TestWebhookEndpoints:
     @pytest.fixture
-    def client(self) -> TestClient:
+    def client(
+        self,
+        services: Services,
+        health_prober: HealthProber,
+        scheduler: JobScheduler,
+        job_store: JobStore,
+        usage: UsageAggregator,
+    ) -> TestClient:
         return TestClient(app)
 
     def test_root_endpoint(self, client: TestClient) -> None:
@@ -18,35 +118,129 @@ class TestWebhookEndpoints:
         assert data["message"] == "508 Integrations Service"
         assert data["version"] == "0.1.0"
 
-    def test_health_endpoint_healthy(self, client: TestClient) -> None:
-        with patch("src.main.EspoCRMClient") as mock_client_class:
-            mock_client = Mock()
-            mock_client.health_check.return_value = True
-            mock_client_class.return_value = mock_client
+    def test_health_endpoint_healthy(
+        self, client: TestClient, services: Services, health_prober: HealthProber
+    ) -> None:
+        services.espocrm_client.health_check.return_value = True
+        services.skills_extractor.health_check.return_value = True
+        asyncio.run(health_prober.probe_once())
 
-            response = client.get("/health")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "healthy"
-            assert data["espocrm"] == "connected"
+        response = client.get("/health")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "healthy"
+        assert data["espocrm"] == "connected"
+        assert data["llm"] == "connected"
 
-    def test_health_endpoint_degraded(self, client: TestClient) -> None:
-        with patch("src.main.EspoCRMClient") as mock_client_class:
-            mock_client = Mock()
-            mock_client.health_check.return_value = False
-            mock_client_class.return_value = mock_client
+    def test_health_endpoint_degraded(
+        self, client: TestClient, services: Services, health_prober: HealthProber
+    ) -> None:
+        services.espocrm_client.health_check.return_value = False
+        services.skills_extractor.health_check.return_value = True
+        asyncio.run(health_prober.probe_once())
 
-            response = client.get("/health")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "degraded"
-            assert data["espocrm"] == "disconnected"
+        response = client.get("/health")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "degraded"
+        assert data["espocrm"] == "disconnected"
+
+    def test_health_endpoint_reports_open_circuit(
+        self, client: TestClient, services: Services, health_prober: HealthProber
+    ) -> None:
+        services.espocrm_client.health_check.return_value = True
+        services.skills_extractor.health_check.return_value = True
+        asyncio.run(health_prober.probe_once())
+        caller = ResilientCaller(
+            "llm", lambda e: True, breaker=CircuitBreaker("llm", failure_threshold=1)
+        )
+        caller.breaker.record_failure()
+        services.callers["llm"] = caller
+
+        data = client.get("/health").json()
+
+        assert data["status"] == "degraded"
+        assert data["circuit_breakers"]["llm"]["state"] == "open"
+
+    def test_health_endpoint_reports_hedging(
+        self, client: TestClient, services: Services
+    ) -> None:
+        services.skills_extractor.hedging_stats.return_value = {"hedges": 2}
+
+        data = client.get("/health").json()
+
+        assert data["llm_hedging"] == {"hedges": 2}
+
+    def test_health_endpoint_serves_cached_result(
+        self, client: TestClient, services: Services, health_prober: HealthProber
+    ) -> None:
+        services.espocrm_client.health_check.return_value = True
+        services.skills_extractor.health_check.return_value = True
+        asyncio.run(health_prober.probe_once())
+
+        client.get("/health")
+        client.get("/health")
+
+        services.espocrm_client.health_check.assert_called_once()
+
+    def test_health_endpoint_before_first_probe(self, client: TestClient) -> None:
+        response = client.get("/health")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "degraded"
+
+    def test_liveness(self, client: TestClient) -> None:
+        response = client.get("/health/live")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ok"
+
+    def test_readiness(
+        self, client: TestClient, services: Services, health_prober: HealthProber
+    ) -> None:
+        services.espocrm_client.health_check.return_value = True
+        asyncio.run(health_prober.probe_once())
+
+        response = client.get("/health/ready")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert "latency_ms" in data["dependencies"]["espocrm"]
+        assert data["queue"]["max_in_flight"] == admission.max_inflight_jobs
+
+    def test_readiness_when_queue_saturated(
+        self, client: TestClient, services: Services, health_prober: HealthProber
+    ) -> None:
+        services.espocrm_client.health_check.return_value = True
+        asyncio.run(health_prober.probe_once())
+
+        with patch.object(admission, "max_inflight_jobs", 0):
+            response = client.get("/health/ready")
+
+        assert response.status_code == 503
+        assert response.json()["status"] == "not_ready"
+
+    def test_readiness_when_espocrm_down(
+        self, client: TestClient, services: Services, health_prober: HealthProber
+    ) -> None:
+        services.espocrm_client.health_check.return_value = False
+        asyncio.run(health_prober.probe_once())
+
+        response = client.get("/health/ready")
+
+        assert response.status_code == 503
 
     def test_espocrm_webhook_success(
-        self, client: TestClient, sample_webhook_payload: list
+        self,
+        client: TestClient,
+        sample_webhook_payload: list,
+        signed_webhook: Callable[[object], dict],
     ) -> None:
-        with patch("src.main.BackgroundTasks.add_task") as mock_add_task:
-            response = client.post("/webhooks/espocrm", json=sample_webhook_payload)
+        with patch("src.main.JobScheduler.submit") as mock_submit:
+            response = client.post(
+                "/webhooks/espocrm", **signed_webhook(sample_webhook_payload)
+            )
 
             assert response.status_code == 200
             data = response.json()
@@ -54,26 +248,169 @@ class TestWebhookEndpoints:
             assert data["events_processed"] == 2
 
             # Should queue background tasks for each event
-            assert mock_add_task.call_count == 2
+            assert mock_submit.call_count == 2
 
-    def test_espocrm_webhook_invalid_payload(self, client: TestClient) -> None:
+    def test_espocrm_webhook_invalid_payload(
+        self, client: TestClient, signed_webhook: Callable[[object], dict]
+    ) -> None:
         # Send non-array payload
         invalid_payload = {"id": "contact1", "name": "John Doe"}
 
-        response = client.post("/webhooks/espocrm", json=invalid_payload)
+        response = client.post("/webhooks/espocrm", **signed_webhook(invalid_payload))
 
         assert response.status_code == 400
         assert "must be an array" in response.json()["detail"]
 
-    def test_espocrm_webhook_empty_payload(self, client: TestClient) -> None:
-        response = client.post("/webhooks/espocrm", json=[])
+    def test_espocrm_webhook_empty_payload(
+        self, client: TestClient, signed_webhook: Callable[[object], dict]
+    ) -> None:
+        response = client.post("/webhooks/espocrm", **signed_webhook([]))
 
         assert response.status_code == 200
         data = response.json()
         assert data["events_processed"] == 0
 
-    def test_process_contact_manual(self, client: TestClient) -> None:
-        with patch("src.main.BackgroundTasks.add_task") as mock_add_task:
+    def test_espocrm_webhook_suppresses_self_triggered_events(
+        self,
+        client: TestClient,
+        services: Services,
+        signed_webhook: Callable[[object], dict],
+    ) -> None:
+        services.recent_writes.record("contact1", ["Python", "React"])
+        payload = [
+            {"id": "contact1", "skills": "Python, React"},
+            {"id": "contact2", "skills": "Python, React"},
+        ]
+
+        with patch("src.main.JobScheduler.submit") as mock_submit:
+            response = client.post("/webhooks/espocrm", **signed_webhook(payload))
+
+            assert response.status_code == 200
+            data = response.json()
+            assert data["events_processed"] == 1
+            assert data["events_suppressed"] == 1
+            mock_submit.assert_called_once_with(
+                "default",
+                process_contact_skills_background,
+                services.processor,
+                "contact2",
+                ANY,
+                ANY,
+                ANY,
+                priority=Priority.WEBHOOK,
+            )
+        assert services.recent_writes.suppressed == 1
+
+    def test_espocrm_webhook_invalid_event(
+        self, client: TestClient, signed_webhook: Callable[[object], dict]
+    ) -> None:
+        with patch("src.main.JobScheduler.submit") as mock_submit:
+            response = client.post(
+                "/webhooks/espocrm", **signed_webhook([{"name": "No ID"}])
+            )
+
+            assert response.status_code == 400
+            detail = response.json()["detail"]
+            assert detail[0]["type"] == "missing"
+            assert detail[0]["loc"] == [0, "id"]
+            mock_submit.assert_not_called()
+
+    def test_espocrm_webhook_missing_signature(
+        self, client: TestClient, sample_webhook_payload: list
+    ) -> None:
+        with patch("src.main.JobScheduler.submit") as mock_submit:
+            response = client.post("/webhooks/espocrm", json=sample_webhook_payload)
+
+            assert response.status_code == 401
+            mock_submit.assert_not_called()
+
+    def test_espocrm_webhook_tampered_body(
+        self,
+        client: TestClient,
+        sample_webhook_payload: list,
+        signed_webhook: Callable[[object], dict],
+    ) -> None:
+        request = signed_webhook(sample_webhook_payload)
+        request["content"] = request["content"].replace(b"contact1", b"contact9")
+
+        with patch("src.main.JobScheduler.submit") as mock_submit:
+            response = client.post("/webhooks/espocrm", **request)
+
+            assert response.status_code == 401
+            mock_submit.assert_not_called()
+
+    def test_espocrm_webhook_invalid_json(self, client: TestClient) -> None:
+        body = b"not json"
+        signature = compute_webhook_signature(
+            "webhook123", body, settings.webhook_secret
+        )
+
+        response = client.post(
+            "/webhooks/espocrm",
+            content=body,
+            headers={SIGNATURE_HEADER: signature},
+        )
+
+        assert response.status_code == 400
+
+    def test_espocrm_webhook_too_many_events(
+        self, client: TestClient, signed_webhook: Callable[[object], dict]
+    ) -> None:
+        payload = [{"id": f"contact{i}"} for i in range(5)]
+
+        with (
+            patch.object(admission, "max_events_per_payload", 4),
+            patch("src.main.JobScheduler.submit") as mock_submit,
+        ):
+            response = client.post("/webhooks/espocrm", **signed_webhook(payload))
+
+            assert response.status_code == 413
+            mock_submit.assert_not_called()
+
+    def test_espocrm_webhook_sheds_load(
+        self,
+        client: TestClient,
+        sample_webhook_payload: list,
+        signed_webhook: Callable[[object], dict],
+    ) -> None:
+        with (
+            patch.object(admission, "max_inflight_jobs", 0),
+            patch("src.main.JobScheduler.submit") as mock_submit,
+        ):
+            response = client.post(
+                "/webhooks/espocrm", **signed_webhook(sample_webhook_payload)
+            )
+
+            assert response.status_code == 429
+            assert response.headers["Retry-After"] == str(
+                admission.shed_retry_after_seconds
+            )
+            mock_submit.assert_not_called()
+
+    def test_process_contact_rate_limited(self, client: TestClient) -> None:
+        limiter = RateLimiter(rate_per_second=0.5, burst=1)
+
+        with (
+            patch.object(admission, "limiter", limiter),
+            patch("src.main.JobScheduler.submit") as mock_submit,
+        ):
+            first = client.post("/process-contact/contact123")
+            second = client.post("/process-contact/contact123")
+            # An unchecked API key does not buy a fresh bucket
+            rotated = client.post(
+                "/process-contact/contact123", headers={"X-Api-Key": "other-key"}
+            )
+
+            assert first.status_code == 200
+            assert second.status_code == 429
+            assert second.headers["Retry-After"] == "2"
+            assert rotated.status_code == 429
+            assert mock_submit.call_count == 1
+
+    def test_process_contact_manual(
+        self, client: TestClient, services: Services
+    ) -> None:
+        with patch("src.main.JobScheduler.submit") as mock_submit:
             response = client.post("/process-contact/contact123")
 
             assert response.status_code == 200
@@ -81,48 +418,588 @@ class TestWebhookEndpoints:
             assert data["status"] == "success"
             assert data["contact_id"] == "contact123"
 
-            mock_add_task.assert_called_once()
+            mock_submit.assert_called_once_with(
+                "default",
+                process_contact_skills_background,
+                services.processor,
+                "contact123",
+                ANY,
+                ANY,
+                ANY,
+                priority=Priority.INTERACTIVE,
+            )
+
+    def test_tenant_webhook_uses_tenant_secret_and_processor(
+        self, client: TestClient, services: Services
+    ) -> None:
+        tenant = services.add_tenant(
+            "acme", espocrm_client=Mock(), webhook_secret="acme-secret"
+        )
+        body = b'[{"id": "contact1"}]'
+        headers = {
+            SIGNATURE_HEADER: compute_webhook_signature("webhook1", body, "acme-secret")
+        }
+
+        with patch("src.main.JobScheduler.submit") as mock_submit:
+            response = client.post(
+                "/webhooks/espocrm/acme", content=body, headers=headers
+            )
+
+            assert response.status_code == 200
+            mock_submit.assert_called_once_with(
+                "acme",
+                process_contact_skills_background,
+                tenant.processor,
+                "contact1",
+                ANY,
+                ANY,
+                ANY,
+                priority=Priority.WEBHOOK,
+            )
+
+    def test_tenant_webhook_rejects_other_tenants_secret(
+        self,
+        client: TestClient,
+        services: Services,
+        signed_webhook: Callable[[object], dict],
+    ) -> None:
+        services.add_tenant("acme", espocrm_client=Mock(), webhook_secret="acme")
+
+        with patch("src.main.JobScheduler.submit") as mock_submit:
+            response = client.post(
+                "/webhooks/espocrm/acme", **signed_webhook([{"id": "contact1"}])
+            )
+
+            assert response.status_code == 401
+            mock_submit.assert_not_called()
+
+    def test_unknown_tenant(
+        self, client: TestClient, signed_webhook: Callable[[object], dict]
+    ) -> None:
+        response = client.post(
+            "/webhooks/espocrm/missing", **signed_webhook([{"id": "contact1"}])
+        )
+        assert response.status_code == 404
+
+        response = client.post("/process-contact/contact1?tenant=missing")
+        assert response.status_code == 404
+
+    def test_process_contact_for_tenant(
+        self, client: TestClient, services: Services
+    ) -> None:
+        tenant = services.add_tenant("acme", espocrm_client=Mock(), webhook_secret="s")
+
+        with patch("src.main.JobScheduler.submit") as mock_submit:
+            response = client.post("/process-contact/contact1?tenant=acme")
+
+            assert response.status_code == 200
+            assert response.json()["tenant"] == "acme"
+            mock_submit.assert_called_once_with(
+                "acme",
+                process_contact_skills_background,
+                tenant.processor,
+                "contact1",
+                ANY,
+                ANY,
+                ANY,
+                priority=Priority.INTERACTIVE,
+            )
+
+    def test_job_status_after_processing(
+        self, client: TestClient, services: Services
+    ) -> None:
+        services.processor.process_contact_skills = Mock(return_value=make_result())
+
+        with patch("src.main.JobScheduler.submit") as mock_submit:
+            response = client.post("/process-contact/contact1")
+        job_id = response.json()["job_id"]
+        assert response.json()["status_url"] == f"/jobs/{job_id}"
+
+        response = client.get(f"/jobs/{job_id}")
+        assert response.status_code == 200
+        assert response.json()["state"] == "queued"
+
+        _, func, *args = mock_submit.call_args.args
+        func(*args)
+
+        response = client.get(f"/jobs/{job_id}?wait_ms=1000")
+        data = response.json()
+        assert data["state"] == "succeeded"
+        assert data["result"]["new_skills"] == ["Python"]
+        assert "stage_timings_ms" in data["result"]["stats"]
+
+    def test_job_events_stream(self, client: TestClient, job_store: JobStore) -> None:
+        job = job_store.create("default", "contact1", "interactive")
+        job_store.finish(job.id, None, "boom")
+
+        response = client.get(f"/jobs/{job.id}/events")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text.startswith("event: failed\ndata: ")
+        assert '"error":"boom"' in response.text
+
+    def test_process_contact_wait_returns_result(
+        self, client: TestClient, services: Services
+    ) -> None:
+        services.processor.process_contact_skills = Mock(return_value=make_result())
+        in_flight = admission.in_flight
+
+        with patch("src.main.JobScheduler.submit") as mock_submit:
+            response = client.post("/process-contact/contact1?wait=true")
+
+        assert response.status_code == 200
+        assert response.json()["new_skills"] == ["Python"]
+        mock_submit.assert_not_called()
+        assert admission.in_flight == in_flight
+
+    def test_process_contact_wait_claims_queued_job(
+        self, client: TestClient, services: Services
+    ) -> None:
+        services.processor.process_contact_skills = Mock(return_value=make_result())
+        in_flight = admission.in_flight
+
+        with patch("src.main.JobScheduler.submit") as mock_submit:
+            queued = client.post("/process-contact/contact1").json()
+            response = client.post("/process-contact/contact1?wait=true")
+
+        assert response.status_code == 200
+        assert client.get(queued["status_url"]).json()["state"] == "succeeded"
+
+        # The worker later reaches the queued job and skips it
+        _, func, *args = mock_submit.call_args.args
+        func(*args)
+        services.processor.process_contact_skills.assert_called_once_with("contact1")
+        assert admission.in_flight == in_flight
+
+    def test_process_contact_wait_reports_unavailable_dependency(
+        self, client: TestClient, services: Services
+    ) -> None:
+        services.processor.process_contact_skills = Mock(
+            side_effect=TransientDependencyError(
+                "llm", "Circuit for llm is open", retry_after=7.2
+            )
+        )
+
+        with patch.object(settings, "transient_max_requeues", 0):
+            response = client.post("/process-contact/contact1?wait=true")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "8"
+        detail = response.json()["detail"]
+        assert detail["error"] == "Circuit for llm is open"
+        assert client.get(f"/jobs/{detail['job_id']}").json()["retryable"] is True
+
+    def test_process_contact_wait_reports_job_error(
+        self, client: TestClient, services: Services
+    ) -> None:
+        services.processor.process_contact_skills = Mock(
+            side_effect=RuntimeError("boom")
+        )
+
+        response = client.post("/process-contact/contact1?wait=true")
+
+        assert response.status_code == 500
+        detail = response.json()["detail"]
+        assert detail["error"] == "boom"
+        assert client.get(f"/jobs/{detail['job_id']}").json()["state"] == "failed"
+
+    def test_process_contact_wait_times_out_to_job(
+        self, client: TestClient, services: Services, job_store: JobStore
+    ) -> None:
+        release = threading.Event()
+
+        def slow(contact_id: str) -> SkillsExtractionResult:
+            release.wait(5)
+            return make_result(contact_id)
+
+        services.processor.process_contact_skills = Mock(side_effect=slow)
+
+        response = client.post("/process-contact/contact1?wait=true&timeout_ms=50")
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        # A second waiter joins the running job instead of starting another run
+        response = client.post("/process-contact/contact1?wait=true&timeout_ms=50")
+        assert response.json()["job_id"] == job_id
+
+        release.set()
+        response = client.get(f"/jobs/{job_id}?wait_ms=5000")
+        assert response.json()["state"] == "succeeded"
+        services.processor.process_contact_skills.assert_called_once()
+
+    def test_unknown_job(self, client: TestClient) -> None:
+        assert client.get("/jobs/missing").status_code == 404
+        assert client.get("/jobs/missing?wait_ms=10").status_code == 404
+        assert client.get("/jobs/missing/events").status_code == 404
+
+    def test_dry_run_uses_shared_services(
+        self, client: TestClient, services: Services
+    ) -> None:
+        services.skills_extractor.extract_skills.return_value = ExtractedSkills(
+            skills=["Python"], confidence=0.9, source="test-model"
+        )
+
+        response = client.post("/extract/dry-run", data={"text": "Python developer"})
+
+        assert response.status_code == 200
+        assert response.json()["skills"] == ["Python"]
+        services.skills_extractor.extract_skills.assert_called_once_with(
+            "Python developer"
+        )
+
+    def test_dry_run_dependency_unavailable_is_503(
+        self, client: TestClient, services: Services
+    ) -> None:
+        services.skills_extractor.extract_skills.side_effect = TransientDependencyError(
+            "llm", "Circuit for llm is open", retry_after=12.5
+        )
+
+        response = client.post("/extract/dry-run", data={"text": "Python developer"})
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "13"
+
+    def test_dry_run_upload_hashes_and_parses_spooled_file(
+        self, client: TestClient, services: Services
+    ) -> None:
+        content = b"%PDF resume bytes" * 10000
+        services.document_processor.max_file_size = len(content)
+        services.document_processor.is_allowed_type.return_value = (True, None)
+        services.document_processor.extract_text_from_stream.return_value = "Python"
+        services.skills_extractor.extract_skills.return_value = ExtractedSkills(
+            skills=["Python"], confidence=0.9, source="test-model"
+        )
+
+        response = client.post(
+            "/extract/dry-run", files={"file": ("resume.pdf", content)}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["source"] == "resume.pdf"
+        stream, filename, content_hash, size = (
+            services.document_processor.extract_text_from_stream.call_args.args
+        )
+        assert filename == "resume.pdf"
+        assert content_hash == hashlib.sha256(content).hexdigest()
+        assert size == len(content)
+
+    def test_dry_run_rejects_oversized_upload(
+        self, client: TestClient, services: Services
+    ) -> None:
+        services.document_processor.max_file_size = 1024
+        services.document_processor.is_allowed_type.return_value = (True, None)
+
+        response = client.post(
+            "/extract/dry-run", files={"file": ("resume.pdf", b"x" * 2048)}
+        )
+
+        assert response.status_code == 413
+        services.document_processor.extract_text_from_stream.assert_not_called()
+
+    def test_dry_run_rejects_unsupported_type_before_reading(
+        self, client: TestClient, services: Services
+    ) -> None:
+        services.document_processor.is_allowed_type.return_value = (
+            False,
+            "File extension 'exe' not allowed",
+        )
+
+        response = client.post(
+            "/extract/dry-run", files={"file": ("resume.exe", b"MZ")}
+        )
+
+        assert response.status_code == 400
+        services.document_processor.extract_text_from_stream.assert_not_called()
+
+    def test_dry_run_batch_ndjson(self, client: TestClient, services: Services) -> None:
+        services.skills_extractor.extract_skills.return_value = ExtractedSkills(
+            skills=["Python"], confidence=0.9, source="test-model"
+        )
+
+        response = client.post(
+            "/extract/dry-run/batch",
+            content=b'{"id": "a", "text": "Python"}\n{"id": "b", "text": "Go"}\n',
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(line["id"] for line in lines[:-1]) == ["a", "b"]
+        assert lines[-1]["type"] == "summary"
+        assert lines[-1]["succeeded"] == 2
+
+    def test_dry_run_batch_multipart_with_zip(
+        self, client: TestClient, services: Services
+    ) -> None:
+        services.document_processor.max_file_size = 1024
+        services.document_processor.is_allowed_type.return_value = (True, None)
+        services.document_processor.extract_text.return_value = "resume text"
+        services.skills_extractor.extract_skills.return_value = ExtractedSkills(
+            skills=["Python"], confidence=0.9, source="test-model"
+        )
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            zip_file.writestr("alice.pdf", b"alice")
+            zip_file.writestr("bob.docx", b"bob")
+
+        response = client.post(
+            "/extract/dry-run/batch",
+            files=[
+                ("files", ("resumes.zip", archive.getvalue())),
+                ("files", ("carol.pdf", b"carol")),
+            ],
+            data={"texts": ["Go developer"]},
+        )
+
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(line["id"] for line in lines[:-1]) == [
+            "alice.pdf",
+            "bob.docx",
+            "carol.pdf",
+            "text-0",
+        ]
+        assert all(line["status"] == "success" for line in lines[:-1])
+        assert lines[-1]["items"] == 4
+
+    def test_dry_run_batch_rejects_bad_input(self, client: TestClient) -> None:
+        response = client.post(
+            "/extract/dry-run/batch",
+            content=b"{}",
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == 415
+
+        response = client.post(
+            "/extract/dry-run/batch",
+            content=b"",
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 400
+
+        response = client.post(
+            "/extract/dry-run/batch", files={"files": ("bad.zip", b"not a zip")}
+        )
+        assert response.status_code == 400
+
+
+class TestLifespan:
+    def test_services_created_and_closed(self) -> None:
+        services = Mock()
+        tenant = Mock()
+        tenant.espocrm_client.health_check.return_value = True
+        services.tenants = {"default": tenant}
+
+        with patch("src.main.Services.create", return_value=services):
+            with TestClient(app):
+                assert app.state.services is services
+                scheduler = app.state.scheduler
+                assert scheduler.stats()["workers"] == settings.worker_count
+
+            services.close.assert_called_once()
+            assert scheduler.stats()["pending"] == 0
 
 
 class TestBackgroundProcessing:
     def test_process_contact_skills_background_success(self) -> None:
-        with patch("src.main.ContactSkillsProcessor") as mock_processor_class:
-            mock_processor = Mock()
-            mock_result = Mock()
-            mock_result.success = True
-            mock_result.new_skills = ["React", "Node.js"]
-            mock_result.updated_skills = ["Python", "JavaScript", "React", "Node.js"]
-            mock_processor.process_contact_skills.return_value = mock_result
-            mock_processor_class.return_value = mock_processor
+        mock_processor = Mock()
+        mock_result = Mock()
+        mock_result.success = True
+        mock_result.new_skills = ["React", "Node.js"]
+        mock_result.updated_skills = ["Python", "JavaScript", "React", "Node.js"]
+        mock_result.stats = ProcessingStats()
+        mock_processor.process_contact_skills.return_value = mock_result
 
-            from src.main import process_contact_skills_background
+        # Should not raise exception
+        process_contact_skills_background(mock_processor, "contact123")
 
-            # Should not raise exception
-            process_contact_skills_background("contact123")
-
-            mock_processor.process_contact_skills.assert_called_once_with("contact123")
+        mock_processor.process_contact_skills.assert_called_once_with("contact123")
 
     def test_process_contact_skills_background_failure(self) -> None:
-        with patch("src.main.ContactSkillsProcessor") as mock_processor_class:
-            mock_processor = Mock()
-            mock_result = Mock()
-            mock_result.success = False
-            mock_result.error = "Processing failed"
-            mock_processor.process_contact_skills.return_value = mock_result
-            mock_processor_class.return_value = mock_processor
-
-            from src.main import process_contact_skills_background
+        mock_processor = Mock()
+        mock_result = Mock()
+        mock_result.success = False
+        mock_result.error = "Processing failed"
+        mock_result.stats = ProcessingStats()
+        mock_processor.process_contact_skills.return_value = mock_result
 
-            # Should not raise exception even on failure
-            process_contact_skills_background("contact123")
+        # Should not raise exception even on failure
+        process_contact_skills_background(mock_processor, "contact123")
 
-            mock_processor.process_contact_skills.assert_called_once_with("contact123")
+        mock_processor.process_contact_skills.assert_called_once_with("contact123")
 
     def test_process_contact_skills_background_exception(self) -> None:
-        with patch("src.main.ContactSkillsProcessor") as mock_processor_class:
-            mock_processor_class.side_effect = Exception("Unexpected error")
+        mock_processor = Mock()
+        mock_processor.process_contact_skills.side_effect = Exception(
+            "Unexpected error"
+        )
+
+        # Should not raise exception
+        process_contact_skills_background(mock_processor, "contact123")
+
+    def test_transient_failure_requeues_job(self, job_store: JobStore) -> None:
+        mock_processor = Mock()
+        mock_processor.process_contact_skills.side_effect = TransientDependencyError(
+            "espocrm", "espocrm unavailable", retry_after=90
+        )
+        job = job_store.create("default", "contact123", Priority.WEBHOOK.value)
+
+        with pytest.raises(RetryLater) as raised:
+            process_contact_skills_background(
+                mock_processor, "contact123", job_store, job.id
+            )
+
+        assert raised.value.delay == 90
+        assert raised.value.args == (
+            mock_processor,
+            "contact123",
+            job_store,
+            job.id,
+            None,
+            2,
+            0,
+        )
+        requeued = job_store.get(job.id)
+        assert requeued is not None
+        assert requeued.state == "queued"
+        assert requeued.attempts == 1
+        assert job_store.claim(job.id)
+
+    def test_finished_job_usage_is_aggregated(self, usage: UsageAggregator) -> None:
+        mock_processor = Mock()
+        mock_processor.tenant = "acme"
+        mock_processor.process_contact_skills.return_value = SkillsExtractionResult(
+            contact_id="contact123",
+            extracted_skills=ExtractedSkills(
+                skills=["Python"], confidence=0.9, source="document_analysis"
+            ),
+            existing_skills=[],
+            new_skills=["Python"],
+            updated_skills=["Python"],
+            success=True,
+            stats=ProcessingStats(crm_requests=4, llm_prompt_tokens=1200),
+        )
+
+        process_contact_skills_background(mock_processor, "contact123", usage=usage)
+        response = TestClient(app).get("/stats/usage", params={"tenant": "acme"})
 
-            from src.main import process_contact_skills_background
+        assert response.status_code == 200
+        totals = response.json()["totals"]
+        assert totals["jobs"] == 1
+        assert totals["failed"] == 0
+        assert totals["crm_requests"] == 4
+        assert totals["llm_prompt_tokens"] == 1200
+        assert response.json()["minutes"][0]["jobs"] == 1
+
+    def test_quota_wait_requeues_without_using_an_attempt(
+        self, job_store: JobStore
+    ) -> None:
+        mock_processor = Mock()
+        mock_processor.process_contact_skills.side_effect = QuotaExceededError(
+            "llm", "LLM quota for tenant acme is used up", retry_after=12
+        )
+        job = job_store.create("acme", "contact123", Priority.WEBHOOK.value)
+
+        with pytest.raises(RetryLater) as raised:
+            process_contact_skills_background(
+                mock_processor, "contact123", job_store, job.id, attempt=3
+            )
+
+        assert raised.value.delay == 12
+        assert raised.value.args[-2:] == (3, 1)
+        requeued = job_store.get(job.id)
+        assert requeued is not None
+        assert requeued.state == "queued"
+
+    def test_quota_wait_gives_up_after_max_requeues(self, job_store: JobStore) -> None:
+        mock_processor = Mock()
+        mock_processor.process_contact_skills.side_effect = QuotaExceededError(
+            "llm", "LLM quota for tenant acme is used up", retry_after=12
+        )
+        job = job_store.create("acme", "contact123", Priority.WEBHOOK.value)
+
+        process_contact_skills_background(
+            mock_processor,
+            "contact123",
+            job_store,
+            job.id,
+            quota_waits=settings.llm_quota_max_requeues,
+        )
+
+        finished = job_store.get(job.id)
+        assert finished is not None
+        assert finished.state == "failed"
+
+    def test_transient_failure_gives_up_after_max_requeues(
+        self, job_store: JobStore
+    ) -> None:
+        mock_processor = Mock()
+        mock_processor.process_contact_skills.side_effect = TransientDependencyError(
+            "llm", "llm unavailable"
+        )
+        job = job_store.create("default", "contact123", Priority.WEBHOOK.value)
+
+        process_contact_skills_background(
+            mock_processor,
+            "contact123",
+            job_store,
+            job.id,
+            attempt=settings.transient_max_requeues + 1,
+        )
+
+        finished = job_store.get(job.id)
+        assert finished is not None
+        assert finished.state == "failed"
+        assert finished.error == "llm unavailable"
+
+
+class TestBudgetDeferral:
+    @pytest.mark.parametrize(
+        ("used", "deferred"),
+        [
+            (0, set()),
+            (850, {Priority.BACKFILL}),
+            (1000, {Priority.BACKFILL, Priority.WEBHOOK}),
+        ],
+    )
+    def test_low_priority_jobs_deferred_as_budget_runs_out(
+        self, used: int, deferred: set[Priority]
+    ) -> None:
+        budget = TokenBudget(hourly_limit=1000, degrade_ratio=0.8)
+        if used:
+            budget.record(used, 0)
+
+        assert {
+            priority for priority in Priority if defer_for_budget(budget, priority)
+        } == deferred
 
-            # Should not raise exception
-            process_contact_skills_background("contact123")
+
+class TestSyncEnqueue:
+    def test_sync_leaves_half_of_in_flight_limit_free(
+        self, services: Services, scheduler: JobScheduler, job_store: JobStore
+    ) -> None:
+        with (
+            patch.object(admission, "max_inflight_jobs", 4),
+            patch.object(admission, "_in_flight", 0),
+        ):
+            queued = [
+                enqueue_synced_contact(
+                    scheduler,
+                    job_store,
+                    UsageAggregator(),
+                    services.default_tenant,
+                    contact_id,
+                    Priority.BACKFILL,
+                )
+                for contact_id in ("c1", "c2", "c3")
+            ]
+
+            assert queued == [True, True, False]
+            assert admission.in_flight == 2
+
+        job = job_store.find_active("default", "c1")
+        assert job is not None
+        assert job.priority == Priority.BACKFILL.value
+        assert scheduler.pending == 2
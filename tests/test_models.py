@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from pydantic import ValidationError
 
@@ -7,6 +9,7 @@ from src.models import (
     ExtractedSkills,
     SkillsExtractionResult,
     WebhookEvent,
+    parse_webhook_events,
 )
 
 
@@ -47,6 +50,60 @@ class TestEspoCRMWebhookPayload:
         assert len(payload.events) == 0
 
 
+class TestParseWebhookEvents:
+    def test_parses_events(self, sample_webhook_payload: list) -> None:
+        events = parse_webhook_events(json.dumps(sample_webhook_payload).encode())
+
+        assert events == sample_webhook_payload
+
+    def test_optional_name_and_extra_fields(self) -> None:
+        events = parse_webhook_events(b'[{"id": "c1", "assignedUserId": "u1"}]')
+
+        assert events == [{"id": "c1"}]
+
+    def test_keeps_fields_used_for_self_write_detection(self) -> None:
+        events = parse_webhook_events(
+            b'[{"id": "c1", "skills": "Python", "modifiedAt": "2024-01-01 10:00:00"}]'
+        )
+
+        assert events[0].get("skills") == "Python"
+        assert events[0].get("modifiedAt") == "2024-01-01 10:00:00"
+
+    def test_matches_model_validation(self, sample_webhook_payload: list) -> None:
+        body = json.dumps(sample_webhook_payload).encode()
+
+        fast = parse_webhook_events(body)
+        payload = EspoCRMWebhookPayload.from_list(json.loads(body))
+
+        assert [WebhookEvent(**event) for event in fast] == payload.events
+
+    @pytest.mark.parametrize(
+        "event",
+        [{"name": "No ID"}, {"id": 123}, {"id": "c1", "name": ["list"]}],
+    )
+    def test_errors_match_model_validation(self, event: dict) -> None:
+        with pytest.raises(ValidationError) as model_error:
+            EspoCRMWebhookPayload.from_list([event])
+        with pytest.raises(ValidationError) as fast_error:
+            parse_webhook_events(json.dumps([event]).encode())
+
+        model_errors = [(e["type"], e["loc"]) for e in model_error.value.errors()]
+        fast_errors = [(e["type"], e["loc"][1:]) for e in fast_error.value.errors()]
+        assert fast_errors == model_errors
+
+    def test_rejects_non_array(self) -> None:
+        with pytest.raises(ValidationError) as error:
+            parse_webhook_events(b'{"id": "c1"}')
+
+        assert error.value.errors()[0]["type"] == "list_type"
+
+    def test_rejects_invalid_json(self) -> None:
+        with pytest.raises(ValidationError) as error:
+            parse_webhook_events(b"[{")
+
+        assert error.value.errors()[0]["type"] == "json_invalid"
+
+
 class TestContactData:
     def test_contact_data_creation(self, sample_contact_data: dict) -> None:
         contact = ContactData(**sample_contact_data)
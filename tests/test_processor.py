@@ -0,0 +1,333 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from src.admission import RateLimiter
+from src.crm.accounting import account
+from src.crm.espocrm_client import ContactConflictError
+from src.crm.processor import ContactSkillsProcessor
+from src.crm.quota import QuotaExceededError, take_llm_quota
+from src.crm.resilience import TransientDependencyError
+from src.models import ContactData, ExtractedSkills
+
+
+class TestContactSkillsProcessor:
+    @pytest.fixture
+    def processor(
+        self, sample_contact_data: dict, sample_attachments: list
+    ) -> ContactSkillsProcessor:
+        espocrm_client = Mock()
+        espocrm_client.get_contact.return_value = ContactData(**sample_contact_data)
+        espocrm_client.get_contact_attachments.return_value = sample_attachments
+        espocrm_client.download_attachment.return_value = b"resume bytes"
+        espocrm_client.update_contact_skills.return_value = True
+
+        document_processor = Mock()
+        document_processor.extract_text.return_value = "resume text"
+
+        skills_extractor = Mock()
+        skills_extractor.extract_skills.return_value = ExtractedSkills(
+            skills=["python", "React", "Docker", "react"],
+            confidence=0.8,
+            source="test-model",
+        )
+
+        return ContactSkillsProcessor(
+            espocrm_client=espocrm_client,
+            document_processor=document_processor,
+            skills_extractor=skills_extractor,
+        )
+
+    def test_adds_new_skills(self, processor: ContactSkillsProcessor) -> None:
+        result = processor.process_contact_skills("contact123")
+
+        assert result.success is True
+        assert result.existing_skills == ["Python", "JavaScript"]
+        assert result.new_skills == ["React", "Docker"]
+        assert result.updated_skills == ["Python", "JavaScript", "React", "Docker"]
+        processor.espocrm_client.update_contact_skills.assert_called_once_with(
+            "contact123",
+            ["Python", "JavaScript", "React", "Docker"],
+            version_number=None,
+        )
+        processor.document_processor.extract_text.assert_called_once_with(
+            b"resume bytes", "john_doe_resume.pdf"
+        )
+
+    def test_records_stage_timings(self, processor: ContactSkillsProcessor) -> None:
+        result = processor.process_contact_skills("contact123")
+
+        assert set(result.stats.stage_timings_ms) >= {
+            "fetch_contact",
+            "list_attachments",
+            "download",
+            "extract_text",
+            "extract_skills",
+            "update_contact",
+        }
+        assert result.stats.total_ms >= sum(result.stats.stage_timings_ms.values()) - 1
+
+    def test_charges_usage_from_worker_threads(
+        self, processor: ContactSkillsProcessor
+    ) -> None:
+        def download(attachment_id: str) -> bytes:
+            account(crm_requests=1, bytes_downloaded=12)
+            return b"resume bytes"
+
+        def extract(text: str) -> ExtractedSkills:
+            account(llm_calls=1, llm_prompt_tokens=300, llm_completion_tokens=40)
+            return ExtractedSkills(skills=["Go"], confidence=0.9, source="test-model")
+
+        processor.espocrm_client.download_attachment.side_effect = download
+        processor.skills_extractor.extract_skills.side_effect = extract
+
+        stats = processor.process_contact_skills("contact123").stats
+
+        assert stats.crm_requests == 1
+        assert stats.bytes_downloaded == 12
+        assert stats.chars_extracted == len("resume text")
+        assert stats.llm_calls == 1
+        assert stats.llm_prompt_tokens == 300
+        assert stats.llm_completion_tokens == 40
+        assert stats.cpu_ms > 0
+
+    def test_tenant_over_llm_quota_requeued_before_crm_calls(
+        self, processor: ContactSkillsProcessor
+    ) -> None:
+        processor.llm_limiter = RateLimiter(rate_per_second=0.01, burst=1)
+        processor.llm_limiter.acquire(processor.tenant)
+
+        with pytest.raises(QuotaExceededError) as raised:
+            processor.process_contact_skills("contact123")
+
+        assert raised.value.retry_after is not None
+        processor.espocrm_client.get_contact.assert_not_called()
+
+    def test_reports_models_that_handled_attachments(
+        self, processor: ContactSkillsProcessor, sample_attachments: list
+    ) -> None:
+        processor.espocrm_client.get_contact_attachments.return_value = [
+            *sample_attachments,
+            {"id": "attachment3", "name": "resume_2024.pdf", "type": "application/pdf"},
+        ]
+        processor.skills_extractor.extract_skills.side_effect = [
+            ExtractedSkills(skills=["Go"], confidence=0.9, source="cheap-model"),
+            ExtractedSkills(
+                skills=["Rust"], confidence=0.8, source="cheap-model+primary-model"
+            ),
+        ]
+
+        result = processor.process_contact_skills("contact123")
+
+        assert result.extracted_skills.source == "cheap-model+primary-model"
+
+    def test_admitted_job_finishes_past_its_llm_quota(
+        self, processor: ContactSkillsProcessor, sample_attachments: list
+    ) -> None:
+        processor.llm_limiter = RateLimiter(rate_per_second=0.01, burst=1)
+        processor.espocrm_client.get_contact_attachments.return_value = [
+            *sample_attachments,
+            {"id": "attachment3", "name": "resume_2024.pdf", "type": "application/pdf"},
+        ]
+
+        def extract(text: str) -> ExtractedSkills:
+            take_llm_quota()
+            return ExtractedSkills(skills=["Go"], confidence=0.9, source="test-model")
+
+        processor.skills_extractor.extract_skills.side_effect = extract
+
+        # Two completions against a burst of one: both run, none is wasted
+        result = processor.process_contact_skills("contact123")
+
+        assert result.success is True
+        assert processor.skills_extractor.extract_skills.call_count == 2
+        with pytest.raises(QuotaExceededError):
+            processor.process_contact_skills("contact123")
+
+    def test_zero_llm_quota_fails_job(self, processor: ContactSkillsProcessor) -> None:
+        processor.llm_limiter = RateLimiter(rate_per_second=0.0, burst=0)
+
+        result = processor.process_contact_skills("contact123")
+
+        assert result.success is False
+        assert result.error == "LLM quota for tenant default is zero"
+
+    def test_skips_update_when_skills_unchanged(
+        self, processor: ContactSkillsProcessor
+    ) -> None:
+        processor.skills_extractor.extract_skills.return_value = ExtractedSkills(
+            skills=["python", "JS"], confidence=0.8, source="test-model"
+        )
+
+        result = processor.process_contact_skills("contact123")
+
+        assert result.success is True
+        assert result.new_skills == []
+        assert result.updated_skills == ["Python", "JavaScript"]
+        processor.espocrm_client.update_contact_skills.assert_not_called()
+
+    def test_no_resume_attachments(self, processor: ContactSkillsProcessor) -> None:
+        processor.espocrm_client.get_contact_attachments.return_value = [
+            {"id": "a1", "name": "cover_letter.docx"}
+        ]
+
+        result = processor.process_contact_skills("contact123")
+
+        assert result.success is False
+        assert result.error == "No resume attachments found"
+
+    def test_extraction_failure(self, processor: ContactSkillsProcessor) -> None:
+        processor.skills_extractor.extract_skills.side_effect = ValueError("LLM down")
+
+        result = processor.process_contact_skills("contact123")
+
+        assert result.success is False
+        assert result.error == "Failed to extract skills from any attachment"
+
+    def test_update_failure(self, processor: ContactSkillsProcessor) -> None:
+        processor.espocrm_client.update_contact_skills.return_value = False
+
+        result = processor.process_contact_skills("contact123")
+
+        assert result.success is False
+        assert result.error == "Failed to update contact"
+
+    def test_contact_error(self, processor: ContactSkillsProcessor) -> None:
+        processor.espocrm_client.get_contact.side_effect = ValueError("not found")
+
+        result = processor.process_contact_skills("contact123")
+
+        assert result.success is False
+        assert result.error == "not found"
+
+    def test_transient_llm_failure_propagates(
+        self, processor: ContactSkillsProcessor
+    ) -> None:
+        processor.skills_extractor.extract_skills.side_effect = (
+            TransientDependencyError("llm", "llm unavailable")
+        )
+
+        with pytest.raises(TransientDependencyError):
+            processor.process_contact_skills("contact123")
+
+        processor.espocrm_client.update_contact_skills.assert_not_called()
+
+    def test_crm_reads_overlap(
+        self, processor: ContactSkillsProcessor, sample_contact_data: dict
+    ) -> None:
+        # The contact fetch and the download each wait for the other, so this
+        # only succeeds if the download starts before the contact arrives
+        barrier = threading.Barrier(2, timeout=5)
+        client = processor.espocrm_client
+        attachments = client.get_contact_attachments.return_value
+
+        def get_contact(contact_id: str) -> ContactData:
+            if client.get_contact.call_count == 1:
+                barrier.wait()
+            return ContactData(**sample_contact_data)
+
+        def get_contact_attachments(contact_id: str) -> list:
+            return attachments
+
+        def download_attachment(attachment_id: str) -> bytes:
+            barrier.wait()
+            return b"resume bytes"
+
+        client.get_contact.side_effect = get_contact
+        client.get_contact_attachments.side_effect = get_contact_attachments
+        client.download_attachment.side_effect = download_attachment
+
+        result = processor.process_contact_skills("contact123")
+
+        assert result.success is True
+        assert result.new_skills == ["React", "Docker"]
+
+    def test_downloads_processed_in_attachment_order(
+        self, processor: ContactSkillsProcessor
+    ) -> None:
+        processor.espocrm_client.get_contact_attachments.return_value = [
+            {"id": f"att{index}", "name": f"resume{index}.pdf"} for index in range(5)
+        ]
+        processor.espocrm_client.download_attachment.side_effect = (
+            lambda attachment_id: attachment_id.encode()
+        )
+
+        processor.process_contact_skills("contact123")
+
+        assert [
+            call.args
+            for call in processor.document_processor.extract_text.call_args_list
+        ] == [
+            (b"att0", "resume0.pdf"),
+            (b"att1", "resume1.pdf"),
+            (b"att2", "resume2.pdf"),
+        ]
+
+    def test_merges_onto_latest_skills(
+        self, processor: ContactSkillsProcessor, sample_contact_data: dict
+    ) -> None:
+        stale = ContactData(**sample_contact_data)
+        latest = ContactData(
+            **{**sample_contact_data, "skills": "Python, Go", "versionNumber": 7}
+        )
+        processor.espocrm_client.get_contact.side_effect = [stale, latest]
+
+        result = processor.process_contact_skills("contact123")
+
+        assert result.success is True
+        assert result.existing_skills == ["Python", "Go"]
+        assert result.updated_skills == ["Python", "Go", "React", "Docker"]
+        processor.espocrm_client.update_contact_skills.assert_called_once_with(
+            "contact123", ["Python", "Go", "React", "Docker"], version_number=7
+        )
+
+    def test_retries_on_conflict(
+        self, processor: ContactSkillsProcessor, sample_contact_data: dict
+    ) -> None:
+        first = ContactData(**{**sample_contact_data, "versionNumber": 1})
+        second = ContactData(
+            **{**sample_contact_data, "skills": "Python, Rust", "versionNumber": 2}
+        )
+        processor.espocrm_client.get_contact.side_effect = [first, first, second]
+        processor.espocrm_client.update_contact_skills.side_effect = [
+            ContactConflictError("conflict"),
+            True,
+        ]
+
+        result = processor.process_contact_skills("contact123")
+
+        assert result.success is True
+        assert result.updated_skills == ["Python", "Rust", "React", "Docker"]
+        last_call = processor.espocrm_client.update_contact_skills.call_args
+        assert last_call.kwargs["version_number"] == 2
+
+    def test_skips_write_when_concurrent_writer_added_skills(
+        self, processor: ContactSkillsProcessor, sample_contact_data: dict
+    ) -> None:
+        latest = ContactData(
+            **{**sample_contact_data, "skills": "Python, JavaScript, React, Docker"}
+        )
+        processor.espocrm_client.get_contact.side_effect = [
+            ContactData(**sample_contact_data),
+            latest,
+        ]
+
+        result = processor.process_contact_skills("contact123")
+
+        assert result.success is True
+        assert result.new_skills == []
+        processor.espocrm_client.update_contact_skills.assert_not_called()
+
+    def test_gives_up_after_repeated_conflicts(
+        self, processor: ContactSkillsProcessor
+    ) -> None:
+        processor.max_update_attempts = 2
+        processor.espocrm_client.update_contact_skills.side_effect = (
+            ContactConflictError("conflict")
+        )
+
+        result = processor.process_contact_skills("contact123")
+
+        assert result.success is False
+        assert processor.espocrm_client.update_contact_skills.call_count == 2
@@ -0,0 +1,154 @@
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from src.crm.espocrm_client import EspoAPI, EspoAPIError
+from src.crm.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+    RetryBudget,
+    TransientDependencyError,
+    is_transient_http_error,
+)
+
+
+def always_transient(error: Exception) -> bool:
+    return True
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_and_fails_fast(self) -> None:
+        breaker = CircuitBreaker("espocrm", failure_threshold=2)
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError) as raised:
+            breaker.before_call()
+        assert raised.value.retry_after is not None
+        assert raised.value.retry_after > 0
+
+    def test_half_open_allows_single_probe(self) -> None:
+        breaker = CircuitBreaker("espocrm", failure_threshold=1)
+        with patch("src.crm.resilience.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch("src.crm.resilience.time.monotonic", return_value=200.0):
+            assert breaker.state == "half_open"
+            breaker.before_call()
+            with pytest.raises(CircuitOpenError):
+                breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+        breaker.before_call()
+
+    def test_failed_probe_reopens(self) -> None:
+        breaker = CircuitBreaker("espocrm", failure_threshold=1)
+        with patch("src.crm.resilience.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch("src.crm.resilience.time.monotonic", return_value=200.0):
+            breaker.before_call()
+            breaker.record_failure()
+            assert breaker.state == "open"
+
+
+class TestRetryBudget:
+    def test_exhausts_then_refills_from_traffic(self) -> None:
+        budget = RetryBudget(ratio=0.5, min_per_second=0, max_balance=1)
+        assert budget.try_retry()
+        assert not budget.try_retry()
+
+        budget.record_request()
+        budget.record_request()
+        assert budget.try_retry()
+        assert budget.snapshot()["exhausted"] == 1
+
+
+class TestResilientCaller:
+    def test_retries_transient_errors_then_succeeds(self) -> None:
+        caller = ResilientCaller("espocrm", always_transient, backoff_seconds=0)
+        func = Mock(side_effect=[requests.ConnectionError("reset"), "ok"])
+
+        assert caller.call(func, "arg") == "ok"
+        assert func.call_count == 2
+        assert caller.breaker.state == "closed"
+
+    def test_gives_up_after_max_attempts(self) -> None:
+        caller = ResilientCaller(
+            "llm", always_transient, max_attempts=3, backoff_seconds=0
+        )
+        func = Mock(side_effect=TimeoutError("slow"))
+
+        with pytest.raises(TransientDependencyError, match="llm unavailable"):
+            caller.call(func)
+        assert func.call_count == 3
+
+    def test_no_retry_without_budget(self) -> None:
+        caller = ResilientCaller(
+            "llm",
+            always_transient,
+            budget=RetryBudget(ratio=0, min_per_second=0, max_balance=0),
+            backoff_seconds=0,
+        )
+        func = Mock(side_effect=TimeoutError("slow"))
+
+        with pytest.raises(TransientDependencyError):
+            caller.call(func)
+        func.assert_called_once()
+
+    def test_permanent_errors_pass_through(self) -> None:
+        caller = ResilientCaller(
+            "espocrm",
+            is_transient_http_error,
+            breaker=CircuitBreaker("espocrm", failure_threshold=1),
+        )
+        func = Mock(side_effect=EspoAPIError("Not found", status_code=404))
+
+        with pytest.raises(EspoAPIError):
+            caller.call(func)
+        func.assert_called_once()
+        assert caller.breaker.state == "closed"
+
+    def test_open_circuit_skips_the_call(self) -> None:
+        caller = ResilientCaller(
+            "espocrm",
+            always_transient,
+            breaker=CircuitBreaker("espocrm", failure_threshold=1),
+            max_attempts=1,
+        )
+        func = Mock(side_effect=requests.ConnectionError("refused"))
+        with pytest.raises(TransientDependencyError):
+            caller.call(func)
+
+        with pytest.raises(CircuitOpenError):
+            caller.call(func)
+        func.assert_called_once()
+
+
+class TestIsTransientHttpError:
+    @pytest.mark.parametrize(
+        ("error", "expected"),
+        [
+            (EspoAPIError("Bad gateway", status_code=502), True),
+            (EspoAPIError("Too many requests", status_code=429), True),
+            (EspoAPIError("Forbidden", status_code=403), False),
+            (EspoAPIError("Empty response"), False),
+            (requests.Timeout("timed out"), True),
+            (ValueError("bad"), False),
+        ],
+    )
+    def test_classification(self, error: Exception, expected: bool) -> None:
+        assert is_transient_http_error(error) is expected
+
+
+def test_espo_api_routes_requests_through_caller() -> None:
+    caller = ResilientCaller("espocrm", is_transient_http_error, backoff_seconds=0)
+    api = EspoAPI("https://espocrm.invalid", "key", caller=caller)
+
+    with patch.object(api, "_request", return_value={"id": "1"}) as mock_request:
+        assert api.request("GET", "Contact/1") == {"id": "1"}
+
+    mock_request.assert_called_once_with("GET", "Contact/1", None)
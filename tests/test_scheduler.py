@@ -0,0 +1,193 @@
+import threading
+
+import pytest
+
+from src.scheduler import JobScheduler, Priority, RetryLater
+
+
+class TestJobScheduler:
+    def test_round_robin_across_tenants(self) -> None:
+        scheduler = JobScheduler(workers=1)
+        order: list[str] = []
+
+        for index in range(3):
+            scheduler.submit("bulk", order.append, f"bulk{index}")
+        scheduler.submit("small", order.append, "small0")
+
+        scheduler.start()
+        scheduler.stop(timeout=5)
+
+        assert order == ["bulk0", "small0", "bulk1", "bulk2"]
+
+    def test_per_tenant_cap(self) -> None:
+        scheduler = JobScheduler(workers=3, max_per_tenant=1)
+        release = threading.Event()
+        started = threading.Event()
+        running: list[str] = []
+
+        def job(name: str) -> None:
+            running.append(name)
+            started.set()
+            release.wait(5)
+
+        scheduler.submit("acme", job, "a1")
+        scheduler.submit("acme", job, "a2")
+        scheduler.start()
+        started.wait(5)
+
+        stats = scheduler.stats()
+        assert stats["running"] == 1
+        assert stats["tenants"]["acme"] == {"pending": 1, "running": 1}
+
+        release.set()
+        scheduler.stop(timeout=5)
+        assert running == ["a1", "a2"]
+
+    def test_failing_job_does_not_stop_worker(self) -> None:
+        scheduler = JobScheduler(workers=1)
+        done: list[str] = []
+
+        def fail() -> None:
+            raise RuntimeError("boom")
+
+        scheduler.submit("acme", fail)
+        scheduler.submit("acme", done.append, "after")
+        scheduler.start()
+        scheduler.stop(timeout=5)
+
+        assert done == ["after"]
+        stats = scheduler.stats()
+        assert (stats["pending"], stats["running"], stats["tenants"]) == (0, 0, {})
+
+    def test_stop_drains_queue(self) -> None:
+        scheduler = JobScheduler(workers=2)
+        done: list[int] = []
+        scheduler.start()
+
+        for index in range(20):
+            scheduler.submit(f"tenant{index % 3}", done.append, index)
+        scheduler.stop(timeout=5)
+
+        assert sorted(done) == list(range(20))
+        assert scheduler.pending == 0
+
+    def test_interactive_jobs_jump_the_backlog(self) -> None:
+        scheduler = JobScheduler(workers=1)
+        order: list[str] = []
+
+        for index in range(50):
+            scheduler.submit("acme", order.append, f"webhook{index}")
+        scheduler.submit("acme", order.append, "manual", priority=Priority.INTERACTIVE)
+
+        scheduler.start()
+        scheduler.stop(timeout=5)
+
+        assert order[0] == "manual"
+        assert len(order) == 51
+
+    def test_weighted_share_between_classes(self) -> None:
+        scheduler = JobScheduler(
+            workers=1, weights={Priority.WEBHOOK: 3, Priority.BACKFILL: 1}
+        )
+        order: list[Priority] = []
+
+        for _ in range(8):
+            scheduler.submit("acme", order.append, Priority.WEBHOOK)
+            scheduler.submit(
+                "acme", order.append, Priority.BACKFILL, priority=Priority.BACKFILL
+            )
+
+        scheduler.start()
+        scheduler.stop(timeout=5)
+
+        # Backfill is not starved while webhooks are queued, but gets a quarter
+        assert order[:8].count(Priority.BACKFILL) == 2
+        assert len(order) == 16
+
+    def test_reserved_workers_stay_free_for_interactive(self) -> None:
+        scheduler = JobScheduler(workers=2, reserved={Priority.INTERACTIVE: 1})
+        release = threading.Event()
+        manual_done = threading.Event()
+        webhook_started = threading.Event()
+
+        def webhook() -> None:
+            webhook_started.set()
+            release.wait(5)
+
+        for _ in range(3):
+            scheduler.submit("acme", webhook)
+        scheduler.start()
+        webhook_started.wait(5)
+
+        stats = scheduler.stats()
+        assert stats["classes"]["webhook"] == {
+            "pending": 2,
+            "running": 1,
+            "reserved": 0,
+        }
+
+        scheduler.submit("acme", manual_done.set, priority=Priority.INTERACTIVE)
+        assert manual_done.wait(5)
+
+        release.set()
+        scheduler.stop(timeout=5)
+        assert scheduler.pending == 0
+
+    def test_reservation_must_leave_a_shared_worker(self) -> None:
+        with pytest.raises(ValueError):
+            JobScheduler(workers=2, reserved={Priority.INTERACTIVE: 2})
+
+    def test_retry_later_resubmits_after_delay(self) -> None:
+        scheduler = JobScheduler(workers=1)
+        attempts: list[int] = []
+        done = threading.Event()
+
+        def job(attempt: int) -> None:
+            attempts.append(attempt)
+            if attempt < 3:
+                raise RetryLater(0.01, attempt + 1)
+            done.set()
+
+        scheduler.submit("acme", job, 1)
+        scheduler.start()
+
+        assert done.wait(5)
+        scheduler.stop(timeout=5)
+        assert attempts == [1, 2, 3]
+        assert scheduler.stats()["delayed"] == 0
+
+    def test_stop_drops_delayed_retries(self) -> None:
+        scheduler = JobScheduler(workers=1)
+        ran: list[str] = []
+        scheduler.submit_after(60, "acme", ran.append, "late")
+        assert scheduler.stats()["delayed"] == 1
+
+        scheduler.start()
+        scheduler.stop(timeout=5)
+
+        assert ran == []
+        assert scheduler.stats()["delayed"] == 0
+
+    def test_deferred_class_waits_until_allowed(self) -> None:
+        deferring = threading.Event()
+        deferring.set()
+        scheduler = JobScheduler(
+            workers=1,
+            defer=lambda priority: priority == Priority.BACKFILL and deferring.is_set(),
+        )
+        webhook_done = threading.Event()
+        backfill_done = threading.Event()
+
+        scheduler.submit("acme", backfill_done.set, priority=Priority.BACKFILL)
+        scheduler.submit("acme", webhook_done.set)
+        scheduler.start()
+
+        assert webhook_done.wait(5)
+        assert not backfill_done.wait(0.05)
+        assert scheduler.stats()["deferred"] == ["backfill"]
+
+        deferring.clear()
+        # Any submission wakes the workers to look again
+        scheduler.submit("acme", lambda: None)
+        assert backfill_done.wait(5)
+        scheduler.stop(timeout=5)
@@ -0,0 +1,32 @@
+import base64
+
+from src.security import compute_webhook_signature, verify_webhook_signature
+
+
+class TestWebhookSignature:
+    def test_valid_signature(self) -> None:
+        body = b'[{"id": "contact1"}]'
+        signature = compute_webhook_signature("webhook123", body, "secret")
+
+        assert verify_webhook_signature(body, signature, "secret") is True
+
+    def test_wrong_secret(self) -> None:
+        body = b'[{"id": "contact1"}]'
+        signature = compute_webhook_signature("webhook123", body, "other")
+
+        assert verify_webhook_signature(body, signature, "secret") is False
+
+    def test_modified_body(self) -> None:
+        signature = compute_webhook_signature("webhook123", b"[]", "secret")
+
+        assert verify_webhook_signature(b"[{}]", signature, "secret") is False
+
+    def test_missing_signature(self) -> None:
+        assert verify_webhook_signature(b"[]", None, "secret") is False
+        assert verify_webhook_signature(b"[]", "", "secret") is False
+
+    def test_malformed_signature(self) -> None:
+        assert verify_webhook_signature(b"[]", "not-base64!", "secret") is False
+
+        no_separator = base64.b64encode(b"webhook123").decode()
+        assert verify_webhook_signature(b"[]", no_separator, "secret") is False
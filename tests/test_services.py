@@ -0,0 +1,80 @@
+from unittest.mock import Mock
+
+import pytest
+
+from src.services import Services
+from src.settings import TenantConfig
+
+
+class TestServices:
+    def test_processor_shares_components(self) -> None:
+        services = Services(
+            espocrm_client=Mock(), document_processor=Mock(), skills_extractor=Mock()
+        )
+
+        assert services.processor.espocrm_client is services.espocrm_client
+        assert services.processor.document_processor is services.document_processor
+        assert services.processor.skills_extractor is services.skills_extractor
+
+    def test_close_closes_pools(self) -> None:
+        services = Services(
+            espocrm_client=Mock(), document_processor=Mock(), skills_extractor=Mock()
+        )
+
+        services.close()
+
+        services.espocrm_client.close.assert_called_once()
+        services.skills_extractor.close.assert_called_once()
+        with pytest.raises(RuntimeError):
+            services.inline_executor.submit(print)
+
+    def test_close_continues_after_error(self) -> None:
+        services = Services(
+            espocrm_client=Mock(), document_processor=Mock(), skills_extractor=Mock()
+        )
+        services.espocrm_client.close.side_effect = RuntimeError("boom")
+
+        services.close()
+
+        services.skills_extractor.close.assert_called_once()
+
+    def test_configured_tenant_gets_own_client_and_limits(self) -> None:
+        services = Services(
+            espocrm_client=Mock(), document_processor=Mock(), skills_extractor=Mock()
+        )
+
+        tenant = services.add_configured_tenant(
+            "acme",
+            TenantConfig(
+                espocrm_url="https://acme.example.com",
+                espocrm_api_key="acme-key",
+                webhook_secret="acme-secret",
+                rate_limit_per_minute=60,
+                llm_requests_per_minute=30,
+            ),
+        )
+
+        assert services.tenants["acme"] is tenant
+        assert tenant.espocrm_client.api.url.startswith("https://acme.example.com")
+        assert tenant.espocrm_client.write_tracker is tenant.recent_writes
+        assert tenant.recent_writes is not services.recent_writes
+        assert tenant.rate_limiter is not None
+        assert tenant.processor.llm_limiter is not None
+        assert tenant.processor.document_processor is services.document_processor
+        assert tenant.processor.contact_locks is services.contact_locks
+        assert tenant.espocrm_client.api.caller is services.callers["espocrm:acme"]
+        assert tenant.espocrm_client.api.limiter is services.limiters["espocrm:acme"]
+        assert services.concurrency_limits()["espocrm:acme"]["in_flight"] == 0
+
+    def test_suppressed_self_writes_sums_tenants(self) -> None:
+        services = Services(
+            espocrm_client=Mock(), document_processor=Mock(), skills_extractor=Mock()
+        )
+        tenant = services.add_tenant("acme", espocrm_client=Mock(), webhook_secret="s")
+        services.recent_writes.record("contact1", ["Python"])
+        tenant.recent_writes.record("contact2", ["Go"])
+
+        services.recent_writes.is_own_write("contact1", "Python")
+        tenant.recent_writes.is_own_write("contact2", "Go")
+
+        assert services.suppressed_self_writes == 2
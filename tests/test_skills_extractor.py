@@ -1,17 +1,30 @@
 import json
+from collections.abc import Iterator
 from unittest.mock import Mock, patch
 
 import pytest
 
-from src.crm.skills_extractor import SkillsExtractor
+from src.admission import RateLimiter
+from src.crm.budget import HOUR, BudgetExhaustedError, TokenBudget
+from src.crm.hedging import HedgingPolicy
+from src.crm.quota import QuotaExceededError, check_llm_quota, llm_quota
+from src.crm.resilience import (
+    CircuitBreaker,
+    ResilientCaller,
+    TransientDependencyError,
+)
+from src.crm.skills_extractor import TRUNCATED_CONFIDENCE, SkillsExtractor, TierStats
 from src.models import ExtractedSkills
+from src.settings import settings
 
 
 class TestSkillsExtractor:
     @pytest.fixture
     def extractor(self) -> SkillsExtractor:
-        with patch("src.crm.skills_extractor.OpenAI"):
-            return SkillsExtractor()
+        extractor = SkillsExtractor()
+        with patch("openai.OpenAI"):
+            extractor.client  # noqa: B018 - create the mocked client up front
+        return extractor
 
     def test_create_skills_extraction_prompt(
         self, extractor: SkillsExtractor, sample_resume_text: str
@@ -147,6 +160,17 @@ class TestSkillsExtractor:
 
             assert result.confidence == 0.7  # Default value
 
+    def test_client_is_created_lazily(self) -> None:
+        with patch("openai.OpenAI") as mock_openai:
+            extractor = SkillsExtractor()
+            mock_openai.assert_not_called()
+
+            assert extractor.client is extractor.client
+            mock_openai.assert_called_once()
+
+    def test_close_without_client(self) -> None:
+        SkillsExtractor().close()
+
     def test_extract_skills_openai_exception(
         self, extractor: SkillsExtractor, sample_resume_text: str
     ) -> None:
@@ -155,3 +179,395 @@ class TestSkillsExtractor:
 
             with pytest.raises(ValueError, match="Skills extraction failed"):
                 extractor.extract_skills(sample_resume_text)
+
+    def test_transient_llm_failure_is_not_swallowed(
+        self, extractor: SkillsExtractor, sample_resume_text: str
+    ) -> None:
+        extractor.caller = ResilientCaller("llm", lambda e: True, max_attempts=1)
+
+        with patch.object(extractor.client.chat.completions, "create") as mock_create:
+            mock_create.side_effect = ConnectionError("connection reset")
+
+            with pytest.raises(TransientDependencyError):
+                extractor.extract_skills(sample_resume_text)
+
+    def test_fallback_model_used_when_primary_fails(
+        self, extractor: SkillsExtractor, sample_resume_text: str
+    ) -> None:
+        extractor.fallback_model = "backup-model"
+        extractor._fallback_client = Mock()
+        fallback_response = Mock()
+        fallback_response.choices = [
+            Mock(message=Mock(content='{"skills": ["Go"], "confidence": 0.6}'))
+        ]
+        fallback_create = extractor._fallback_client.chat.completions.create
+        fallback_create.return_value = fallback_response
+
+        with patch.object(extractor.client.chat.completions, "create") as mock_create:
+            mock_create.side_effect = TimeoutError("primary timed out")
+
+            result = extractor.extract_skills(sample_resume_text)
+
+        assert result.skills == ["Go"]
+        assert result.source == "backup-model"
+        assert fallback_create.call_args.kwargs["model"] == "backup-model"
+
+    def test_primary_error_raised_when_fallback_fails(
+        self, extractor: SkillsExtractor, sample_resume_text: str
+    ) -> None:
+        extractor.caller = ResilientCaller("llm", lambda e: True, max_attempts=1)
+        extractor.fallback_model = "backup-model"
+        extractor._fallback_client = Mock()
+        extractor._fallback_client.chat.completions.create.side_effect = (
+            ConnectionError("fallback down")
+        )
+
+        with patch.object(extractor.client.chat.completions, "create") as mock_create:
+            mock_create.side_effect = ConnectionError("primary down")
+
+            with pytest.raises(TransientDependencyError):
+                extractor.extract_skills(sample_resume_text)
+
+    def test_fallback_skipped_while_shared_endpoint_circuit_open(
+        self, extractor: SkillsExtractor, sample_resume_text: str
+    ) -> None:
+        extractor.caller = ResilientCaller(
+            "llm",
+            lambda e: True,
+            breaker=CircuitBreaker("llm", failure_threshold=1),
+            max_attempts=1,
+        )
+        extractor.fallback_model = "backup-model"
+        extractor._fallback_client = Mock()
+        fallback_create = extractor._fallback_client.chat.completions.create
+        fallback_create.side_effect = ConnectionError("endpoint down")
+
+        with patch.object(extractor.client.chat.completions, "create") as mock_create:
+            mock_create.side_effect = ConnectionError("endpoint down")
+            for _ in range(2):
+                with pytest.raises(TransientDependencyError):
+                    extractor.extract_skills(sample_resume_text)
+
+        # Only the call that opened the circuit tried the fallback
+        assert fallback_create.call_count == 1
+
+    def test_fallback_calls_go_through_own_circuit(
+        self, extractor: SkillsExtractor, sample_resume_text: str
+    ) -> None:
+        extractor.fallback_model = "backup-model"
+        extractor.fallback_caller = ResilientCaller(
+            "llm-fallback",
+            lambda e: True,
+            breaker=CircuitBreaker("llm-fallback", failure_threshold=1),
+            max_attempts=1,
+        )
+        extractor._fallback_client = Mock()
+        fallback_create = extractor._fallback_client.chat.completions.create
+        fallback_create.side_effect = ConnectionError("fallback down")
+
+        with (
+            patch.object(settings, "llm_fallback_base_url", "https://backup.invalid"),
+            patch.object(extractor.client.chat.completions, "create") as mock_create,
+        ):
+            mock_create.side_effect = ConnectionError("primary down")
+            for _ in range(2):
+                with pytest.raises(ValueError):
+                    extractor.extract_skills(sample_resume_text)
+
+        assert fallback_create.call_count == 1
+        assert extractor.fallback_caller.snapshot()["state"] == "open"
+
+    def test_cheap_model_result_accepted(
+        self, extractor: SkillsExtractor, sample_resume_text: str
+    ) -> None:
+        self.enable_cascade(extractor)
+
+        with patch.object(extractor.client.chat.completions, "create") as mock_create:
+            mock_create.return_value = completion(["Python", "Go", "SQL"], 0.9)
+
+            result = extractor.extract_skills(sample_resume_text)
+
+        assert result.source == "cheap-model"
+        mock_create.assert_called_once()
+        assert mock_create.call_args.kwargs["model"] == "cheap-model"
+        assert extractor.tier_stats()["cheap"]["accepted"] == 1
+
+    @pytest.mark.parametrize(
+        ("skills", "confidence"),
+        [(["Python", "Go", "SQL"], 0.4), (["Python"], 0.95)],
+    )
+    def test_weak_cheap_result_escalates(
+        self,
+        extractor: SkillsExtractor,
+        sample_resume_text: str,
+        skills: list[str],
+        confidence: float,
+    ) -> None:
+        self.enable_cascade(extractor)
+
+        with patch.object(extractor.client.chat.completions, "create") as mock_create:
+            mock_create.side_effect = [
+                completion(skills, confidence),
+                completion(["Python", "Go", "SQL", "Kubernetes"], 0.9),
+            ]
+
+            result = extractor.extract_skills(sample_resume_text)
+
+        assert result.source == extractor.model
+        assert result.skills == ["Python", "Go", "SQL", "Kubernetes"]
+        stats = extractor.tier_stats()
+        assert stats["cheap"]["escalated"] == 1
+        assert stats["cheap"]["hit_rate"] == 0.0
+        assert stats["primary"]["calls"] == 1
+
+    def test_invalid_cheap_response_escalates(
+        self, extractor: SkillsExtractor, sample_resume_text: str
+    ) -> None:
+        self.enable_cascade(extractor)
+        invalid = Mock()
+        invalid.choices = [Mock(message=Mock(content="not json"))]
+
+        with patch.object(extractor.client.chat.completions, "create") as mock_create:
+            mock_create.side_effect = [
+                invalid,
+                completion(["Python", "Go", "SQL"], 0.9),
+            ]
+
+            result = extractor.extract_skills(sample_resume_text)
+
+        assert result.source == extractor.model
+        assert extractor.tier_stats()["cheap"]["errors"] == 1
+
+    def test_llm_quota_charged_per_completion(
+        self, extractor: SkillsExtractor, sample_resume_text: str
+    ) -> None:
+        self.enable_cascade(extractor)
+        limiter = RateLimiter(rate_per_second=0.01, burst=1)
+
+        with patch.object(extractor.client.chat.completions, "create") as mock_create:
+            mock_create.return_value = completion(["Python"], 0.4)
+
+            # The escalation needs more completions than the burst; the job
+            # borrows them instead of failing halfway
+            with llm_quota(limiter, "acme"):
+                result = extractor.extract_skills(sample_resume_text)
+
+        assert result.source == extractor.model
+        assert mock_create.call_count == 2
+        # The debt holds back the tenant's next job instead
+        with pytest.raises(QuotaExceededError):
+            check_llm_quota(limiter, "acme")
+
+    def test_hedging_stats(self, extractor: SkillsExtractor) -> None:
+        assert extractor.hedging_stats() is None
+
+        hedged = SkillsExtractor(hedging=HedgingPolicy())
+        try:
+            stats = hedged.hedging_stats()
+        finally:
+            hedged.close()
+
+        assert stats is not None
+        assert (stats["hedges"], stats["hedge_wins"]) == (0, 0)
+        assert "budget" in stats
+
+    @staticmethod
+    def enable_cascade(extractor: SkillsExtractor) -> None:
+        extractor.cheap_model = "cheap-model"
+        extractor.tiers["cheap"] = TierStats("cheap-model")
+
+
+def completion(skills: list[str], confidence: float) -> Mock:
+    response = Mock()
+    response.choices = [
+        Mock(
+            message=Mock(
+                content=json.dumps({"skills": skills, "confidence": confidence})
+            )
+        )
+    ]
+    return response
+
+
+def stream_of(*pieces: str, consumed: list[str] | None = None) -> Mock:
+    def chunks() -> Iterator[Mock]:
+        for piece in pieces:
+            if consumed is not None:
+                consumed.append(piece)
+            yield Mock(choices=[Mock(delta=Mock(content=piece))])
+
+    stream = Mock()
+    stream.__iter__ = Mock(return_value=chunks())
+    return stream
+
+
+class TestStreamingExtraction:
+    @pytest.fixture
+    def extractor(self) -> Iterator[SkillsExtractor]:
+        extractor = SkillsExtractor()
+        with patch("openai.OpenAI"):
+            extractor.client  # noqa: B018 - create the mocked client up front
+        with patch.object(settings, "llm_streaming", True):
+            yield extractor
+
+    def test_stops_reading_when_object_closes(
+        self, extractor: SkillsExtractor, sample_resume_text: str
+    ) -> None:
+        consumed: list[str] = []
+        stream = stream_of(
+            '{"skills": ["Python", ',
+            '"Docker"], "confidence": 0.8}',
+            "\nLet me know if you need anything else",
+            consumed=consumed,
+        )
+
+        with patch.object(extractor.client.chat.completions, "create") as mock_create:
+            mock_create.return_value = stream
+
+            result = extractor.extract_skills(sample_resume_text)
+
+        assert result.skills == ["Python", "Docker"]
+        assert result.confidence == 0.8
+        assert len(consumed) == 2
+        stream.close.assert_called_once()
+        assert mock_create.call_args.kwargs["stream"] is True
+        assert (
+            mock_create.call_args.kwargs["max_tokens"] == settings.llm_max_output_tokens
+        )
+
+    def test_keeps_skills_from_truncated_output(
+        self, extractor: SkillsExtractor, sample_resume_text: str
+    ) -> None:
+        with patch.object(extractor.client.chat.completions, "create") as mock_create:
+            mock_create.return_value = stream_of('{"skills": ["Go", "Rust", "Ru')
+
+            result = extractor.extract_skills(sample_resume_text)
+
+        assert result.skills == ["Go", "Rust"]
+        assert result.confidence == TRUNCATED_CONFIDENCE
+
+
+class TestChunkedExtraction:
+    @pytest.fixture
+    def extractor(self) -> Iterator[SkillsExtractor]:
+        extractor = SkillsExtractor()
+        with (
+            patch.object(settings, "llm_chunk_threshold_chars", 60),
+            patch.object(settings, "llm_chunk_size_chars", 60),
+        ):
+            yield extractor
+
+    def test_short_resume_uses_single_call(self, extractor: SkillsExtractor) -> None:
+        with patch.object(extractor, "_extract_document") as extract:
+            extract.return_value = ExtractedSkills(
+                skills=["Go"], confidence=0.9, source="m"
+            )
+
+            extractor.extract_skills("EXPERIENCE\nGo developer")
+
+        extract.assert_called_once_with("EXPERIENCE\nGo developer")
+
+    def test_long_resume_is_chunked_and_combined(
+        self, extractor: SkillsExtractor
+    ) -> None:
+        text = (
+            "EXPERIENCE\nBuilt services in Go and Python for ten years.\n"
+            "EDUCATION\nMSc in distributed systems and databases.\n"
+            "REFERENCES\nAvailable on request from former managers."
+        )
+        by_section = {
+            "EXPERIENCE": ExtractedSkills(
+                skills=["Go", "Python"], confidence=0.9, source="m"
+            ),
+            "EDUCATION": ExtractedSkills(
+                skills=["Distributed Systems", "python"], confidence=0.6, source="m"
+            ),
+        }
+
+        def extract(chunk: str, min_skills: int) -> ExtractedSkills:
+            heading = chunk.split("\n", 1)[0]
+            if heading == "REFERENCES":
+                raise ValueError("Skills extraction failed: no JSON")
+            return by_section[heading]
+
+        with patch.object(extractor, "_extract_document", side_effect=extract):
+            result = extractor.extract_skills(text)
+
+        assert result.skills == ["Python", "Go", "Distributed Systems"]
+        assert result.confidence == pytest.approx((0.9 * 2 + 0.6 * 2) / 4)
+
+    def test_chunks_past_the_limit_are_skipped(
+        self, extractor: SkillsExtractor
+    ) -> None:
+        text = "\n".join(f"SECTION {i}\nWorked with tool number {i}." for i in range(5))
+
+        with (
+            patch.object(settings, "llm_max_chunks", 2),
+            patch.object(extractor, "_extract_document") as extract,
+        ):
+            extract.return_value = ExtractedSkills(
+                skills=["Go"], confidence=0.9, source="m"
+            )
+            extractor.extract_skills(text)
+
+        assert extract.call_count == 2
+
+    def test_chunked_transient_error_propagates(
+        self, extractor: SkillsExtractor
+    ) -> None:
+        with patch.object(extractor, "_extract_document") as extract:
+            extract.side_effect = TransientDependencyError("llm", "llm unavailable")
+
+            with pytest.raises(TransientDependencyError):
+                extractor.extract_skills("EXPERIENCE\n" + "Go developer. " * 20)
+
+
+class TestTokenBudget:
+    @pytest.fixture
+    def extractor(self) -> SkillsExtractor:
+        extractor = SkillsExtractor(budget=TokenBudget(hourly_limit=1000))
+        with patch("openai.OpenAI"):
+            extractor.client  # noqa: B018 - create the mocked client up front
+        return extractor
+
+    def test_records_usage_from_response(
+        self, extractor: SkillsExtractor, sample_resume_text: str
+    ) -> None:
+        response = completion(["Go"], 0.9)
+        response.usage = Mock(prompt_tokens=120, completion_tokens=30)
+
+        with patch.object(extractor.client.chat.completions, "create") as mock_create:
+            mock_create.return_value = response
+            extractor.extract_skills(sample_resume_text)
+
+        assert extractor.budget is not None
+        assert extractor.budget.used(HOUR) == 150
+
+    def test_exhausted_budget_refuses_calls(
+        self, extractor: SkillsExtractor, sample_resume_text: str
+    ) -> None:
+        assert extractor.budget is not None
+        extractor.budget.record(1000, 0)
+
+        with patch.object(extractor.client.chat.completions, "create") as mock_create:
+            with pytest.raises(BudgetExhaustedError):
+                extractor.extract_skills(sample_resume_text)
+
+        mock_create.assert_not_called()
+
+    def test_low_budget_keeps_weak_cheap_result(
+        self, extractor: SkillsExtractor, sample_resume_text: str
+    ) -> None:
+        TestSkillsExtractor.enable_cascade(extractor)
+        assert extractor.budget is not None
+        extractor.budget.record(900, 0)
+        response = completion(["Go"], 0.4)
+        response.usage = Mock(prompt_tokens=10, completion_tokens=5)
+
+        with patch.object(extractor.client.chat.completions, "create") as mock_create:
+            mock_create.return_value = response
+
+            result = extractor.extract_skills(sample_resume_text)
+
+        assert result.source == "cheap-model"
+        mock_create.assert_called_once()
@@ -0,0 +1,109 @@
+import pytest
+
+from src.crm.skills_merge import SkillNormalizer, SkillsMerger
+from src.models import ExtractedSkills
+
+
+class TestSkillNormalizer:
+    @pytest.fixture
+    def normalizer(self) -> SkillNormalizer:
+        return SkillNormalizer()
+
+    @pytest.mark.parametrize(
+        ("first", "second"),
+        [
+            ("Python", "python"),
+            ("  Machine   Learning ", "machine learning"),
+            ("scikit-learn", "Scikit_Learn"),
+            ("Docker.", "docker"),
+            ("(AWS)", "aws"),
+            ("JS", "JavaScript"),
+            ("Golang", "Go"),
+            ("NodeJS", "Node.js"),
+            ("k8s", "Kubernetes"),
+        ],
+    )
+    def test_equivalent_skills(
+        self, normalizer: SkillNormalizer, first: str, second: str
+    ) -> None:
+        assert normalizer.canonical(first) == normalizer.canonical(second)
+
+    @pytest.mark.parametrize(
+        ("first", "second"),
+        [("C", "C++"), ("C", "C#"), ("Java", "JavaScript"), (".NET", "NET")],
+    )
+    def test_distinct_skills(
+        self, normalizer: SkillNormalizer, first: str, second: str
+    ) -> None:
+        assert normalizer.canonical(first) != normalizer.canonical(second)
+
+    def test_custom_aliases(self) -> None:
+        normalizer = SkillNormalizer(aliases={"tf": "tensorflow"})
+
+        assert normalizer.canonical("TF") == "tensorflow"
+        assert normalizer.canonical("JS") == "js"
+
+
+class TestSkillsMerger:
+    @pytest.fixture
+    def merger(self) -> SkillsMerger:
+        return SkillsMerger()
+
+    def test_dedupe_keeps_first_spelling_and_order(self, merger: SkillsMerger) -> None:
+        result = merger.dedupe(["Python", "React", "python", " PYTHON ", "react.js"])
+
+        assert result == ["Python", "React"]
+
+    def test_dedupe_drops_empty(self, merger: SkillsMerger) -> None:
+        assert merger.dedupe(["", "  ", "...", "Git"]) == ["Git"]
+
+    def test_merge_appends_new_skills_in_order(self, merger: SkillsMerger) -> None:
+        result = merger.merge(["Python", "JavaScript"], ["docker", "python", "AWS"])
+
+        assert result.new_skills == ["docker", "AWS"]
+        assert result.updated_skills == ["Python", "JavaScript", "docker", "AWS"]
+        assert result.changed is True
+
+    def test_merge_unchanged_when_only_variants(self, merger: SkillsMerger) -> None:
+        result = merger.merge(["Python", "JavaScript"], ["python", "JS"])
+
+        assert result.new_skills == []
+        assert result.changed is False
+
+    def test_merge_collapses_existing_duplicates(self, merger: SkillsMerger) -> None:
+        result = merger.merge(["Python", "python"], ["Go"])
+
+        assert result.updated_skills == ["Python", "Go"]
+
+    def test_merge_is_stable(self, merger: SkillsMerger) -> None:
+        first = merger.merge(["Python"], ["React", "Docker"])
+        second = merger.merge(first.updated_skills, ["Docker", "react"])
+
+        assert second.updated_skills == first.updated_skills
+        assert second.changed is False
+
+    def test_combine_ranks_by_summed_confidence(self, merger: SkillsMerger) -> None:
+        combined = merger.combine(
+            [
+                ExtractedSkills(skills=["Go", "python"], confidence=0.5, source="m"),
+                ExtractedSkills(skills=["Python", "K8s"], confidence=0.9, source="m"),
+                ExtractedSkills(skills=["Kubernetes"], confidence=0.6, source="m"),
+            ]
+        )
+
+        assert combined.skills == ["K8s", "Python", "Go"]
+        assert combined.confidence == pytest.approx((0.5 * 2 + 0.9 * 2 + 0.6) / 5)
+        assert combined.source == "m"
+
+    def test_combine_ignores_empty_chunks_in_confidence(
+        self, merger: SkillsMerger
+    ) -> None:
+        combined = merger.combine(
+            [
+                ExtractedSkills(skills=["Go"], confidence=0.9, source="cheap"),
+                ExtractedSkills(skills=[], confidence=0.1, source="strong"),
+            ]
+        )
+
+        assert combined.confidence == 0.9
+        assert combined.source == "cheap+strong"
@@ -0,0 +1,45 @@
+import asyncio
+import subprocess
+import sys
+
+from src.startup import FirstRequestTimer, process_uptime_seconds
+
+
+class TestProcessUptime:
+    def test_uptime_is_positive(self) -> None:
+        assert process_uptime_seconds() > 0
+
+
+class TestFirstRequestTimer:
+    def test_records_first_http_request_only(self) -> None:
+        calls: list[str] = []
+
+        async def app(scope: dict, receive: object, send: object) -> None:
+            calls.append(scope["type"])
+
+        timer = FirstRequestTimer(app)  # type: ignore[arg-type]
+
+        asyncio.run(timer({"type": "lifespan"}, None, None))  # type: ignore[arg-type]
+        assert timer.time_to_first_request is None
+
+        asyncio.run(timer({"type": "http", "path": "/"}, None, None))  # type: ignore[arg-type]
+        first = timer.time_to_first_request
+        asyncio.run(timer({"type": "http", "path": "/"}, None, None))  # type: ignore[arg-type]
+
+        assert first is not None
+        assert timer.time_to_first_request == first
+        assert calls == ["lifespan", "http", "http"]
+
+
+class TestLazyImports:
+    def test_importing_app_does_not_load_heavy_dependencies(self) -> None:
+        code = (
+            "import sys, src.main; "
+            "print(','.join(m for m in ('openai', 'pdfminer', 'docx') "
+            "if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.strip() == ""
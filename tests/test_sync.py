@@ -0,0 +1,341 @@
+import json
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+
+from src.crm.write_tracker import RecentWrites
+from src.jobs import JobStore
+from src.scheduler import Priority
+from src.sync import (
+    ESPO_DATETIME_FORMAT,
+    ChangeFeed,
+    ChangePoller,
+    LeaderLock,
+    SyncCursor,
+    SyncStateStore,
+)
+from src.tenants import Tenant
+
+CONTACTS = ChangeFeed("contacts", "Contact", "modifiedAt", "id", ["id"])
+
+
+def _contact(contact_id: str, modified_at: str, **fields: Any) -> dict[str, Any]:
+    return {"id": contact_id, "modifiedAt": modified_at, **fields}
+
+
+class FakeCRM:
+    """Serves list_changed from a fixed set of records, like EspoCRM would."""
+
+    def __init__(self, records: list[dict[str, Any]]) -> None:
+        self.records = records
+        self.calls: list[tuple[str, int, int]] = []
+
+    def list_changed(
+        self,
+        entity_type: str,
+        attribute: str,
+        since: str,
+        max_size: int,
+        offset: int = 0,
+        select: list[str] | None = None,
+        where: list[dict[str, Any]] | None = None,
+    ) -> list[dict[str, Any]]:
+        self.calls.append((since, max_size, offset))
+        matching = sorted(
+            (record for record in self.records if record[attribute] >= since),
+            key=lambda record: record[attribute],
+        )
+        return matching[offset : offset + max_size]
+
+
+class TestSyncCursor:
+    def test_records_at_cursor_timestamp_remembered(self) -> None:
+        cursor = SyncCursor("2026-01-01 00:00:00")
+
+        cursor.advance("a", "2026-01-01 00:00:05")
+        cursor.advance("b", "2026-01-01 00:00:05")
+
+        assert cursor.is_seen("a", "2026-01-01 00:00:05")
+        assert not cursor.is_seen("c", "2026-01-01 00:00:05")
+        assert cursor.is_seen("c", "2026-01-01 00:00:04")
+
+        cursor.advance("c", "2026-01-01 00:00:06")
+
+        assert cursor.seen == {"c"}
+
+
+class TestSyncStateStore:
+    def test_cursors_persist_across_instances(self, tmp_path: Path) -> None:
+        store = SyncStateStore(str(tmp_path))
+        store.load("acme")["contacts"] = SyncCursor("2026-01-01 00:00:05", {"a"})
+        store.save("acme")
+
+        cursors = SyncStateStore(str(tmp_path)).load("acme")
+
+        assert cursors["contacts"].since == "2026-01-01 00:00:05"
+        assert cursors["contacts"].seen == {"a"}
+
+    def test_unreadable_state_starts_fresh(self, tmp_path: Path) -> None:
+        (tmp_path / "acme.json").write_text("{not json")
+
+        assert SyncStateStore(str(tmp_path)).load("acme") == {}
+
+    def test_in_memory_without_directory(self) -> None:
+        store = SyncStateStore()
+        store.load("acme")["contacts"] = SyncCursor("2026-01-01 00:00:05")
+        store.save("acme")
+
+        assert store.load("acme")["contacts"].since == "2026-01-01 00:00:05"
+
+
+class TestLeaderLock:
+    def test_one_holder_at_a_time(self, tmp_path: Path) -> None:
+        first = LeaderLock(tmp_path / "sync-leader.lock")
+        second = LeaderLock(tmp_path / "sync-leader.lock")
+
+        assert first.try_acquire()
+        assert not second.try_acquire()
+
+        first.release()
+
+        assert second.try_acquire()
+        assert second.held
+        second.release()
+
+
+class TestChangePoller:
+    @pytest.fixture
+    def job_store(self) -> JobStore:
+        return JobStore(max_entries=100, ttl_seconds=60)
+
+    @pytest.fixture
+    def recent_writes(self) -> RecentWrites:
+        return RecentWrites(ttl_seconds=60)
+
+    @pytest.fixture
+    def enqueue(self) -> Mock:
+        return Mock(return_value=True)
+
+    def _poller(
+        self,
+        crm: Any,
+        job_store: JobStore,
+        recent_writes: RecentWrites,
+        enqueue: Mock,
+        store: SyncStateStore | None = None,
+        **limits: Any,
+    ) -> ChangePoller:
+        tenant = Tenant(
+            name="acme",
+            espocrm_client=crm,
+            processor=Mock(),
+            webhook_secret="secret",
+            recent_writes=recent_writes,
+        )
+        store = store or SyncStateStore()
+        store.load("acme")["contacts"] = SyncCursor("2026-01-01 00:00:00")
+        return ChangePoller(
+            {"acme": tenant},
+            job_store,
+            enqueue,
+            store,
+            feeds=(CONTACTS,),
+            **limits,
+        )
+
+    def test_queues_changed_contacts_in_order_across_pages(
+        self, job_store: JobStore, recent_writes: RecentWrites, enqueue: Mock
+    ) -> None:
+        records = [_contact(f"c{i}", f"2026-01-01 00:00:{i:02d}") for i in range(1, 6)]
+        poller = self._poller(
+            FakeCRM(records),
+            job_store,
+            recent_writes,
+            enqueue,
+            min_page_size=2,
+            max_page_size=2,
+        )
+
+        assert poller.poll_once("acme") == 5
+
+        queued = [call.args[1] for call in enqueue.call_args_list]
+        assert queued == ["c1", "c2", "c3", "c4", "c5"]
+        # Full pages mean a backlog, which goes in as backfill
+        assert enqueue.call_args_list[0].args[2] == Priority.BACKFILL
+        assert poller.store.load("acme")["contacts"].since == "2026-01-01 00:00:05"
+
+    def test_next_pass_skips_records_already_handled(
+        self, job_store: JobStore, recent_writes: RecentWrites, enqueue: Mock
+    ) -> None:
+        records = [
+            _contact("c1", "2026-01-01 00:00:05"),
+            _contact("c2", "2026-01-01 00:00:05"),
+        ]
+        poller = self._poller(FakeCRM(records), job_store, recent_writes, enqueue)
+        poller.poll_once("acme")
+        records.append(_contact("c3", "2026-01-01 00:00:05"))
+
+        assert poller.poll_once("acme") == 1
+        assert enqueue.call_args.args[1:] == ("c3", Priority.WEBHOOK)
+
+    def test_ties_larger_than_a_page_are_stepped_over(
+        self, job_store: JobStore, recent_writes: RecentWrites, enqueue: Mock
+    ) -> None:
+        records = [_contact(f"c{i}", "2026-01-01 00:00:05") for i in range(5)]
+        poller = self._poller(
+            FakeCRM(records),
+            job_store,
+            recent_writes,
+            enqueue,
+            min_page_size=2,
+            max_page_size=2,
+        )
+
+        assert poller.poll_once("acme") == 5
+
+    def test_only_the_leader_polls_and_takes_over_saved_cursors(
+        self,
+        job_store: JobStore,
+        recent_writes: RecentWrites,
+        enqueue: Mock,
+        tmp_path: Path,
+    ) -> None:
+        store = SyncStateStore(str(tmp_path))
+        poller = self._poller(
+            FakeCRM([]),
+            job_store,
+            recent_writes,
+            enqueue,
+            store=store,
+            leader=LeaderLock(tmp_path / "leader.lock"),
+        )
+        other = LeaderLock(tmp_path / "leader.lock")
+        other.try_acquire()
+
+        assert not poller._lead()
+
+        # The old leader moved the cursor before it went away
+        saved = SyncStateStore(str(tmp_path))
+        saved.load("acme")["contacts"] = SyncCursor("2026-01-01 00:00:09")
+        saved.save("acme")
+        other.release()
+
+        assert poller._lead()
+        assert store.load("acme")["contacts"].since == "2026-01-01 00:00:09"
+        assert poller.snapshot()["acme"]["leader"] is True
+
+    def test_skips_own_writes_and_active_jobs(
+        self, job_store: JobStore, recent_writes: RecentWrites, enqueue: Mock
+    ) -> None:
+        recent_writes.record("c1", ["Python"])
+        job_store.create("acme", "c2", Priority.WEBHOOK.value)
+        records = [
+            _contact("c1", "2026-01-01 00:00:01", skills="Python"),
+            _contact("c2", "2026-01-01 00:00:02"),
+            _contact("c3", "2026-01-01 00:00:03"),
+        ]
+        poller = self._poller(FakeCRM(records), job_store, recent_writes, enqueue)
+
+        assert poller.poll_once("acme") == 1
+        assert enqueue.call_args.args[1] == "c3"
+
+    def test_change_after_job_started_gets_follow_up(
+        self, job_store: JobStore, recent_writes: RecentWrites, enqueue: Mock
+    ) -> None:
+        running = job_store.create("acme", "c1", Priority.WEBHOOK.value)
+        assert job_store.claim(running.id)
+        changed_at = datetime.now(UTC) + timedelta(seconds=5)
+        poller = self._poller(
+            FakeCRM([_contact("c1", changed_at.strftime(ESPO_DATETIME_FORMAT))]),
+            job_store,
+            recent_writes,
+            enqueue,
+        )
+
+        assert poller.poll_once("acme") == 1
+        assert enqueue.call_args.args[1] == "c1"
+
+    def test_change_seen_by_finished_job_is_skipped(
+        self, job_store: JobStore, recent_writes: RecentWrites, enqueue: Mock
+    ) -> None:
+        # A webhook job that found nothing new leaves modifiedAt as it was
+        job = job_store.create("acme", "c1", Priority.WEBHOOK.value)
+        assert job_store.claim(job.id)
+        job_store.finish(job.id, None, "No resume attachments found")
+        poller = self._poller(
+            FakeCRM([_contact("c1", "2026-01-01 00:00:01")]),
+            job_store,
+            recent_writes,
+            enqueue,
+        )
+
+        assert poller.poll_once("acme") == 0
+        enqueue.assert_not_called()
+
+    def test_full_queue_stops_pass_without_moving_cursor(
+        self, job_store: JobStore, recent_writes: RecentWrites, enqueue: Mock
+    ) -> None:
+        records = [_contact(f"c{i}", f"2026-01-01 00:00:0{i}") for i in range(1, 4)]
+        enqueue.side_effect = [True, False, True, True]
+        poller = self._poller(FakeCRM(records), job_store, recent_writes, enqueue)
+
+        assert poller.poll_once("acme") == 1
+        assert poller.store.load("acme")["contacts"].since == "2026-01-01 00:00:01"
+        assert poller.states["acme"].catching_up
+
+        assert poller.poll_once("acme") == 2
+
+    def test_interval_and_page_size_adapt_to_change_volume(
+        self, job_store: JobStore, recent_writes: RecentWrites, enqueue: Mock
+    ) -> None:
+        crm = FakeCRM([])
+        poller = self._poller(
+            crm,
+            job_store,
+            recent_writes,
+            enqueue,
+            min_interval_seconds=10,
+            max_interval_seconds=60,
+            min_page_size=25,
+            max_page_size=200,
+        )
+        state = poller.states["acme"]
+
+        for _ in range(4):
+            poller.poll_once("acme")
+
+        assert state.interval_seconds == 60
+        assert state.page_size == 25
+
+        crm.records = [
+            _contact(f"c{i}", f"2026-01-01 00:{i // 60:02d}:{i % 60:02d}")
+            for i in range(30)
+        ]
+        poller.poll_once("acme")
+
+        assert state.interval_seconds == 10
+        assert state.page_size == 50
+
+    def test_list_errors_back_off_and_keep_cursor(
+        self,
+        job_store: JobStore,
+        recent_writes: RecentWrites,
+        enqueue: Mock,
+        tmp_path: Path,
+    ) -> None:
+        crm = Mock()
+        crm.list_changed.side_effect = ValueError("Failed to list Contact records")
+        poller = self._poller(
+            crm, job_store, recent_writes, enqueue, store=SyncStateStore(str(tmp_path))
+        )
+
+        assert poller.poll_once("acme") == 0
+
+        state = poller.states["acme"]
+        assert state.last_error == "Failed to list Contact records"
+        assert state.interval_seconds == 20
+        saved = json.loads((tmp_path / "acme.json").read_text())
+        assert saved["contacts"]["since"] == "2026-01-01 00:00:00"
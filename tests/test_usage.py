@@ -0,0 +1,53 @@
+from unittest.mock import patch
+
+from src.models import ProcessingStats
+from src.usage import UsageAggregator
+
+
+def _stats(**counts: float) -> ProcessingStats:
+    stats = ProcessingStats(**counts)
+    stats.record_stage("download", 10.0)
+    return stats
+
+
+class TestUsageAggregator:
+    def test_jobs_summed_per_minute(self) -> None:
+        aggregator = UsageAggregator()
+
+        with patch("src.usage.time.time", return_value=600.0):
+            aggregator.record("acme", _stats(crm_requests=3), success=True)
+            aggregator.record("acme", _stats(crm_requests=2), success=False)
+        with patch("src.usage.time.time", return_value=660.0):
+            aggregator.record("acme", None, success=False)
+            report = aggregator.query(minutes=5)
+
+        assert [row["minute"] for row in report["minutes"]] == [
+            "1970-01-01T00:10:00+00:00",
+            "1970-01-01T00:11:00+00:00",
+        ]
+        first = report["minutes"][0]
+        assert (first["jobs"], first["failed"], first["crm_requests"]) == (2, 1, 5)
+        assert first["stage_timings_ms"] == {"download": 20.0}
+        assert report["totals"]["jobs"] == 3
+        assert report["totals"]["failed"] == 2
+
+    def test_filters_by_tenant(self) -> None:
+        aggregator = UsageAggregator()
+        aggregator.record("acme", _stats(llm_calls=2), success=True)
+        aggregator.record("globex", _stats(llm_calls=5), success=True)
+
+        assert aggregator.query(tenant="acme")["totals"]["llm_calls"] == 2
+        assert aggregator.query()["totals"]["llm_calls"] == 7
+        assert aggregator.query(tenant="initech")["minutes"] == []
+
+    def test_old_minutes_dropped(self) -> None:
+        aggregator = UsageAggregator(retention_minutes=10)
+
+        with patch("src.usage.time.time", return_value=0.0):
+            aggregator.record("acme", _stats(), success=True)
+        with patch("src.usage.time.time", return_value=11 * 60.0):
+            aggregator.record("acme", _stats(), success=True)
+            report = aggregator.query(minutes=10)
+
+        assert report["totals"]["jobs"] == 1
+        assert len(aggregator._minutes) == 1
@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.crm.write_tracker import RecentWrites
+
+
+class TestRecentWrites:
+    @pytest.fixture
+    def writes(self) -> RecentWrites:
+        return RecentWrites(ttl_seconds=60)
+
+    def test_matches_same_skills(self, writes: RecentWrites) -> None:
+        writes.record("c1", ["Python", "React"])
+
+        assert writes.is_own_write("c1", skills="Python, React") is True
+        assert writes.suppressed == 1
+
+    def test_matches_canonical_variants(self, writes: RecentWrites) -> None:
+        writes.record("c1", ["Python", "React"])
+
+        assert writes.is_own_write("c1", skills="react.js,  python") is True
+
+    def test_different_skills_are_not_suppressed(self, writes: RecentWrites) -> None:
+        writes.record("c1", ["Python", "React"])
+
+        assert writes.is_own_write("c1", skills="Python, React, Go") is False
+        assert writes.suppressed == 0
+
+    def test_matches_modified_at(self, writes: RecentWrites) -> None:
+        writes.record("c1", ["Python"], modified_at="2024-01-01 10:00:00")
+
+        assert writes.is_own_write("c1", modified_at="2024-01-01 10:00:00") is True
+        assert writes.is_own_write("c1", modified_at="2024-01-01 10:05:00") is False
+
+    def test_event_without_fields_is_not_suppressed(self, writes: RecentWrites) -> None:
+        writes.record("c1", ["Python"], modified_at="2024-01-01 10:00:00")
+
+        assert writes.is_own_write("c1") is False
+
+    def test_unknown_contact(self, writes: RecentWrites) -> None:
+        assert writes.is_own_write("c1", skills="Python") is False
+
+    def test_entries_expire(self, writes: RecentWrites) -> None:
+        writes.record("c1", ["Python"])
+
+        with patch("src.crm.write_tracker.time.monotonic", return_value=1e12):
+            assert writes.is_own_write("c1", skills="Python") is False
+
+    def test_bounded_size(self) -> None:
+        writes = RecentWrites(ttl_seconds=60, max_entries=2)
+
+        writes.record("c1", ["Python"])
+        writes.record("c2", ["Python"])
+        writes.record("c3", ["Python"])
+
+        assert writes.is_own_write("c1", skills="Python") is False
+        assert writes.is_own_write("c3", skills="Python") is True